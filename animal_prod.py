@@ -9,6 +9,8 @@ import pandas as pd
 import os
 from sklearn.linear_model import LinearRegression
 from typing import Optional
+from animal_queries import (BREED_FILL_SQL, BREED_PRICE_SQL, BREEDS_SQL, CAPACITY_SQL, FOOD_FILL_SQL,
+                            FOOD_GROUP_SQL, FOOD_SQL, FORAGE_SQL, POINTS_SQL)
 
 matplotlib.use('GTK3Agg')
 warnings.simplefilter(action='ignore', category=FutureWarning)
@@ -475,36 +477,7 @@ class Animal(Breed):
 def forage_adj_calc(con, hay, silage, straw, mineral):
     # this value adjusts the price of forage (TMR) to be line with the price of the components
     forage_dict = {'hay': hay, 'silage': silage, 'straw': straw, 'mineral': mineral}
-    forage_sql = """
-    WITH mix_wgt (name, wgt) AS (VALUES
-    ('DRYGRASS_WINDROW', {hay}),
-    ('SILAGE', {silage}),
-    ('STRAW', {straw}),
-    ('MINERAL_FEED', {mineral})
-
-    ), forage_price AS (
-    SELECT *
-    FROM fill
-    WHERE name = 'FORAGE' OR name IN (SELECT fill_types FROM animal_food_recipe)
-
-    ), price_wgt_calc AS (
-    SELECT a.*, b.pct_min, b.pct_max, c.wgt, price_l * wgt price_wgt
-    FROM forage_price a
-    LEFT JOIN animal_food_recipe b ON a.name = b.fill_types
-    LEFT JOIN mix_wgt c ON a.name = c.name
-    WHERE a.name != 'FORAGE'
-
-    ), price_calc AS ( 
-    SELECT 'FORAGE' name, sum(price_wgt) / sum(wgt) price_l_adj
-    FROM price_wgt_calc
-    )
-
-    SELECT a.*, b.price_l_adj, b.price_l_adj/a.price_l forage_adj
-    FROM forage_price a
-    INNER JOIN price_calc b 
-    WHERE a.name = 'FORAGE';"""
-
-    forage_fill_sql = forage_sql.format(**forage_dict)
+    forage_fill_sql = FORAGE_SQL.format(**forage_dict)
     forage_df = pd.read_sql_query(forage_fill_sql, con)
     forage_adj = round(forage_df.to_dict('records')[0].get('forage_adj'), 2)
     return forage_adj
@@ -518,9 +491,9 @@ con = sqlite.connect(db_path)
 forage_low = forage_adj_calc(con, hay = 0.5, silage = 0.2, straw = 0.3, mineral = 0)
 # autofeeder in big barn = 37.5% hay, 20% straw, 37.5% silage and 5% mineral feed
 forage_high = forage_adj_calc(con, hay = 0.375, silage = 0.375, straw = 0.2, mineral = 0.05)
-point_where = "WHERE id IN ('cowBarnBig', 'cowBarnBigVector', 'chickenBarnBig', 'sheepBarnBig', 'pigBarnBig')"
-point_sql = f"SELECT * FROM animal_point {point_where};"
-animal_point_rows = pd.read_sql_query(point_sql, con).to_dict('records')
+point_ids = ['cowBarnBig', 'cowBarnBigVector', 'chickenBarnBig', 'sheepBarnBig', 'pigBarnBig']
+point_sql = POINTS_SQL.format(ids=', '.join('?' * len(point_ids)))
+animal_point_rows = pd.read_sql_query(point_sql, con, params=point_ids).to_dict('records')
 
 ap_list = []
 for p in animal_point_rows:
@@ -532,61 +505,32 @@ for p in animal_point_rows:
         forage_adj = forage_high
     else:
         forage_adj = 1
-    animal_food = next(iter((pd.read_sql_query("SELECT * FROM animal_food WHERE type = ?;", con,
+    animal_food = next(iter((pd.read_sql_query(FOOD_SQL, con,
                                     params=[animal_type]).to_dict('records'))))
     animal_list = []
     consumption = animal_food.get('consumption')
-    animal_fg = pd.read_sql_query("SELECT * FROM animal_food_group WHERE type = ?;", con,
+    animal_fg = pd.read_sql_query(FOOD_GROUP_SQL, con,
                                   params=[animal_type]).to_dict('records')
-    food_fill_sql = '\n'.join((
-        "SELECT a.*, b.price_l FROM animal_food_fill a LEFT JOIN fill b ON a.fill_type = b.name WHERE type = ?;",
-    ))
-
-    animal_ff = pd.read_sql_query(food_fill_sql, con,
+    animal_ff = pd.read_sql_query(FOOD_FILL_SQL, con,
                                   params=[animal_type]).to_dict('records')
     type_class = AnimalType(type=animal_type, consumption=consumption, food_group=animal_fg, group_fill=animal_ff)
-    animals = pd.read_sql_query("SELECT * FROM animal WHERE type = ?;", con, params=[animal_type])
+    animals = pd.read_sql_query(BREEDS_SQL, con, params=[animal_type])
     for s in animals.to_dict('records'):
         subtype = s.get('subtype')
         reprod_agemin_mo = s.get('reprod_agemin_mo')
         reprod_duration_mo = s.get('reprod_duration_mo')
         reprod_healthmin = s.get('reprod_healthmin')
-        fill_in = pd.read_sql_query(
-            "SELECT fill_type, age_mo, liter_day FROM animal_fill WHERE direction = 'in' AND subtype = ?;",
-            con, params=[subtype]).to_dict('records')
-        fill_out = pd.read_sql_query(
-            "SELECT fill_type, age_mo, liter_day FROM animal_fill WHERE direction = 'out' AND subtype = ?;",
-            con, params=[subtype]).to_dict('records')
-        price_buy = pd.read_sql_query(
-            "SELECT age_mo, price_unit FROM animal_price WHERE price_type = 'buy' AND subtype = ?;",
-            con, params=[subtype]).to_dict('records')
-        price_sell = pd.read_sql_query(
-            "SELECT age_mo, price_unit FROM animal_price WHERE price_type = 'sell' AND subtype = ?;",
-            con, params=[subtype]).to_dict('records')
-        price_trans = pd.read_sql_query(
-            "SELECT age_mo, price_unit FROM animal_price WHERE price_type = 'transport' AND subtype = ?;",
-            con, params=[subtype]).to_dict('records')
+        fill_in = pd.read_sql_query(BREED_FILL_SQL, con, params=['in', subtype]).to_dict('records')
+        fill_out = pd.read_sql_query(BREED_FILL_SQL, con, params=['out', subtype]).to_dict('records')
+        price_buy = pd.read_sql_query(BREED_PRICE_SQL, con, params=['buy', subtype]).to_dict('records')
+        price_sell = pd.read_sql_query(BREED_PRICE_SQL, con, params=['sell', subtype]).to_dict('records')
+        price_trans = pd.read_sql_query(BREED_PRICE_SQL, con, params=['transport', subtype]).to_dict('records')
         breed_class = Breed(type_class, subtype=subtype, reprod_agemin_mo=reprod_agemin_mo,
                             reprod_duration_mo=reprod_duration_mo, reprod_healthmin=reprod_healthmin,
                             fill_in=fill_in, fill_out=fill_out, price_buy=price_buy, price_sell=price_sell,
                             price_trans=price_trans)
         animal_list.append(breed_class)
-    capacity_sql = '\n'.join((
-        "SELECT a.pallet_fill fill_type,",
-        "       CASE WHEN a.pallet_fill = 'EGG' THEN a.pallet_maxno * 1400",
-        "            WHEN a.pallet_fill = 'WOOL' THEN a.pallet_maxno * 1000",
-        "	         ELSE NULL END capacity,",
-        "       b.price_l",
-        "  FROM animal_point a",
-        "  LEFT JOIN fill b ON a.pallet_fill = b.name",
-        " WHERE id = ? AND pallet_fill IS NOT NULL",
-        " UNION",
-        "SELECT a.fill_type, a.capacity, b.price_l ",
-        "  FROM animal_capacity a ",
-        "  LEFT JOIN fill b ON a.fill_type = b.name ",
-        " WHERE point_id = ?;",
-    ))
-    capacity_list = pd.read_sql_query(capacity_sql, con, params=[point_id, point_id]).to_dict('records')
+    capacity_list = pd.read_sql_query(CAPACITY_SQL, con, params=[point_id, point_id]).to_dict('records')
     animal_point = PointAnimal(id=point_id, place_type=p.get('place_type'), name=p.get('name'), price=p.get('price'),
                                upkeep_price=p.get('upkeep_price'), type=animal_type, unit_max=p.get('unit_max'),
                                food_cap=p.get('food_cap'), food_default=p.get('food_default'), animal=type_class,
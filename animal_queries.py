@@ -0,0 +1,91 @@
+# The lookups the animal production simulator (animal_prod.py) makes in a scrape database, kept
+# apart from it so check_plans.py can check their query plans without running the simulator.
+
+# weights of the forage ingredients, filled in with str.format
+FORAGE_SQL = '\n'.join((
+    "WITH mix_wgt (name, wgt) AS (VALUES",
+    "('DRYGRASS_WINDROW', {hay}),",
+    "('SILAGE', {silage}),",
+    "('STRAW', {straw}),",
+    "('MINERAL_FEED', {mineral})",
+    "",
+    "), forage_price AS (",
+    "SELECT *",
+    "FROM fill",
+    "WHERE name = 'FORAGE' OR name IN (SELECT fill_types FROM animal_food_recipe)",
+    "",
+    "), price_wgt_calc AS (",
+    "SELECT a.*, b.pct_min, b.pct_max, c.wgt, price_l * wgt price_wgt",
+    "FROM forage_price a",
+    "LEFT JOIN animal_food_recipe b ON a.name = b.fill_types",
+    "LEFT JOIN mix_wgt c ON a.name = c.name",
+    "WHERE a.name != 'FORAGE'",
+    "",
+    "), price_calc AS (",
+    "SELECT 'FORAGE' name, sum(price_wgt) / sum(wgt) price_l_adj",
+    "FROM price_wgt_calc",
+    ")",
+    "",
+    "SELECT a.*, b.price_l_adj, b.price_l_adj/a.price_l forage_adj",
+    "FROM forage_price a",
+    "INNER JOIN price_calc b",
+    "WHERE a.name = 'FORAGE';"
+))
+
+# the ids, one ? each, filled in with str.format
+POINTS_SQL = "SELECT * FROM animal_point WHERE id IN ({ids});"
+
+FOOD_SQL = "SELECT * FROM animal_food WHERE type = ?;"
+
+FOOD_GROUP_SQL = "SELECT * FROM animal_food_group WHERE type = ?;"
+
+FOOD_FILL_SQL = '\n'.join((
+    "SELECT a.*, b.price_l FROM animal_food_fill a LEFT JOIN fill b ON a.fill_type = b.name",
+    " WHERE type = ?;"
+))
+
+BREEDS_SQL = "SELECT * FROM animal WHERE type = ?;"
+
+# the fill in or out of a subtype ('in' or 'out', subtype)
+BREED_FILL_SQL = '\n'.join((
+    "SELECT fill_type, age_mo, liter_day FROM animal_fill",
+    " WHERE direction = ? AND subtype = ?;"
+))
+
+# the buy, sell or transport prices of a subtype (price_type, subtype)
+BREED_PRICE_SQL = '\n'.join((
+    "SELECT age_mo, price_unit FROM animal_price",
+    " WHERE price_type = ? AND subtype = ?;"
+))
+
+# (point id, point id)
+CAPACITY_SQL = '\n'.join((
+    "SELECT a.pallet_fill fill_type,",
+    "       CASE WHEN a.pallet_fill = 'EGG' THEN a.pallet_maxno * 1400",
+    "            WHEN a.pallet_fill = 'WOOL' THEN a.pallet_maxno * 1000",
+    "	         ELSE NULL END capacity,",
+    "       b.price_l",
+    "  FROM animal_point a",
+    "  LEFT JOIN fill b ON a.pallet_fill = b.name",
+    " WHERE id = ? AND pallet_fill IS NOT NULL",
+    " UNION",
+    "SELECT a.fill_type, a.capacity, b.price_l ",
+    "  FROM animal_capacity a ",
+    "  LEFT JOIN fill b ON a.fill_type = b.name ",
+    " WHERE point_id = ?;",
+))
+
+
+def sim_queries():
+    # (name, sql) of every lookup, with ? parameters
+    return [
+        ('forage', FORAGE_SQL.format(hay=0.5, silage=0.2, straw=0.3, mineral=0)),
+        ('points', POINTS_SQL.format(ids='?, ?')),
+        ('food', FOOD_SQL),
+        ('food_group', FOOD_GROUP_SQL),
+        ('food_fill', FOOD_FILL_SQL),
+        ('breeds', BREEDS_SQL),
+        ('breed_fill', BREED_FILL_SQL),
+        ('breed_price', BREED_PRICE_SQL),
+        ('capacity', CAPACITY_SQL),
+    ]
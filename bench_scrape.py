@@ -0,0 +1,242 @@
+import os
+import sys
+import time
+import json
+import argparse
+import platform
+import tempfile
+import subprocess
+import sqlite3 as sqlite
+import scrape_economy_25 as scrape
+from synth_game import write_game
+
+try:
+    import resource
+except ImportError:
+    # not available on Windows, peak RSS is left out there
+    resource = None
+
+# scrape stages in the order the scraper runs them: name, function, folder it reads (game or
+# dataS), whether it takes jobs and mods, and the tables whose rows it produces
+STAGES = (
+    ('prod', scrape.get_prod, 'game', True, ('prod_point', 'production', 'prod_fill')),
+    ('fruit', scrape.get_fruit, 'game', False, ('fruit', 'fruit_category')),
+    ('fill', scrape.get_fill, 'game', False, ('fill', 'fill_factor', 'type_convert',
+                                             'fill_category')),
+    ('animals', scrape.get_animals, 'dataS', False, ('animal', 'animal_price', 'animal_fill')),
+    ('animal_food', scrape.get_animal_food, 'dataS', False,
+     ('animal_food', 'animal_food_group', 'animal_food_fill', 'animal_food_mix',
+      'animal_food_recipe')),
+    ('animal_pen', scrape.get_animal_pen, 'game', True, ('animal_point', 'animal_capacity')),
+    ('placeable', scrape.get_placeable, 'game', True, ('placeable',)),
+    ('vehicles', scrape.get_vehicles, 'game', True, ('vehicle', 'vehicle_motor')),
+    ('sell', scrape.get_sell, 'game', True, ('sell_point', 'sell_point_fill',
+                                              'sell_point_category', 'map_placeable')),
+)
+
+VIEWS = ('profit_hour', 'animal_prod_profit_day', 'prod_profit', 'point_profit', 'fruit_profit',
+         'sell_price', 'profit_hour_map', 'fruit_profit_map', 'profit_hour_period',
+         'animal_prod_profit_day_period', 'fruit_profit_period', 'prod_profit_period')
+
+
+def peak_rss_mb():
+    """
+    (this process, largest finished child) peak resident set size in MB. Both are high water
+    marks, so a stage's value is the peak of the run so far; pool workers count as children
+    once the pool is shut down.
+    """
+    if resource is None:
+        return None, None
+    # ru_maxrss is in bytes on macOS and kilobytes everywhere else
+    unit = 1024 * 1024 if sys.platform == 'darwin' else 1024
+    own = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / unit
+    children = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / unit
+    return round(own, 1), round(children, 1)
+
+
+def count_rows(con, tables):
+    c = con.cursor()
+    return sum(c.execute(f"SELECT count(*) FROM {t};").fetchone()[0] for t in tables)
+
+
+def timed(name, func, rows_after):
+    # runs func and returns the result dict of one benchmark step
+    rss_before = peak_rss_mb()[0]
+    start = time.perf_counter()
+    func()
+    seconds = time.perf_counter() - start
+    rows = rows_after()
+    own, children = peak_rss_mb()
+    return {
+        'stage': name,
+        'seconds': round(seconds, 4),
+        'rows': rows,
+        'rows_per_s': round(rows / seconds, 1) if seconds > 0 else None,
+        'peak_rss_mb': own,
+        'rss_growth_mb': round(own - rss_before, 1) if own is not None else None,
+        'peak_child_rss_mb': children,
+    }
+
+
+def run_stages(con, game_dir, dataS_dir, jobs, mods, suffix=''):
+    results = []
+    for name, func, folder, pooled, tables in STAGES:
+        if folder == 'dataS' and dataS_dir is None:
+            continue
+        kwargs = {'con': con}
+        if folder == 'dataS':
+            kwargs['dataS_dir'] = dataS_dir
+        else:
+            kwargs['game_dir'] = game_dir
+        if pooled:
+            kwargs['jobs'] = jobs
+        if folder == 'game':
+            kwargs['mods'] = mods
+        before = count_rows(con, tables)
+        results.append(timed(name + suffix, lambda: func(**kwargs),
+                             lambda: count_rows(con, tables) - before))
+    return results
+
+
+def query_views(con):
+    results = []
+    c = con.cursor()
+    for view in VIEWS:
+        rows = []
+        results.append(timed(f'view {view}',
+                             lambda: rows.extend(c.execute(f"SELECT * FROM {view};").fetchall()),
+                             lambda: len(rows)))
+    return results
+
+
+def git_commit():
+    try:
+        out = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True,
+                             text=True, cwd=os.path.dirname(os.path.abspath(__file__)))
+    except OSError:
+        return None
+    return out.stdout.strip() or None
+
+
+def benchmark(game_dir, dataS_dir=None, jobs=1, mods_dir=None, warm=False, work_dir=None):
+    """
+    Scrapes game_dir into a new database in work_dir, timing every stage, then the views, and
+    with warm every stage once more against the finished database (the no change rescrape).
+    Returns the list of step results.
+    """
+    db_path = os.path.join(work_dir, 'bench.sqlite')
+    if os.path.isfile(db_path):
+        os.remove(db_path)
+    scrape.PLACEABLE_INDEX.clear()
+    con = scrape.create_db(db_path)
+    results = []
+    mods = []
+    if mods_dir is not None:
+        results.append(timed('mods', lambda: mods.extend(scrape.find_mods(mods_dir, game_dir,
+                                                                          jobs=jobs)),
+                             lambda: len(mods)))
+    results += run_stages(con, game_dir, dataS_dir, jobs, mods)
+    results.append(timed('add views', lambda: scrape.add_production_queries(con),
+                         lambda: len(VIEWS)))
+    results += query_views(con)
+    if warm:
+        scrape.PLACEABLE_INDEX.clear()
+        results += run_stages(con, game_dir, dataS_dir, jobs, mods, suffix=' (warm)')
+    con.close()
+    return results
+
+
+def print_table(results, baseline=None):
+    old = {r['stage']: r for r in (baseline or {}).get('stages', ())}
+    header = f"{'stage':<30}{'seconds':>10}{'rows':>10}{'rows/s':>12}{'peak MB':>10}"
+    if old:
+        header += f"{'vs base':>10}"
+    print(header)
+    for r in results:
+        line = (f"{r['stage']:<30}{r['seconds']:>10.3f}{r['rows']:>10}"
+                f"{r['rows_per_s'] if r['rows_per_s'] is not None else '':>12}"
+                f"{r['peak_rss_mb'] if r['peak_rss_mb'] is not None else '':>10}")
+        base = old.get(r['stage'])
+        if base and base['seconds']:
+            line += f"{r['seconds'] / base['seconds']:>9.2f}x"
+        print(line)
+
+
+if __name__ == '__main__':
+    my_args = sys.argv[1:]
+    parser = argparse.ArgumentParser(
+                    prog='bench_scrape',
+                    description='Times every stage of scrape_economy_25.py against a game folder, '
+                                'or a synthetic one written by synth_game.py, and reports '
+                                'seconds, rows per second and peak memory.',
+                    epilog='Script finished.')
+
+    parser.add_argument('game_dir', nargs='?',
+                        help='The game folder to scrape. Without it a synthetic game of --scale '
+                             'production points is written to a temporary folder first.')
+    parser.add_argument('-d', '--dataS_dir',
+                        help='The dataS folder; defaults to the synthetic one when game_dir is '
+                             'not given.')
+    parser.add_argument('-n', '--scale', type=int, default=100,
+                        help='Size of the synthetic game, see synth_game.py (default 100).')
+    parser.add_argument('-s', '--seed', type=int, default=1,
+                        help='Seed of the synthetic game (default 1).')
+    parser.add_argument('--mods', type=int, default=0,
+                        help='Number of synthetic mods to write and scrape (default 0).')
+    parser.add_argument('-m', '--mods_dir', '--mods-dir',
+                        help='A mods folder to scrape with game_dir.')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='Number of processes passed to the scraper (default 1).')
+    parser.add_argument('-w', '--warm', action='store_true',
+                        help='Also time a second scrape of the unchanged files into the same '
+                             'database.')
+    parser.add_argument('-o', '--out',
+                        help='Write the results as JSON to this file.')
+    parser.add_argument('-c', '--compare',
+                        help='A results JSON file of an earlier run to compare seconds with.')
+
+    args = parser.parse_args(my_args)
+
+    with tempfile.TemporaryDirectory(prefix='fs_bench_') as tmp:
+        game_dir = args.game_dir
+        dataS_dir = args.dataS_dir
+        mods_dir = args.mods_dir
+        n_files = None
+        generate_s = None
+        if game_dir is None:
+            game_dir = os.path.join(tmp, 'game')
+            start = time.perf_counter()
+            n_files = write_game(game_dir, scale=args.scale, seed=args.seed, mods=args.mods)
+            generate_s = round(time.perf_counter() - start, 3)
+            dataS_dir = dataS_dir or os.path.join(game_dir, 'dataS')
+            if args.mods:
+                mods_dir = mods_dir or os.path.join(game_dir, 'mods')
+            print(f"Wrote {n_files} synthetic game files in {generate_s} s")
+        results = benchmark(game_dir, dataS_dir, jobs=args.jobs, mods_dir=mods_dir,
+                            warm=args.warm, work_dir=tmp)
+
+    report = {
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'commit': git_commit(),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'sqlite': sqlite.sqlite_version,
+        'game_dir': args.game_dir,
+        'synthetic': None if args.game_dir else {
+            'scale': args.scale, 'seed': args.seed, 'mods': args.mods, 'files': n_files,
+            'generate_seconds': generate_s},
+        'jobs': args.jobs,
+        'stages': results,
+        'total_seconds': round(sum(r['seconds'] for r in results), 4),
+    }
+    baseline = None
+    if args.compare:
+        with open(args.compare, 'r', encoding='utf8') as file:
+            baseline = json.load(file)
+    print_table(results, baseline)
+    print(f"Total {report['total_seconds']:.3f} s")
+    if args.out:
+        with open(args.out, 'w', encoding='utf8') as file:
+            json.dump(report, file, indent=2)
+        print(f"Results written to {args.out}")
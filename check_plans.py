@@ -0,0 +1,144 @@
+import os
+import sys
+import json
+import argparse
+import tempfile
+import collections
+import sqlite3 as sqlite
+import scrape_economy_25 as scrape
+from animal_queries import sim_queries
+from synth_game import write_game
+
+# Records the EXPLAIN QUERY PLAN of every view of a scrape database and every lookup of the
+# animal simulator, and fails when one of them reads a table whole that it didn't in the
+# baseline. Without ANALYZE, SQLite plans from the schema alone, so the plans of a small
+# synthetic game are those of the full game with every mod: a scan that shows up here is a scan
+# of all the modded rows there.
+
+BASELINE = 'query_plans.json'
+
+
+def plan_queries(con):
+    # (name, sql) of every view of the database and every simulator lookup
+    views = [(f'view {name}', f"SELECT * FROM {name};") for (name,) in con.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'view' ORDER BY name;")]
+    return views + [(f'sim {name}', sql) for name, sql in sim_queries()]
+
+
+def query_plan(con, sql):
+    # the EXPLAIN QUERY PLAN of sql as lines indented by depth
+    depth = {0: -1}
+    lines = []
+    for node, parent, _, detail in con.execute(f"EXPLAIN QUERY PLAN {sql}",
+                                               [None] * sql.count('?')):
+        depth[node] = depth.get(parent, -1) + 1
+        lines.append('  ' * depth[node] + detail)
+    return lines
+
+
+def table_scans(con, sql):
+    """
+    {table: scans} of the tables sql steps through from the first row, from its bytecode: the
+    cursors opened on a table (or one of its indexes, given as 'table (index)') that are
+    rewound rather than sought. Building an automatic index counts as a scan of its table; the
+    temporary tables of materialized subqueries and sorts are left out.
+    """
+    roots = {r[0]: (r[1], r[2], r[3]) for r in con.execute(
+        "SELECT rootpage, type, name, tbl_name FROM sqlite_master WHERE rootpage > 0;")}
+    cursors = {}
+    scans = collections.Counter()
+    for row in con.execute(f"EXPLAIN {sql}", [None] * sql.count('?')):
+        opcode, p1, p2, p3 = row[1], row[2], row[3], row[4]
+        if opcode == 'OpenRead' and p3 == 0 and p2 in roots:
+            cursors[p1] = roots[p2]
+        elif opcode == 'Rewind' and p1 in cursors:
+            kind, name, table = cursors[p1]
+            scans[table if kind == 'table' else f'{table} ({name})'] += 1
+    return dict(sorted(scans.items()))
+
+
+def record_plans(con):
+    return {name: {'plan': query_plan(con, sql), 'scans': table_scans(con, sql)}
+            for name, sql in plan_queries(con)}
+
+
+def compare_plans(plans, baseline):
+    """
+    (new scans, fewer scans) against the baseline plans, as (query, table, baseline scans,
+    scans) tuples. A query the baseline lacks has all its scans new.
+    """
+    new, fewer = [], []
+    for name, plan in plans.items():
+        old = baseline.get(name, {}).get('scans', {})
+        for table in sorted(plan['scans'].keys() | old.keys()):
+            before, after = old.get(table, 0), plan['scans'].get(table, 0)
+            if after > before:
+                new.append((name, table, before, after))
+            elif after < before:
+                fewer.append((name, table, before, after))
+    return new, fewer
+
+
+def synthetic_db(work_dir, scale, seed, mods):
+    # scrapes a synthetic game of scale production points and mods mods into work_dir
+    game_dir = os.path.join(work_dir, 'game')
+    write_game(game_dir, scale=scale, seed=seed, mods=mods)
+    db_path = os.path.join(work_dir, 'plans.sqlite')
+    scrape.scrape_all(game_dir, db_path, dataS_dir=os.path.join(game_dir, 'dataS'),
+                      mods_dir=os.path.join(game_dir, 'mods') if mods else None)
+    return db_path
+
+
+if __name__ == '__main__':
+    my_args = sys.argv[1:]
+    parser = argparse.ArgumentParser(
+                    prog='check_plans',
+                    description='Checks the query plans of the views of prod25.sql and the '
+                                'lookups of the animal simulator against a baseline, failing on '
+                                'a table read whole that was not before.',
+                    epilog='Script finished.')
+    parser.add_argument('db_path', nargs='?',
+                        help='A scrape database to check. Without it a synthetic game (with '
+                             'mods) is written and scraped to a temporary folder first.')
+    parser.add_argument('-b', '--baseline', default=BASELINE,
+                        help=f'The baseline plans JSON (default {BASELINE}).')
+    parser.add_argument('-u', '--update', action='store_true',
+                        help='Write the plans as the new baseline instead of checking them.')
+    parser.add_argument('-n', '--scale', type=int, default=20,
+                        help='Size of the synthetic game, see synth_game.py (default 20).')
+    parser.add_argument('-s', '--seed', type=int, default=1,
+                        help='Seed of the synthetic game (default 1).')
+    parser.add_argument('--mods', type=int, default=2,
+                        help='Number of synthetic mods (default 2).')
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help='Print the plan of every query that changed.')
+
+    args = parser.parse_args(my_args)
+
+    with tempfile.TemporaryDirectory(prefix='fs_plans_') as tmp:
+        db_path = args.db_path or synthetic_db(tmp, args.scale, args.seed, args.mods)
+        con = sqlite.connect(db_path)
+        plans = record_plans(con)
+        con.close()
+
+    if args.update:
+        with open(args.baseline, 'w', encoding='utf8') as file:
+            json.dump({'sqlite': sqlite.sqlite_version, 'queries': plans}, file, indent=2)
+        print(f"{len(plans)} query plans written to {args.baseline}")
+        sys.exit()
+
+    with open(args.baseline, 'r', encoding='utf8') as file:
+        baseline = json.load(file)['queries']
+    new, fewer = compare_plans(plans, baseline)
+    for name, table, before, after in fewer:
+        print(f"{name}: {table} scanned {after} times, was {before}")
+    for name, table, before, after in new:
+        print(f"NEW SCAN {name}: {table} scanned {after} times, was {before}")
+    if args.verbose:
+        for name in sorted({n for n, *_ in new + fewer}):
+            print(f"{name}:")
+            for line in plans[name]['plan']:
+                print(f"    {line}")
+    print(f"{len(plans)} queries, {len(new)} new scans, {len(fewer)} fewer")
+    if new:
+        sys.exit(1)
@@ -0,0 +1,46 @@
+import sys
+import time
+import argparse
+import sqlite3 as sqlite
+import fs_export
+from fs_export import FORMATS, BATCH_ROWS, export_all
+
+# Exports the tables and views of a scrape database for analysis elsewhere: CSV for csv/ and its
+# diffs, typed and columnar files for loading, Parquet for size and Arrow for loads that map the
+# file instead of reading it. fs_export.load_table loads either, keeping only the columns asked
+# for. Files whose content did not change are left as they are.
+
+
+if __name__ == '__main__':
+    my_args = sys.argv[1:]
+    parser = argparse.ArgumentParser(
+                    prog='export_tables',
+                    description='Writes every scraped table and view of a scrape database to '
+                                '<out_dir>/tables and <out_dir>/views as CSV, Parquet or Arrow '
+                                'IPC files, rewriting only the files whose content changed.',
+                    epilog='Script finished.')
+    parser.add_argument('db_path', help='The scrape database, e.g. db/scrape25.sqlite.')
+    parser.add_argument('names', nargs='*',
+                        help='Tables and views to export (default all of them).')
+    parser.add_argument('-f', '--format', choices=tuple(FORMATS), default='csv',
+                        help='csv, parquet (typed, compressed) or arrow (typed, memory-mappable), '
+                             'default csv.')
+    parser.add_argument('-o', '--out-dir',
+                        help='Folder to write to (default the format name, e.g. csv).')
+    parser.add_argument('--batch', type=int, default=BATCH_ROWS,
+                        help=f'Rows read and written at a time (default {BATCH_ROWS}).')
+    args = parser.parse_args(my_args)
+
+    if fs_export.pa is None and args.format != 'csv':
+        parser.error(f'pyarrow is needed to export {args.format}, e.g. pip install pyarrow')
+
+    con = sqlite.connect(args.db_path)
+    start = time.perf_counter()
+    written = export_all(con, args.out_dir or args.format, args.format,
+                         names=args.names or None, batch_rows=args.batch)
+    con.close()
+    for name, (rows, changed) in written.items():
+        print(f"{name}: {rows} rows{'' if changed else ', unchanged'}")
+    changed = sum(c for r, c in written.values())
+    print(f"{len(written)} tables and views exported to {args.out_dir or args.format}, {changed} "
+          f"files changed, in {time.perf_counter() - start:.2f} s")
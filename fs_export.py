@@ -0,0 +1,262 @@
+import os
+import csv
+import hashlib
+from fs_profit import PROFIT_TABLES, object_type, profit_declared
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc
+    import pyarrow.parquet as pq
+except ImportError:
+    # Parquet, Arrow and load_table need pyarrow, CSV and the scrapers don't
+    pa = None
+
+# Copies of the tables and views of a scrape database for analysis elsewhere: typed and columnar
+# as Parquet files or Arrow IPC files (uncompressed, so they load memory-mapped without a copy),
+# or as CSV files. SQLite only types its values, not its columns, so a column's Arrow type is
+# that of the values it holds: all integers is int64, integers and reals float64, and anything
+# holding text is a string. BOOLEAN columns are bool, and a column with nothing but NULLs gets
+# the type its declaration suggests. CSV files are written as the sqlite3 shell writes them
+# (csv/ was), without types. The rows are written in batches, never all held at once, to a new
+# file that only replaces the old one when their content hashes differ: an export that changes
+# nothing leaves every file untouched.
+
+FORMATS = {'parquet': '.parquet', 'arrow': '.arrow', 'csv': '.csv'}
+
+BATCH_ROWS = 65536
+
+
+def export_sources(con, names=None):
+    """
+    (name, 'table' or 'view') of the scraped tables and the views, or just those in names. The
+    profit tables are listed as the views they were (and csv/ has them as), in place of the
+    <name>_view views they are filled from.
+    """
+    rows = con.execute("SELECT name, type FROM sqlite_master WHERE type IN ('table', 'view') "
+                       "AND name NOT LIKE 'scrape_%' AND name NOT LIKE 'sqlite_%' "
+                       "ORDER BY type, name;").fetchall()
+    kinds = dict(rows)
+    filled = {t for t in PROFIT_TABLES
+              if kinds.get(t) == 'table' and kinds.get(f'{t}_view') == 'view'}
+    views = {f'{t}_view' for t in filled}
+    rows = sorted(((n, 'view' if n in filled else t) for n, t in rows if n not in views),
+                  key=lambda r: (r[1], r[0]))
+    if names is not None:
+        missing = set(names) - {n for n, t in rows}
+        if missing:
+            raise ValueError(f"no table or view {', '.join(sorted(missing))}")
+        rows = [(n, t) for n, t in rows if n in names]
+    return rows
+
+
+def declared_type(decl):
+    # the Arrow type of a declared SQLite column type, by SQLite's affinity rules
+    decl = decl.upper()
+    if 'BOOL' in decl:
+        return pa.bool_()
+    if 'INT' in decl:
+        return pa.int64()
+    if any(t in decl for t in ('CHAR', 'CLOB', 'TEXT')):
+        return pa.string()
+    if decl == '' or 'BLOB' in decl:
+        return pa.null()
+    return pa.float64()
+
+
+def declared_types(con, table):
+    """
+    [(column, declared type)] of table. The profit tables declare theirs (BOOLEAN flags, REAL
+    amounts), but in an older database they are CREATE TABLE AS copies of their <name>_view
+    views with only an affinity per column, NUM or none, and a column's declaration is taken
+    from the view where it has one. The views lose most on the way through their subqueries,
+    so such a database gets its types back when refresh_profit.py rebuilds the tables.
+    """
+    info = [(r[1], r[2]) for r in con.execute(f'PRAGMA table_info("{table}");')]
+    if (table in PROFIT_TABLES and not profit_declared(con, table)
+            and object_type(con, f'{table}_view') == 'view'):
+        view = dict((r[1], r[2]) for r in con.execute(f'PRAGMA table_info("{table}_view");'))
+        info = [(name, view.get(name) or decl) for name, decl in info]
+    return info
+
+
+def arrow_schema(con, table, rows=None):
+    """
+    The Arrow schema of table from the storage classes its values have, read in one pass over
+    rows (a copy of it, or table itself), and its declared column types (see declared_types).
+    Values are converted to it by column_values.
+    """
+    info = declared_types(con, table)
+    rows = rows or f'"{table}"'
+    seen = con.execute("SELECT " + ', '.join(
+        f'group_concat(DISTINCT typeof("{name}"))' for name, decl in info) + f" FROM {rows};"
+    ).fetchone()
+    fields = []
+    for (name, decl), kinds in zip(info, seen):
+        kinds = set((kinds or '').split(',')) - {'', 'null'}
+        declared = declared_type(decl)
+        if pa.types.is_boolean(declared) and kinds <= {'integer'}:
+            kind = declared
+        elif not kinds:
+            kind = declared if not pa.types.is_null(declared) else pa.string()
+        elif 'text' in kinds:
+            kind = pa.string()
+        elif kinds == {'blob'}:
+            kind = pa.binary()
+        elif kinds == {'integer'}:
+            kind = pa.int64()
+        elif kinds <= {'integer', 'real'}:
+            kind = pa.float64()
+        else:
+            # blobs mixed with numbers
+            kind = pa.binary()
+        fields.append(pa.field(name, kind))
+    return pa.schema(fields)
+
+
+def column_values(values, kind):
+    # the SQLite values of a column as an Arrow array of kind
+    if pa.types.is_boolean(kind):
+        values = [None if v is None else bool(v) for v in values]
+    elif pa.types.is_string(kind):
+        values = [v if v is None or isinstance(v, str) else str(v) for v in values]
+    elif pa.types.is_binary(kind):
+        values = [v if v is None or isinstance(v, bytes) else str(v).encode('utf8')
+                  for v in values]
+    elif pa.types.is_floating(kind):
+        values = [None if v is None else float(v) for v in values]
+    return pa.array(values, type=kind)
+
+
+def record_batches(con, source, schema, batch_rows=BATCH_ROWS):
+    c = con.execute(f"SELECT * FROM {source};")
+    while True:
+        rows = c.fetchmany(batch_rows)
+        if not rows:
+            break
+        yield pa.RecordBatch.from_arrays(
+            [column_values(list(col), f.type) for col, f in zip(zip(*rows), schema)],
+            schema=schema)
+
+
+class HashedFile:
+    # a text file that hashes what is written to it
+    def __init__(self, file):
+        self.file = file
+        self.hash = hashlib.sha1()
+
+    def write(self, text):
+        self.hash.update(text.encode('utf8'))
+        return self.file.write(text)
+
+
+def csv_value(value):
+    # reals to 15 significant digits and always with a decimal point, as the sqlite3 shell has them
+    if isinstance(value, float):
+        text = f"{value:.15g}"
+        if 'e' in text and '.' not in text:
+            return text.replace('e', '.0e')
+        return text if '.' in text or 'n' in text else text + '.0'
+    return value
+
+
+def write_csv(con, source, path, batch_rows=BATCH_ROWS):
+    # writes the rows of source to path with a header line, returns (rows, content hash)
+    c = con.execute(f"SELECT * FROM {source};")
+    rows = 0
+    with open(path, 'w', encoding='utf8', newline='') as file:
+        hashed = HashedFile(file)
+        writer = csv.writer(hashed, lineterminator='\n')
+        writer.writerow([d[0] for d in c.description])
+        while True:
+            batch = c.fetchmany(batch_rows)
+            if not batch:
+                break
+            writer.writerows([csv_value(v) for v in row] for row in batch)
+            rows += len(batch)
+    return rows, hashed.hash.hexdigest()
+
+
+def file_hash(path):
+    # the content hash of the file at path, or None if there is none
+    if not os.path.exists(path):
+        return None
+    digest = hashlib.sha1()
+    with open(path, 'rb') as file:
+        for chunk in iter(lambda: file.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def write_arrow(con, name, source, path, fmt, batch_rows=BATCH_ROWS):
+    # writes the rows of source (name or a copy of it) to path as Parquet or Arrow, returns rows
+    schema = arrow_schema(con, name, source)
+    rows = 0
+    if fmt == 'parquet':
+        writer = pq.ParquetWriter(path, schema)
+    else:
+        writer = pa.ipc.new_file(path, schema)
+    with writer:
+        for batch in record_batches(con, source, schema, batch_rows):
+            writer.write_batch(batch)
+            rows += batch.num_rows
+    return rows
+
+
+def export_table(con, name, path, fmt='parquet', batch_rows=BATCH_ROWS):
+    """
+    Writes the table or view name to path in fmt ('parquet', 'arrow' or 'csv') and returns
+    (rows, whether path changed). The rows go to a new file next to path, which replaces it
+    unless both have the same content hash. For Parquet and Arrow a view is copied to a
+    temporary table first, so its query runs once for both its schema and its rows.
+    """
+    source = f'"{name}"'
+    is_view = con.execute("SELECT type FROM sqlite_master WHERE name = ?;",
+                          (name,)).fetchone()[0] == 'view'
+    new_path = path + '.new'
+    if fmt == 'csv':
+        rows, digest = write_csv(con, source, new_path, batch_rows)
+    else:
+        if is_view:
+            # the copy's columns lose their declared types, the view's are kept
+            source = 'temp.export_rows'
+            con.execute("DROP TABLE IF EXISTS temp.export_rows;")
+            con.execute(f'CREATE TEMP TABLE export_rows AS SELECT * FROM "{name}";')
+        rows = write_arrow(con, name, source, new_path, fmt, batch_rows)
+        digest = file_hash(new_path)
+        if is_view:
+            con.execute("DROP TABLE temp.export_rows;")
+    if digest == file_hash(path):
+        os.remove(new_path)
+        return rows, False
+    os.replace(new_path, path)
+    return rows, True
+
+
+def export_all(con, out_dir, fmt='parquet', names=None, batch_rows=BATCH_ROWS):
+    """
+    Writes every scraped table and view (or those in names) to out_dir/tables and
+    out_dir/views, as csv/ has them, one <name>.parquet, <name>.arrow or <name>.csv file each.
+    Returns {name: (rows, whether its file changed)}.
+    """
+    if pa is None and fmt != 'csv':
+        raise ImportError("exporting to Parquet or Arrow needs pyarrow")
+    written = {}
+    for name, kind in export_sources(con, names):
+        folder = os.path.join(out_dir, kind + 's')
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, name + FORMATS[fmt])
+        written[name] = export_table(con, name, path, fmt, batch_rows)
+    return written
+
+
+def load_table(path, columns=None):
+    """
+    A pyarrow Table of an exported file, with only columns if given. Arrow files are memory
+    mapped, their columns read in place; Parquet files are decoded, but only for columns.
+    """
+    if pa is None:
+        raise ImportError("loading Parquet or Arrow files needs pyarrow")
+    if path.endswith(FORMATS['arrow']):
+        table = pa.ipc.open_file(pa.memory_map(path, 'r')).read_all()
+        return table.select(columns) if columns is not None else table
+    return pq.read_table(path, columns=columns, memory_map=True)
@@ -0,0 +1,118 @@
+import hashlib
+import json
+import os
+import re
+import xml.etree.ElementTree as ET
+from fs_prof import timed_reader, timing
+from fs_zip import is_file, open_file
+
+# Game texts are referenced as $l10n_<key> and looked up in the l10n_<lang>.xml files, one per
+# language, as <e k="key" v="text"/> elements (or <text name="key" text="text"/> in older files).
+# Mods add theirs through a files prefix or inline <text name="key"><en>...</en></text> elements
+# in their modDesc.xml.
+
+L10N_RE = re.compile(r'\$l10n_([\w.\-]+)')
+
+
+@timing('parse')
+def read_l10n(file):
+    # {key: text} of one l10n file, streamed so only the texts stay in memory
+    texts = {}
+    with open_file(file) as f:
+        for event, elem in ET.iterparse(timed_reader(f), events=('end',)):
+            if elem.tag == 'e':
+                key, text = elem.get('k'), elem.get('v')
+            elif elem.tag == 'text' and elem.get('name') is not None:
+                key, text = elem.get('name'), elem.get('text')
+            else:
+                continue
+            if key is not None and text is not None:
+                texts.setdefault(key, text)
+            elem.clear()
+    return texts
+
+
+def l10n_files(folders, lang):
+    # the l10n_<lang>.xml files found directly in folders, in folder order
+    found = []
+    for folder in folders:
+        if folder is None:
+            continue
+        path = os.path.join(folder, f'l10n_{lang}.xml')
+        if is_file(path) and path not in found:
+            found.append(path)
+    return found
+
+
+def inline_l10n(desc, lang):
+    # {key: text} of the inline texts of a parsed modDesc <l10n> element, English when a text
+    # lacks lang as the game falls back to
+    texts = {}
+    l10n = desc.get('l10n') if isinstance(desc, dict) else None
+    if not isinstance(l10n, dict):
+        return texts
+    items = l10n.get('text')
+    for item in items if isinstance(items, list) else [items]:
+        if not isinstance(item, dict) or not item.get('@name'):
+            continue
+        text = item.get(lang, item.get('en'))
+        if isinstance(text, dict):
+            text = text.get('#text')
+        if text is not None:
+            texts.setdefault(item['@name'], text)
+    return texts
+
+
+def fingerprint(texts):
+    # changes whenever any text does, so rows resolved with other texts can be told apart
+    if not texts:
+        return None
+    return hashlib.sha1(json.dumps(sorted(texts.items())).encode('utf8')).hexdigest()
+
+
+def resolve_text(value, texts):
+    # value with every $l10n_ reference replaced by its text; unknown keys are left as they are
+    if not texts or not isinstance(value, str) or '$l10n_' not in value:
+        return value
+    return L10N_RE.sub(lambda m: texts.get(m.group(1), m.group(0)), value)
+
+
+def format_text(text, params, texts=None):
+    """
+    A %s text template filled with its | separated params, as the game builds names. With texts
+    the template and every param are resolved first and the texts they name are formatted, so
+    $l10n_shopItem_%s with $l10n_fillType_x doesn't become a key that is never found. Without
+    texts the raw template is filled with the raw params. A template that doesn't take its
+    params is left as it is.
+    """
+    if not text or not params:
+        return text
+    params = params.split('|')
+    if texts:
+        text = resolve_text(text, texts)
+        params = [resolve_text(p, texts) for p in params]
+    try:
+        return text % tuple(params)
+    except (TypeError, ValueError):
+        return text
+
+
+def resolve_rows(rows, texts, *columns, to=None):
+    """
+    Resolves columns of the rows of a list in place, or for row dicts writes the resolved text
+    to the column named to (a single column) and keeps the original. Named tuple rows are
+    replaced by resolved copies.
+    """
+    if not texts:
+        if to is not None:
+            for row in rows:
+                row[to] = None
+        return rows
+    for i, row in enumerate(rows):
+        if isinstance(row, dict):
+            for col in columns:
+                row[to or col] = resolve_text(row.get(col), texts)
+        else:
+            rows[i] = row._replace(**{col: resolve_text(getattr(row, col), texts)
+                                      for col in columns})
+    return rows
@@ -0,0 +1,236 @@
+import collections
+import concurrent.futures
+import contextlib
+import os
+import sqlite3
+import tempfile
+from fs_prof import count, timed, timing
+
+# connection settings while a stage loads; the previous values are put back when it commits
+BULK_PRAGMAS = {
+    'foreign_keys': 0,
+    'synchronous': 0,
+    'temp_store': 2,
+    'cache_size': -65536,
+}
+
+# rows a BulkLoader holds before it sends them on, so a stage's memory doesn't grow with the
+# number of files it reads
+BULK_BATCH_ROWS = 20000
+
+
+def row_key(row):
+    if isinstance(row, dict):
+        return tuple(row.items())
+    return tuple(row)
+
+
+class BulkLoader:
+    """
+    Writes everything one scrape stage produces in a single transaction. Rows are collected per
+    statement with exact duplicates dropped and sent with one executemany each, in the order the
+    statements were first added, whenever batch_rows rows are waiting and when the stage ends.
+    Duplicates further apart than a batch are left to the statement, so it should say what
+    the loader would do (INSERT OR IGNORE, OR REPLACE). Foreign keys are not enforced while
+    loading; they are checked once with foreign_key_check before the commit instead.
+
+        with BulkLoader(con) as load:
+            c.execute("DELETE FROM fill;")
+            load.add(fill_sql, fill_out)
+    """
+    def __init__(self, con, batch_rows=BULK_BATCH_ROWS):
+        self.con = con
+        self.batch_rows = batch_rows
+        self.batches = {}
+        self.waiting = 0
+        self.saved = {}
+
+    def __enter__(self):
+        # foreign_keys can't change inside a transaction
+        self.con.commit()
+        c = self.con.cursor()
+        for name, value in BULK_PRAGMAS.items():
+            self.saved[name] = c.execute(f"PRAGMA {name};").fetchone()[0]
+            c.execute(f"PRAGMA {name} = {value};")
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            if exc_type is None:
+                self.commit()
+            else:
+                self.con.rollback()
+        finally:
+            c = self.con.cursor()
+            for name, value in self.saved.items():
+                c.execute(f"PRAGMA {name} = {value};")
+        return False
+
+    def add(self, sql, rows):
+        # INSERT keeps the first of two equal rows (what OR IGNORE would), UPDATE and REPLACE
+        # the last
+        batch = self.batches.setdefault(sql, {})
+        keep_first = sql.lstrip().upper().startswith('INSERT') and 'OR REPLACE' not in sql.upper()
+        added = 0
+        for row in rows:
+            key = row_key(row)
+            if keep_first:
+                batch.setdefault(key, row)
+            else:
+                batch.pop(key, None)
+                batch[key] = row
+            added += 1
+        count('rows', added)
+        self.waiting = sum(len(b) for b in self.batches.values())
+        if self.batch_rows and self.waiting >= self.batch_rows:
+            self.flush()
+
+    @timing('write')
+    def flush(self):
+        c = self.con.cursor()
+        for sql, batch in self.batches.items():
+            c.executemany(sql, batch.values())
+        # statements keep their place for the next batch
+        self.batches = {sql: {} for sql in self.batches}
+        self.waiting = 0
+
+    def commit(self):
+        self.flush()
+        c = self.con.cursor()
+        with timed('write'):
+            bad = c.execute("PRAGMA foreign_key_check;").fetchall()
+            if bad:
+                self.con.rollback()
+                tables = sorted({f"{r[0]} -> {r[2]}" for r in bad})
+                raise sqlite3.IntegrityError(
+                    f"{len(bad)} rows fail their foreign key ({', '.join(tables)})")
+            self.con.commit()
+
+
+# most files one pool task parses, and tasks a pool keeps ahead of the one being written
+MAP_CHUNK_FILES = 32
+MAP_AHEAD_CHUNKS = 4
+
+
+def map_chunk(func, files):
+    return [func(f) for f in files]
+
+
+def map_files(func, files, jobs=1):
+    """
+    Parses files in a process pool when jobs > 1. results come back in the same order as
+    files, so the parent writes exactly the rows a serial run would. Only a few chunks per
+    worker are parsed ahead of the parent, so results waiting to be written stay bounded
+    however many files there are.
+    """
+    if jobs is not None and jobs > 1 and len(files) > 1:
+        chunksize = max(1, min(MAP_CHUNK_FILES, len(files) // (jobs * 4)))
+        chunks = iter([files[i:i + chunksize] for i in range(0, len(files), chunksize)])
+        with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as pool:
+            running = collections.deque()
+            for chunk in chunks:
+                running.append(pool.submit(map_chunk, func, chunk))
+                if len(running) >= jobs * MAP_AHEAD_CHUNKS:
+                    break
+            while running:
+                results = running.popleft().result()
+                chunk = next(chunks, None)
+                if chunk is not None:
+                    running.append(pool.submit(map_chunk, func, chunk))
+                yield from results
+    else:
+        yield from map(func, files)
+
+
+@contextlib.contextmanager
+def attached(con, path, name):
+    # the database at path attached to con as name for the duration of the block
+    con.commit()
+    con.execute(f"ATTACH DATABASE ? AS {name};", (path,))
+    try:
+        yield con
+    finally:
+        con.commit()
+        con.execute(f"DETACH DATABASE {name};")
+
+
+def copy_partitions(con, source, target, partitions):
+    """
+    Replaces the rows of each (table, where) partition in schema target by the rows of the same
+    partition in schema source, both attached to con. where is an SQL condition or None for the
+    whole table. Columns are matched by name, so a table that gained a column since the other
+    database was made still copies.
+    """
+    c = con.cursor()
+    for table, where in partitions:
+        have = {r[1] for r in c.execute(f"PRAGMA {source}.table_info({table});")}
+        cols = ', '.join(r[1] for r in c.execute(f"PRAGMA {target}.table_info({table});")
+                         if r[1] in have)
+        where = f" WHERE {where}" if where else ''
+        c.execute(f"DELETE FROM {target}.{table}{where};")
+        c.execute(f"INSERT INTO {target}.{table} ({cols}) SELECT {cols} FROM {source}.{table}"
+                  f"{where};")
+
+
+def pull_partitions(con, path, partitions):
+    """
+    Copies partitions from the database at path into the one of con in a single bulk
+    transaction. A stage's staging database is seeded from the main one this way, and merged
+    back into it.
+    """
+    with attached(con, path, 'other'):
+        with BulkLoader(con):
+            copy_partitions(con, 'other', 'main', partitions)
+
+
+def restore(con, path):
+    # replaces the contents of con (typically an in-memory database) by the database at path
+    source = sqlite3.connect(path)
+    try:
+        source.backup(con)
+    finally:
+        source.close()
+
+
+def truncate_wal(path):
+    """
+    Checkpoints the database at path into its main file and truncates its write-ahead log, so
+    no frames are left in path-wal to be replayed into a different file renamed over path.
+    """
+    if not os.path.isfile(path):
+        return
+    con = sqlite3.connect(path)
+    try:
+        con.execute("PRAGMA wal_checkpoint(TRUNCATE);")
+    finally:
+        con.close()
+
+
+def publish(con, path):
+    """
+    Writes the database of con (typically in memory) to path in one go: it is copied with the
+    backup API to a temporary file next to path, switched to WAL mode and renamed over path.
+    Readers see either the old database or the complete new one, never a partial write. A
+    reader holding a connection across the swap keeps the old file; open one per job.
+    """
+    folder = os.path.dirname(os.path.abspath(path))
+    fd, tmp_path = tempfile.mkstemp(prefix=f'.{os.path.basename(path)}.', suffix='.tmp',
+                                    dir=folder)
+    os.close(fd)
+    try:
+        con.commit()
+        out = sqlite3.connect(tmp_path)
+        try:
+            con.backup(out)
+            out.execute("PRAGMA journal_mode = WAL;")
+            out.commit()
+        finally:
+            # the last connection to close checkpoints and removes tmp_path-wal
+            out.close()
+        truncate_wal(path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        for leftover in (tmp_path, tmp_path + '-wal', tmp_path + '-shm'):
+            if os.path.isfile(leftover):
+                os.remove(leftover)
+        raise
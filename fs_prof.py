@@ -0,0 +1,133 @@
+import contextlib
+import functools
+import time
+
+# Where a scrape spends its time. While a file is profiled, reading its bytes, parsing them and
+# everything else its file_rows does (extracting rows) are timed apart; while a stage is, the
+# time its loader spends writing to SQLite and the rows it writes are counted, along with the
+# reading and parsing it does outside of profiled files. Timings are kept per process: a pool
+# worker times the files it parses and hands them back with the rows. Nothing is timed unless
+# a stage or file is being profiled.
+
+_file = None
+_stage = None
+
+
+def count(key, value):
+    # adds value to key of the file being profiled, or else the stage, if any
+    totals = _file if _file is not None else _stage
+    if totals is not None:
+        totals[key] = totals.get(key, 0) + value
+
+
+def active():
+    return _file is not None or _stage is not None
+
+
+def profiling():
+    # whether the stage running in this process is profiled
+    return _stage is not None
+
+
+def timing(key):
+    # decorator timing every call of a function as key
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with timed(key):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+
+@contextlib.contextmanager
+def timed(key):
+    if not active():
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        count(key, time.perf_counter() - start)
+
+
+class TimedReader:
+    """
+    A file object whose reads count as read time, so a streaming parser reading it as it goes
+    has its reading and parsing told apart.
+    """
+    def __init__(self, file):
+        self.file = file
+
+    def read(self, size=-1):
+        start = time.perf_counter()
+        data = self.file.read(size)
+        count('read', time.perf_counter() - start)
+        return data
+
+    def __getattr__(self, name):
+        return getattr(self.file, name)
+
+
+def timed_reader(file):
+    return TimedReader(file) if active() else file
+
+
+def profile_file(func, file):
+    """
+    Calls func(file) and returns (result, {'read', 'parse', 'extract': seconds}). parse holds
+    the parse time without the reads, extract whatever func does besides parsing.
+    """
+    global _file
+    _file = {'read': 0.0, 'parse': 0.0}
+    start = time.perf_counter()
+    try:
+        result = func(file)
+    finally:
+        timing, _file = _file, None
+    total = time.perf_counter() - start
+    timing['parse'] = max(0.0, timing['parse'] - timing['read'])
+    timing['extract'] = max(0.0, total - timing['parse'] - timing['read'])
+    return result, timing
+
+
+def start_stage():
+    global _stage
+    _stage = {'write': 0.0, 'rows': 0, 'start': time.perf_counter()}
+
+
+def stop_stage():
+    # {'seconds', 'write', 'rows', ...} of the stage started last
+    global _stage
+    totals, _stage = _stage, None
+    if totals is None:
+        return None
+    totals['seconds'] = time.perf_counter() - totals.pop('start')
+    return totals
+
+
+def slowest(rows, key, count=10):
+    return sorted(rows, key=lambda r: r[key] or 0, reverse=True)[:count]
+
+
+def profile_report(stages, files, count=10):
+    """
+    Lines with the stages, slowest first, and the count slowest files. stages and files are
+    the row dicts of the profile tables.
+    """
+    lines = [f"{'stage':<14}{'seconds':>9}{'files':>7}{'rows':>9}{'read':>8}{'parse':>8}"
+             f"{'extract':>9}{'write':>8}"]
+    for s in slowest(stages, 'seconds', len(stages)):
+        lines.append(f"{s['stage']:<14}{s['seconds']:>9.3f}{s['files'] or 0:>7}"
+                     f"{s['rows'] or 0:>9}{s['read_s'] or 0:>8.3f}{s['parse_s'] or 0:>8.3f}"
+                     f"{s['extract_s'] or 0:>9.3f}{s['write_s'] or 0:>8.3f}")
+    if files:
+        lines.append(f"Slowest {min(count, len(files))} of {len(files)} files:")
+        lines.append(f"{'seconds':>9}{'read':>8}{'parse':>8}{'extract':>9}{'write':>8}"
+                     f"{'rows':>7}  stage / file")
+        for f in slowest(files, 'seconds', count):
+            lines.append(f"{f['seconds']:>9.4f}{f['read_s']:>8.4f}{f['parse_s']:>8.4f}"
+                         f"{f['extract_s']:>9.4f}{f['write_s']:>8.4f}{f['rows']:>7}"
+                         f"  {f['stage']} / {f['path']}")
+    return lines
@@ -0,0 +1,199 @@
+import time
+
+# The profit tables of the queries file (profit_hour, animal_prod_profit_day, prod_profit and
+# point_profit) are filled from their <name>_view views once, when the queries are added, and
+# from then on refreshed row by row. The input tables the views read are kept as they were at
+# the last refresh (in scrape_profit_in_<table>); the rows that differ from that copy give the
+# points and animal types whose profit rows are stale, and only those rows are deleted and read
+# again from the views. SQLite narrows a view down to the rows asked for when they are given as
+# an IN list of values (not a subquery) and the view has no UNION but UNION ALL on the way.
+
+PROFIT_TABLES = ('profit_hour', 'animal_prod_profit_day', 'prod_profit', 'point_profit')
+
+# the forage ingredients animal_prod_profit_day_view prices FORAGE from
+FORAGE_MIX = ('DRYGRASS_WINDROW', 'SILAGE', 'STRAW')
+
+# (input table, stale keys) of the profit views: the (point_id, point_type) of the profit_hour
+# and prod_profit rows, or the animal type of the animal_prod_profit_day rows, that the changed
+# rows of the table ({rows}) make stale
+PROFIT_STALE = (
+    ('prod_point', 'point', "SELECT id, type FROM {rows}"),
+    ('production', 'point', "SELECT point_id, point_type FROM {rows}"),
+    ('prod_fill', 'point', "SELECT point_id, point_type FROM {rows}"),
+    ('placeable', 'point', "SELECT id, type FROM {rows}"),
+    ('fill', 'point', '\n'.join((
+        "SELECT point_id, point_type FROM prod_fill WHERE fill_type IN (SELECT name FROM {rows})",
+        "UNION",
+        "SELECT id, type FROM placeable WHERE fill_type IN (SELECT name FROM {rows})"
+    ))),
+    ('animal_point', 'animal', "SELECT type FROM {rows}"),
+    ('animal_capacity', 'animal', '\n'.join((
+        "SELECT type FROM animal_point WHERE id IN (SELECT point_id FROM {rows})",
+        "UNION",
+        "SELECT type FROM scrape_profit_in_animal_point WHERE id IN (SELECT point_id FROM {rows})"
+    ))),
+    ('animal_fill', 'animal', "SELECT type FROM {rows}"),
+    ('animal_price', 'animal', "SELECT type FROM {rows}"),
+    ('animal_food', 'animal', "SELECT type FROM {rows}"),
+    ('animal_food_group', 'animal', "SELECT type FROM {rows}"),
+    ('animal_food_fill', 'animal', "SELECT type FROM {rows}"),
+    ('fill', 'animal', '\n'.join((
+        "SELECT type FROM animal_food_fill WHERE fill_type IN (SELECT name FROM {rows})",
+        "   OR (fill_type = 'FORAGE' AND EXISTS (SELECT 1 FROM {rows}",
+        f"                                        WHERE name IN {FORAGE_MIX!r}))",
+        "UNION",
+        "SELECT type FROM animal_fill WHERE upper(fill_type) IN (SELECT name FROM {rows})",
+        "   OR fill_type_sub IN (SELECT name FROM {rows})"
+    ))),
+)
+
+PROFIT_INPUTS = tuple(dict.fromkeys(t for t, kind, sql in PROFIT_STALE))
+
+# the profit tables in the order they are refreshed, with the kind of stale keys of their rows
+PROFIT_KEYS = (
+    ('animal_prod_profit_day', 'animal'),
+    ('profit_hour', 'point'),
+    ('prod_profit', 'point'),
+    ('point_profit', 'point'),
+)
+
+# (column listed, rows) of the stale keys of each kind
+STALE_KEYS = {
+    'point': ('point_id', "(point_id, point_type) IN (SELECT * FROM temp.profit_stale_point)"),
+    'animal': ('type', "type IN (SELECT type FROM temp.profit_stale_animal)"),
+}
+
+# more stale keys than this are not listed, their view is read whole (older SQLite builds take
+# at most 999 parameters)
+MAX_LISTED = 900
+
+
+def columns(con, table):
+    return [r[1] for r in con.execute(f"PRAGMA table_info({table});")]
+
+
+def object_type(con, name):
+    row = con.execute("SELECT type FROM sqlite_master WHERE name = ?;", (name,)).fetchone()
+    return row[0] if row is not None else None
+
+
+def drop_profit_views(con):
+    # the profit tables were views before; the queries file drops them as tables. Left to the
+    # caller to commit, with the queries that make them again
+    c = con.cursor()
+    for name in PROFIT_TABLES:
+        if object_type(con, name) == 'view':
+            c.execute(f"DROP VIEW {name};")
+
+
+def profit_declared(con, table):
+    # whether a profit table declares every column, as the queries file makes them; one made by
+    # CREATE TABLE AS from its view has only affinities, and none for computed columns
+    return all(r[2] for r in con.execute(f"PRAGMA table_info({table});"))
+
+
+def profit_materialized(con):
+    # whether the profit tables are there to refresh, filled from their views and declared
+    return all(object_type(con, t) == 'table' and object_type(con, f'{t}_view') == 'view'
+               and profit_declared(con, t) for t in PROFIT_TABLES)
+
+
+def record_inputs(con, tables=PROFIT_INPUTS):
+    # keeps the rows of tables as the ones the profit tables are now up to date with
+    c = con.cursor()
+    for table in tables:
+        c.execute(f"DROP TABLE IF EXISTS scrape_profit_in_{table};")
+        c.execute(f"CREATE TABLE scrape_profit_in_{table} AS SELECT * FROM {table};")
+
+
+def changed_rows(con, table):
+    """
+    Fills temp.profit_changed_<table> with the rows of table added, removed or changed since
+    the profit tables were last refreshed (both versions of a changed row) and returns how many
+    there are, or None when there is no copy of the table to compare with.
+    """
+    seen = f'scrape_profit_in_{table}'
+    if object_type(con, seen) != 'table' or columns(con, seen) != columns(con, table):
+        return None
+    c = con.cursor()
+    c.execute(f"DROP TABLE IF EXISTS temp.profit_changed_{table};")
+    c.execute('\n'.join((
+        f"CREATE TEMP TABLE profit_changed_{table} AS",
+        f"SELECT * FROM (SELECT * FROM {table} EXCEPT SELECT * FROM {seen})",
+        " UNION ALL",
+        f"SELECT * FROM (SELECT * FROM {seen} EXCEPT SELECT * FROM {table});"
+    )))
+    return c.execute(f"SELECT count(*) FROM temp.profit_changed_{table};").fetchone()[0]
+
+
+def rebuild_profit(con):
+    # fills every profit table again from its view
+    c = con.cursor()
+    for table in PROFIT_TABLES:
+        c.execute(f"DELETE FROM {table};")
+        c.execute(f"INSERT INTO {table} SELECT * FROM {table}_view;")
+    record_inputs(con)
+    con.commit()
+
+
+def refresh_profit(con, full=False):
+    """
+    Brings the profit tables up to date with their input tables, rewriting only the rows of
+    the points and animal types whose input rows changed since the last refresh. Everything
+    is rebuilt with full, or when an input table has no copy to compare with (or a different
+    set of columns). Returns {'changed': input rows changed, 'points': points refreshed,
+    'animals': animal types refreshed, 'rows': profit rows written, 'full': rebuilt,
+    'seconds': ...}.
+    """
+    start = time.perf_counter()
+    c = con.cursor()
+    changed = {}
+    if not full:
+        for table in PROFIT_INPUTS:
+            changed[table] = changed_rows(con, table)
+            if changed[table] is None:
+                full = True
+                break
+    if full:
+        rebuild_profit(con)
+        rows = sum(c.execute(f"SELECT count(*) FROM {t};").fetchone()[0] for t in PROFIT_TABLES)
+        return {'changed': None, 'points': None, 'animals': None, 'rows': rows, 'full': True,
+                'seconds': time.perf_counter() - start}
+    c.execute("CREATE TEMP TABLE IF NOT EXISTS profit_stale_point "
+              "(point_id TEXT, point_type TEXT, PRIMARY KEY (point_id, point_type)) WITHOUT ROWID;")
+    c.execute("CREATE TEMP TABLE IF NOT EXISTS profit_stale_animal "
+              "(type TEXT PRIMARY KEY) WITHOUT ROWID;")
+    c.execute("DELETE FROM temp.profit_stale_point;")
+    c.execute("DELETE FROM temp.profit_stale_animal;")
+    for table, kind, sql in PROFIT_STALE:
+        if changed[table]:
+            c.execute(f"INSERT OR IGNORE INTO temp.profit_stale_{kind} "
+                      + sql.format(rows=f"temp.profit_changed_{table}") + ";")
+    # the animal points of the stale animal rows, before and after, are stale in prod_profit
+    animal_points = ("INSERT OR IGNORE INTO temp.profit_stale_point SELECT id, 'animal' "
+                     "FROM animal_prod_profit_day WHERE type IN "
+                     "(SELECT type FROM temp.profit_stale_animal);")
+    rows = 0
+    for table, kind in PROFIT_KEYS:
+        if table == 'animal_prod_profit_day':
+            c.execute(animal_points)
+        column, where = STALE_KEYS[kind]
+        keys = [r[0] for r in c.execute(f"SELECT DISTINCT {column} FROM temp.profit_stale_{kind};")]
+        if not keys:
+            continue
+        if len(keys) > MAX_LISTED:
+            keys = []
+        listed = f"{column} IN ({', '.join('?' * len(keys))}) AND " if keys else ""
+        c.execute(f"DELETE FROM {table} WHERE {where};")
+        rows += c.execute(f"INSERT INTO {table} SELECT * FROM {table}_view "
+                          f"WHERE {listed}{where};", keys).rowcount
+        if table == 'animal_prod_profit_day':
+            c.execute(animal_points)
+    points = c.execute("SELECT count(*) FROM temp.profit_stale_point;").fetchone()[0]
+    animals = c.execute("SELECT count(*) FROM temp.profit_stale_animal;").fetchone()[0]
+    record_inputs(con, [t for t, n in changed.items() if n])
+    for table in PROFIT_INPUTS:
+        c.execute(f"DROP TABLE IF EXISTS temp.profit_changed_{table};")
+    con.commit()
+    return {'changed': sum(changed.values()), 'points': points, 'animals': animals, 'rows': rows,
+            'full': False, 'seconds': time.perf_counter() - start}
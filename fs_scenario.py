@@ -0,0 +1,260 @@
+import collections
+import numpy as np
+from fs_profit import object_type
+
+# profit_hour (and the profit_index of prod_profit) for many fill price vectors at once. The
+# productions and placeables of a scrape database are compiled into one dense matrix of their
+# coefficients on the fill prices: for a production the amounts it puts out less those it takes
+# in per cycle, at the prices of fill_free (water free), and for a fill placeable the liters it
+# makes per hour, at the fill price. A matrix of price vectors times it gives the margin of
+# every row under every vector in one product; profit_hour is that margin times cycles_hour
+# less the running cost, as the view has it. What the view leaves NULL (a fill with no price,
+# a production with no priced input or output, a missing production row) is NaN here, and does
+# not depend on the prices, since a price moves but does not appear or go away.
+
+# the productions of profit_hour_view: the points and productions with an input in prod_fill
+PRODUCTIONS_SQL = '\n'.join((
+    "SELECT a.point_id, a.point_type, a.prod_id, c.name, c.cycles_hour, c.cost_hour,",
+    "       b.price point_price",
+    "  FROM (SELECT DISTINCT point_id, point_type, prod_id FROM prod_fill",
+    "         WHERE direction = 'in') a",
+    "  LEFT JOIN production c ON a.point_id = c.point_id AND a.point_type = c.point_type",
+    "        AND a.prod_id = c.id",
+    "  LEFT JOIN prod_point b ON a.point_id = b.id AND a.point_type = b.type",
+    " ORDER BY a.point_id, a.point_type, a.prod_id;"
+))
+
+PROD_FILL_SQL = "SELECT point_id, point_type, prod_id, fill_type, direction, amount FROM prod_fill;"
+
+PLACE_FILL_SQL = '\n'.join((
+    "SELECT id point_id, type point_type, lower(fill_type) prod_id, name, fill_type,",
+    "       liter_day, price point_price",
+    "  FROM placeable",
+    " WHERE liter_day IS NOT NULL",
+    " ORDER BY id, type;"
+))
+
+PLACE_DIRECT_SQL = '\n'.join((
+    "SELECT id point_id, type point_type,",
+    "       CASE WHEN category = 'generators' THEN lower('ELECTRICCHARGE') ELSE NULL END prod_id,",
+    "       name, income_hour - (price_upkeep_day/24.0) profit_hour, price point_price",
+    "  FROM placeable",
+    " WHERE income_hour IS NOT NULL",
+    " ORDER BY id, type;"
+))
+
+# the fills fill_free prices at nothing for productions
+FREE_FILLS = ('WATER',)
+
+# keys: (point_id, point_type, prod_id) of each row; names: its name; fills: the fill names of
+# the price columns; base: their prices (NaN for NULL); coef: (rows, 2 * fills) coefficients on
+# the fill_free prices and then the fill prices; known: whether the row's margin is not NULL;
+# cycles, const: profit_hour = margin * cycles + const; point_price: for cost_recoup_days
+ProfitModel = collections.namedtuple(
+    'ProfitModel', 'keys names fills base coef known cycles const point_price')
+
+
+def nan_float(value):
+    return np.nan if value is None else float(value)
+
+
+def compile_model(con):
+    """
+    The ProfitModel of the productions and placeables of a scrape database, in the rows of
+    profit_hour_view: productions, then fill placeables, then income placeables.
+    """
+    c = con.cursor()
+    fill_rows = c.execute("SELECT name, price_l FROM fill ORDER BY name;").fetchall()
+    fills = [r[0] for r in fill_rows]
+    col = {name: i for i, name in enumerate(fills)}
+    base = np.array([nan_float(r[1]) for r in fill_rows])
+    free_known = ~np.isnan(base)
+    for name in FREE_FILLS:
+        if name in col:
+            free_known[col[name]] = True
+
+    prods = c.execute(PRODUCTIONS_SQL).fetchall()
+    places = c.execute(PLACE_FILL_SQL).fetchall()
+    directs = c.execute(PLACE_DIRECT_SQL).fetchall()
+    n_rows, n_fills = len(prods) + len(places) + len(directs), len(fills)
+    coef = np.zeros((n_rows, 2 * n_fills))
+    known = np.ones(n_rows, dtype=bool)
+    cycles = np.ones(n_rows)
+    const = np.zeros(n_rows)
+    point_price = np.empty(n_rows)
+    keys, names = [], []
+
+    # productions: out less in per cycle, both sums NULL without a priced row
+    row = {}
+    for i, (point_id, point_type, prod_id, name, cycles_hour, cost_hour, price) in enumerate(prods):
+        row[(point_id, point_type, prod_id)] = i
+        keys.append((point_id, point_type, prod_id))
+        names.append(name)
+        cycles[i] = nan_float(cycles_hour)
+        const[i] = -nan_float(cost_hour)
+        point_price[i] = nan_float(price)
+    priced = {'in': np.zeros(n_rows, dtype=bool), 'out': np.zeros(n_rows, dtype=bool)}
+    for point_id, point_type, prod_id, fill_type, direction, amount in c.execute(PROD_FILL_SQL):
+        i = row.get((point_id, point_type, prod_id))
+        if i is None or direction not in priced or fill_type not in col or amount is None:
+            continue
+        j = col[fill_type]
+        if free_known[j]:
+            coef[i, j] += amount if direction == 'out' else -amount
+            priced[direction][i] = True
+    known[:len(prods)] = priced['in'][:len(prods)] & priced['out'][:len(prods)]
+
+    # fill placeables: liters per hour at the fill price, no running cost
+    for i, (point_id, point_type, prod_id, name, fill_type, liter_day, price) in enumerate(
+            places, len(prods)):
+        keys.append((point_id, point_type, prod_id))
+        names.append(name)
+        point_price[i] = nan_float(price)
+        j = col.get(fill_type)
+        if j is None or np.isnan(base[j]):
+            known[i] = False
+        else:
+            coef[i, n_fills + j] = liter_day / 24
+
+    # income placeables: a profit the prices don't move
+    for i, (point_id, point_type, prod_id, name, profit_hour, price) in enumerate(
+            directs, len(prods) + len(places)):
+        keys.append((point_id, point_type, prod_id))
+        names.append(name)
+        const[i] = nan_float(profit_hour)
+        point_price[i] = nan_float(price)
+
+    return ProfitModel(keys, names, fills, base, coef, known, cycles, const, point_price)
+
+
+def price_matrix(model, prices):
+    # the (scenarios, 2 * fills) fill_free and fill prices of the (scenarios, fills) prices
+    prices = np.atleast_2d(prices)
+    free = prices.copy()
+    for name in FREE_FILLS:
+        if name in model.fills:
+            free[:, model.fills.index(name)] = 0
+    return np.nan_to_num(np.hstack((free, prices)), nan=0.0)
+
+
+def evaluate(model, prices):
+    """
+    {'profit_hour': ..., 'cost_recoup_days': ..., 'profit_index': ...} of every row of model
+    under each of the (scenarios, fills) price vectors, as (scenarios, rows) arrays with NaN
+    where the views have NULL.
+    """
+    margin = price_matrix(model, prices) @ model.coef.T
+    with np.errstate(divide='ignore', invalid='ignore'):
+        profit_hour = np.where(model.known, margin * model.cycles + model.const, np.nan)
+        # SQLite divides by zero to NULL
+        recoup = np.where(profit_hour != 0, model.point_price / profit_hour / 24, np.nan)
+        index = np.where(recoup != 0, profit_hour * 24 / np.abs(recoup), np.nan)
+    return {'profit_hour': profit_hour, 'cost_recoup_days': recoup, 'profit_index': index}
+
+
+def price_scenarios(model, n, spread=0.2, seed=None):
+    # n price vectors with each fill price moved by up to +-spread of itself, independently
+    rng = np.random.default_rng(seed)
+    return model.base * rng.uniform(1 - spread, 1 + spread, (n, len(model.fills)))
+
+
+def ranks(values):
+    # rank of every row (1 the highest) in each scenario, NaN rows unranked (0)
+    order = np.argsort(-np.nan_to_num(values, nan=-np.inf), axis=1, kind='stable')
+    out = np.empty(values.shape, dtype=np.int32)
+    np.put_along_axis(out, order, np.arange(1, values.shape[1] + 1, dtype=np.int32), axis=1)
+    out[np.isnan(values)] = 0
+    return out
+
+
+def scenario_stats(model, prices, rank_by='profit_hour', top=10, chunk=1000):
+    """
+    The distribution of profit_hour and of the rank by rank_by ('profit_hour' or
+    'profit_index') of every row of model over the (scenarios, fills) prices, evaluated chunk
+    scenarios at a time. Returns ({column: (rows,) array}, {'scenarios': ..., 'rank_rho':
+    mean Spearman correlation of the scenario rankings with the base one}). Per row: profit
+    at the base prices, its mean, standard deviation, 5th, 50th and 95th percentiles and the
+    share of scenarios it loses money in; its rank at the base prices, mean, best and worst
+    rank and the share of scenarios it ranks in the top top.
+    """
+    n = len(prices)
+    rows = len(model.keys)
+    base = evaluate(model, model.base)
+    base_rank = ranks(base[rank_by])[0]
+    profit = np.empty((n, rows))
+    rank_sum = np.zeros(rows)
+    rank_best = np.full(rows, rows + 1, dtype=np.int32)
+    rank_worst = np.zeros(rows, dtype=np.int32)
+    in_top = np.zeros(rows)
+    rho_sum = 0.0
+    ranked = base_rank > 0
+    for start in range(0, n, chunk):
+        result = evaluate(model, prices[start:start + chunk])
+        profit[start:start + chunk] = result['profit_hour']
+        r = ranks(result[rank_by])
+        rank_sum += r.sum(axis=0)
+        rank_best = np.minimum(rank_best, np.where(r > 0, r, rows + 1).min(axis=0))
+        rank_worst = np.maximum(rank_worst, r.max(axis=0))
+        in_top += ((r > 0) & (r <= top)).sum(axis=0)
+        # Spearman over the rows ranked at the base prices and in the scenario
+        both = ranked & (r > 0)
+        m = both.sum(axis=1)
+        d2 = (np.where(both, r - base_rank, 0).astype(np.float64) ** 2).sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            rho_sum += np.nansum(1 - 6 * d2 / (m * (m ** 2 - 1.0)))
+    unranked = ~ranked
+    with np.errstate(invalid='ignore'):
+        pct = np.percentile(profit, (5, 50, 95), axis=0)
+        stats = {
+            'profit_hour': base['profit_hour'][0],
+            'profit_mean': profit.mean(axis=0),
+            'profit_std': profit.std(axis=0),
+            'profit_p5': pct[0], 'profit_p50': pct[1], 'profit_p95': pct[2],
+            'loss_share': np.where(np.isnan(profit[0]), np.nan, (profit < 0).mean(axis=0)),
+            'rank': np.where(unranked, np.nan, base_rank),
+            'rank_mean': np.where(unranked, np.nan, rank_sum / n),
+            'rank_best': np.where(unranked, np.nan, rank_best),
+            'rank_worst': np.where(unranked, np.nan, rank_worst),
+            'top_share': np.where(unranked, np.nan, in_top / n),
+        }
+    return stats, {'scenarios': n, 'rank_rho': rho_sum / n if n else np.nan}
+
+
+def check_views(con, model, rtol=1e-9):
+    """
+    The rows whose profit_hour or cost_recoup_days at the base prices differ from
+    profit_hour_view (profit_hour in a database from before the profit tables), or whose
+    profit_index differs from prod_profit, as (key, column, view, engine) tuples; NULL matches
+    NaN, and rows missing on either side are listed with None.
+    """
+    view = 'profit_hour_view' if object_type(con, 'profit_hour_view') == 'view' else 'profit_hour'
+    base = evaluate(model, model.base)
+    mine = {k: i for i, k in enumerate(model.keys)}
+    wrong = []
+
+    def compare(key, column, value):
+        i = mine.get(key)
+        if i is None:
+            wrong.append((key, column, value, None))
+            return
+        ours = base[column][0, i]
+        if value is None:
+            if not np.isnan(ours):
+                wrong.append((key, column, None, ours))
+        elif not np.isclose(ours, value, rtol=rtol, atol=0):
+            wrong.append((key, column, value, ours))
+
+    seen = set()
+    for point_id, point_type, prod_id, profit_hour, recoup in con.execute(
+            "SELECT point_id, point_type, prod_id, profit_hour, cost_recoup_days "
+            f"FROM {view};"):
+        seen.add((point_id, point_type, prod_id))
+        compare((point_id, point_type, prod_id), 'profit_hour', profit_hour)
+        compare((point_id, point_type, prod_id), 'cost_recoup_days', recoup)
+    for point_id, point_type, prod_id, index in con.execute(
+            "SELECT point_id, point_type, prod_id, profit_index FROM prod_profit "
+            "WHERE point_type != 'animal';"):
+        compare((point_id, point_type, prod_id), 'profit_index', index)
+    wrong += [(k, 'profit_hour', None, base['profit_hour'][0, i])
+              for k, i in mine.items() if k not in seen]
+    return wrong
@@ -0,0 +1,152 @@
+import collections
+import concurrent.futures
+import time
+
+# a unit of work for schedule. after names the stages whose results it needs (and so must finish
+# first), outputs the (table, where) partitions of the database it writes, where being None for
+# the whole table. Stages with overlapping outputs must depend on each other.
+Stage = collections.namedtuple('Stage', 'name after outputs', defaults=((), ()))
+
+# when a stage ran, in time.time() seconds so values from worker processes compare
+Timing = collections.namedtuple('Timing', 'start end merged')
+
+
+def check_stages(stages):
+    """
+    Raises ValueError for unknown or circular dependencies and for stages that write the same
+    partition without one of them coming after the other.
+    """
+    by_name = {s.name: s for s in stages}
+    for s in stages:
+        for dep in s.after:
+            if dep not in by_name:
+                raise ValueError(f"stage {s.name} comes after unknown stage {dep}")
+
+    ancestors = {}
+
+    def ancestors_of(name, path=()):
+        if name in path:
+            raise ValueError(f"stage dependency loop: {' > '.join(path + (name,))}")
+        if name not in ancestors:
+            found = set()
+            for dep in by_name[name].after:
+                found |= {dep} | ancestors_of(dep, path + (name,))
+            ancestors[name] = found
+        return ancestors[name]
+
+    for s in stages:
+        ancestors_of(s.name)
+    for i, a in enumerate(stages):
+        for b in stages[i + 1:]:
+            if a.name in ancestors[b.name] or b.name in ancestors[a.name]:
+                continue
+            for table, where in a.outputs:
+                for other_table, other_where in b.outputs:
+                    if table == other_table and (where is None or other_where is None
+                                                 or where == other_where):
+                        raise ValueError(f"stages {a.name} and {b.name} both write {table}"
+                                         f"{' WHERE ' + where if where else ''}")
+
+
+def _timed(run, name, deps):
+    start = time.time()
+    result = run(name, deps)
+    return start, time.time(), result
+
+
+def schedule(stages, run, merge=None, workers=1):
+    """
+    Runs every stage as soon as the stages it comes after are done, at most workers at a time.
+    run(name, deps) does the work of a stage and gets the results of its dependencies as a
+    {name: result} dict; with workers > 1 it runs in a process pool, so it has to be picklable
+    and its result too. merge(name, result), if given, is called in this process as each stage
+    finishes, one at a time, e.g. to copy a stage's staging database into the main one.
+
+    Returns {name: (Timing, result)}. The first stage to fail cancels what hasn't started and
+    its exception is raised once the running stages are done.
+    """
+    check_stages(stages)
+    pending = list(stages)
+    done = {}
+
+    def ready():
+        for s in pending:
+            if all(d in done for d in s.after):
+                yield s
+
+    def finish(s, start, end, result):
+        if merge is not None:
+            merge(s.name, result)
+        done[s.name] = (Timing(start, end, time.time()), result)
+
+    if workers is None or workers <= 1:
+        while pending:
+            s = next(ready())
+            pending.remove(s)
+            finish(s, *_timed(run, s.name, {d: done[d][1] for d in s.after}))
+        return done
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        running = {}
+        while pending or running:
+            for s in list(ready()):
+                if len(running) >= workers:
+                    break
+                pending.remove(s)
+                deps = {d: done[d][1] for d in s.after}
+                running[pool.submit(_timed, run, s.name, deps)] = s
+            finished, _ = concurrent.futures.wait(
+                running, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in finished:
+                s = running.pop(future)
+                try:
+                    finish(s, *future.result())
+                except BaseException:
+                    for other in running:
+                        other.cancel()
+                    raise
+    return done
+
+
+def critical_path(stages, timings):
+    """
+    The chain of dependent stages with the longest total run time, the one that bounds the
+    whole schedule however many workers there are. Returns (stage names, seconds).
+    """
+    by_name = {s.name: s for s in stages}
+    best = {}
+
+    def longest(name):
+        if name not in best:
+            timing = timings[name][0]
+            own = timing.end - timing.start
+            chain, seconds = [], 0.0
+            for dep in by_name[name].after:
+                dep_chain, dep_seconds = longest(dep)
+                if dep_seconds > seconds:
+                    chain, seconds = dep_chain, dep_seconds
+            best[name] = (chain + [name], seconds + own)
+        return best[name]
+
+    paths = [longest(s.name) for s in stages if s.name in timings]
+    return max(paths, key=lambda p: p[1], default=([], 0.0))
+
+
+def schedule_report(stages, timings):
+    # lines describing when each stage ran, relative to the first start, and the critical path
+    if not timings:
+        return []
+    t0 = min(t.start for t, result in timings.values())
+    t1 = max(t.merged for t, result in timings.values())
+    lines = [f"{'stage':<14}{'start':>8}{'end':>8}{'seconds':>9}{'merge':>8}"]
+    for s in sorted(stages, key=lambda s: timings[s.name][0].start if s.name in timings else 0):
+        if s.name not in timings:
+            continue
+        t = timings[s.name][0]
+        lines.append(f"{s.name:<14}{t.start - t0:>8.2f}{t.end - t0:>8.2f}"
+                     f"{t.end - t.start:>9.2f}{t.merged - t.end:>8.2f}")
+    chain, seconds = critical_path(stages, timings)
+    lines.append(f"Critical path {seconds:.2f} s of {t1 - t0:.2f} s: "
+                 + ' > '.join(f"{n} ({timings[n][0].end - timings[n][0].start:.2f} s)"
+                              for n in chain))
+    return lines
@@ -0,0 +1,159 @@
+import collections
+import glob
+import os
+
+# a column of a spec table. path is read from the current row element:
+#   'growth@regrows'            attribute of a child element
+#   'storeData.price'           text of a child element
+#   '@name', '#text'            attribute or text of the row element itself
+#   '^@name'                    each leading ^ steps out to the enclosing row element
+#   ('a@x', 'b@x')              the first path whose element exists
+#   None                        no path, the column is always default
+# convert is applied to the raw string (tryint, tryfloat, trybool...) and default replaces a
+# None result when the element itself exists, e.g. an attribute the game leaves off.
+Col = collections.namedtuple('Col', 'name path convert default', defaults=(None, None, None))
+
+
+def as_list(value):
+    # xmltodict style trees hold a single child as a dict and repeated ones as a list
+    if value is None:
+        return []
+    if isinstance(value, list):
+        return value
+    return [value]
+
+
+def compile_path(path):
+    """
+    Turns a column path into a function of the row element stack returning (element found,
+    raw value).
+    """
+    if isinstance(path, tuple):
+        getters = [compile_path(p) for p in path]
+
+        def get_first(stack):
+            for get in getters:
+                found, value = get(stack)
+                if found:
+                    return found, value
+            return False, None
+        return get_first
+
+    up = len(path) - len(path.lstrip('^'))
+    path = path.lstrip('^')
+    attr = None
+    for mark in ('@', '#'):
+        if mark in path:
+            path, attr = path.split(mark, 1)
+            attr = mark + attr
+            break
+    keys = tuple(k for k in path.split('.') if k)
+
+    def get(stack):
+        node = stack[-1 - up]
+        for k in keys:
+            if not isinstance(node, dict):
+                return False, None
+            node = node.get(k)
+        if node is None or isinstance(node, list):
+            return False, None
+        if attr is None:
+            return True, node
+        if isinstance(node, dict):
+            return True, node.get(attr)
+        return True, node if attr == '#text' else None
+    return get
+
+
+def compile_rows(path):
+    keys = tuple(k for k in path.split('.') if k)
+
+    def rows(node):
+        for k in keys:
+            if not isinstance(node, dict):
+                return []
+            node = node.get(k)
+        return as_list(node)
+    return rows
+
+
+class Table:
+    """
+    Declarative extraction of one database table from a parsed xml tree. rows is the element
+    path (from the document root) of the elements that become rows, or a tuple of paths for
+    nested lists, each relative to the previous level. when names a path that must exist on the
+    row element for it to produce a row. source is the glob of the files the table is read from,
+    relative to the game (or dataS) folder, for tables with fixed sources.
+
+    The paths are compiled once when the spec is built, extract only walks the tree.
+    """
+    def __init__(self, name, rows, columns, when=None, source=None):
+        self.name = name
+        self.rows = (rows,) if isinstance(rows, str) else tuple(rows)
+        self.columns = tuple(columns)
+        self.when = when
+        self.source = source
+        self._levels = [compile_rows(p) for p in self.rows]
+        self._when = compile_path(when) if when else None
+        self._getters = [(c.name, compile_path(c.path) if c.path is not None else None,
+                          c.convert, c.default) for c in self.columns]
+
+    def sections(self):
+        # top level children of the root the table reads, for parse_sections
+        root = self.rows[0].split('.')
+        if len(root) > 1:
+            return {root[1]}
+        names = set()
+        for c in self.columns + (Col(None, self.when),):
+            for p in c.path if isinstance(c.path, tuple) else (c.path,):
+                if p and not p.startswith('^'):
+                    first = p.split('.')[0].split('@')[0].split('#')[0]
+                    if first:
+                        names.add(first)
+        return names
+
+    def files(self, base_dir):
+        return sorted(glob.glob(os.path.join(base_dir, self.source), recursive=True))
+
+    def extract(self, tree, **fixed):
+        """
+        Rows of the table found in tree as dicts. fixed holds columns that come from outside
+        the xml (file name, point type...) and is copied into every row.
+        """
+        out = []
+        getters = self._getters
+        last = len(self._levels) - 1
+
+        def walk(stack, level):
+            for elem in self._levels[level](stack[-1]):
+                elem_stack = stack + [elem]
+                if level < last:
+                    walk(elem_stack, level + 1)
+                    continue
+                if self._when is not None and not self._when(elem_stack)[0]:
+                    continue
+                row = dict(fixed)
+                for name, get, convert, default in getters:
+                    if get is None:
+                        row[name] = default
+                        continue
+                    found, value = get(elem_stack)
+                    if convert is not None:
+                        value = convert(value)
+                    if value is None and found:
+                        value = default
+                    row[name] = value
+                out.append(row)
+        walk([tree], 0)
+        return out
+
+    def records(self, tree, record, **fixed):
+        # the rows of extract as record named tuples, e.g. to keep many files' rows compact
+        return [record(**row) for row in self.extract(tree, **fixed)]
+
+
+def spec_sections(*tables):
+    sections = set()
+    for table in tables:
+        sections |= table.sections()
+    return tuple(sorted(sections))
@@ -0,0 +1,181 @@
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import sys
+import time
+from fs_zip import split_zip
+
+# Watches folders (and single files, such as a zip archive or the queries file) for changes.
+# On Linux the kernel's inotify reports them through ctypes; elsewhere, or when inotify can't be
+# had (no libc, out of watches), the files are polled for size and mtime changes instead.
+
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_DELETE_SELF = 0x00000400
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = (IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE
+              | IN_DELETE | IN_DELETE_SELF)
+EVENT = struct.Struct('iIII')
+
+
+def watch_root(path):
+    # the folder or file on disk to watch for path, which may lead into a zip archive
+    archive, member = split_zip(path)
+    return os.path.normpath(archive if archive is not None else path)
+
+
+class PollWatcher:
+    """
+    Finds changed files by comparing the size and mtime of every file under the roots with the
+    last look, every interval seconds.
+    """
+    def __init__(self, roots, interval=0.5):
+        self.roots = [watch_root(r) for r in roots]
+        self.interval = interval
+        self.seen = self.snapshot()
+
+    def snapshot(self):
+        seen = {}
+        for root in self.roots:
+            if os.path.isfile(root):
+                walk = [(os.path.dirname(root), [], [os.path.basename(root)])]
+            else:
+                walk = os.walk(root)
+            for folder, dirs, files in walk:
+                for name in files:
+                    path = os.path.join(folder, name)
+                    try:
+                        st = os.stat(path)
+                    except OSError:
+                        continue
+                    seen[path] = (st.st_size, st.st_mtime_ns)
+        return seen
+
+    def poll(self, timeout):
+        # changed, added and removed paths after waiting up to timeout seconds
+        time.sleep(min(timeout, self.interval) if timeout is not None else self.interval)
+        seen = self.snapshot()
+        changed = {p for p in seen.keys() | self.seen.keys() if seen.get(p) != self.seen.get(p)}
+        self.seen = seen
+        return changed
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """
+    Changed paths from inotify. Every folder below the roots gets a watch, folders created
+    later included; a root that is a file is watched through its folder.
+    """
+    def __init__(self, roots):
+        libc_name = ctypes.util.find_library('c')
+        if not sys.platform.startswith('linux') or libc_name is None:
+            raise OSError("inotify is only available on Linux")
+        self.libc = ctypes.CDLL(libc_name, use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.folders = {}
+        self.files = {}
+        try:
+            for root in (watch_root(r) for r in roots):
+                if os.path.isfile(root):
+                    self.files.setdefault(os.path.dirname(root), set()).add(root)
+                    self.add(os.path.dirname(root))
+                else:
+                    self.add_tree(root)
+        except OSError:
+            self.close()
+            raise
+
+    def add(self, folder):
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(folder), WATCH_MASK)
+        if wd < 0:
+            err = ctypes.get_errno()
+            if err in (errno.ENOENT, errno.ENOTDIR):
+                return
+            raise OSError(err, f"inotify_add_watch failed for {folder}: {os.strerror(err)}")
+        self.folders[wd] = folder
+
+    def add_tree(self, root):
+        # watches root and the folders below it, returning the files found in them
+        found = set()
+        for folder, dirs, files in os.walk(root):
+            self.add(folder)
+            found |= {os.path.join(folder, f) for f in files}
+        return found
+
+    def poll(self, timeout):
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        data = os.read(self.fd, 1 << 16)
+        changed = set()
+        offset = 0
+        while offset + EVENT.size <= len(data):
+            wd, mask, cookie, length = EVENT.unpack_from(data, offset)
+            name = data[offset + EVENT.size:offset + EVENT.size + length].rstrip(b'\0')
+            offset += EVENT.size + length
+            if mask & IN_Q_OVERFLOW:
+                # events were dropped, every watched file may have changed
+                changed |= set(self.folders.values())
+                continue
+            folder = self.folders.get(wd)
+            if mask & IN_IGNORED:
+                self.folders.pop(wd, None)
+                continue
+            if folder is None or not name:
+                continue
+            path = os.path.join(folder, os.fsdecode(name))
+            if folder in self.files and path not in self.files[folder]:
+                continue
+            changed.add(path)
+            if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                # a folder created or moved in: its files predate its watch
+                changed |= self.add_tree(path)
+        return changed
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def make_watcher(roots, poll=False, interval=0.5):
+    # an InotifyWatcher unless poll is set or inotify isn't available here
+    if not poll:
+        try:
+            return InotifyWatcher(roots)
+        except OSError as error:
+            print(f"inotify unavailable ({error}), polling every {interval} s")
+    return PollWatcher(roots, interval)
+
+
+def watch_changes(watcher, debounce=0.25):
+    """
+    Yields the sets of paths that changed, each once no more changes came in for debounce
+    seconds, so an editor's save (write, rename, touch) or a copied folder arrive as one set.
+    """
+    while True:
+        changed = watcher.poll(None)
+        if not changed:
+            continue
+        while True:
+            more = watcher.poll(debounce)
+            if not more:
+                break
+            changed |= more
+        yield changed
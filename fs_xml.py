@@ -0,0 +1,231 @@
+import copy
+import functools
+import os
+import xml.etree.ElementTree as ET
+from fs_prof import timed_reader, timing
+from fs_zip import is_file, open_file, walk_files
+
+
+def element_dict(elem):
+    """
+    Converts an element into the same structure xmltodict.parse gives: attributes as '@name',
+    text as '#text' (or the bare string when there is nothing else), repeated children as lists
+    and empty elements as None.
+    """
+    d = {}
+    for k, v in elem.attrib.items():
+        d['@' + k] = v
+    text = [elem.text] if elem.text else []
+    for child in elem:
+        value = element_dict(child)
+        if child.tag in d:
+            if isinstance(d[child.tag], list):
+                d[child.tag].append(value)
+            else:
+                d[child.tag] = [d[child.tag], value]
+        else:
+            d[child.tag] = value
+        if child.tail:
+            text.append(child.tail)
+    text = ''.join(text).strip()
+    if not d:
+        return text or None
+    if text:
+        d['#text'] = text
+    return d
+
+
+def iter_events(file):
+    # iterparse start/end events of a file on disk or inside a zip archive
+    with open_file(file) as f:
+        yield from ET.iterparse(timed_reader(f), events=('start', 'end'))
+
+
+@timing('parse')
+def parse_sections(file, sections):
+    """
+    Streams an xml file and returns {root tag: root dict} like xmltodict.parse, except only the
+    root attributes and the top level children named in sections are kept. Everything else is
+    dropped element by element while parsing, so i3d mappings, sounds, animations and the like
+    never build up in memory.
+    """
+    sections = set(sections)
+    root = None
+    root_d = {}
+    stack = []
+    keep = False
+    for event, elem in iter_events(file):
+        if event == 'start':
+            if root is None:
+                root = elem
+                for k, v in elem.attrib.items():
+                    root_d['@' + k] = v
+            elif len(stack) == 1:
+                keep = elem.tag in sections
+            stack.append(elem)
+            continue
+        stack.pop()
+        if len(stack) == 1:
+            if keep:
+                value = element_dict(elem)
+                if elem.tag in root_d:
+                    if isinstance(root_d[elem.tag], list):
+                        root_d[elem.tag].append(value)
+                    else:
+                        root_d[elem.tag] = [root_d[elem.tag], value]
+                else:
+                    root_d[elem.tag] = value
+            root.remove(elem)
+        elif len(stack) > 1 and not keep:
+            stack[-1].remove(elem)
+    if root is None:
+        return {}
+    return {root.tag: root_d or None}
+
+
+def nested_set(dic, keys, value):
+    for key in keys[:-1]:
+        if not isinstance(dic[key], dict):
+            v = dic[key]
+            dic[key] = {'#text': v}
+        dic = dic.setdefault(key, {})
+    dic[keys[-1]] = value
+
+
+def parent_path(game_dir, xml_filename, mod_dir=None):
+    # file links are relative to the game folder with $data standing for data, except in a mod
+    # where links without the $ are relative to the mod's own folder
+    if mod_dir is not None and not xml_filename.startswith('$'):
+        return os.path.normpath(os.path.join(mod_dir, xml_filename))
+    return os.path.normpath(os.path.join(game_dir, xml_filename.replace('$', '')))
+
+
+_resolving = set()
+
+
+@functools.lru_cache(maxsize=256)
+def resolved_file(path, game_dir, key, sections, mod_dir=None):
+    """
+    The key element of path merged over its own parentFile chain. Cached per path, so a base
+    file shared by many variants is parsed once per process; callers must copy before changing
+    the result.
+    """
+    if path in _resolving:
+        raise ValueError(f"parentFile loop at {path}")
+    _resolving.add(path)
+    try:
+        return resolve_parents(parse_sections(path, sections).get(key), game_dir, key, sections,
+                               mod_dir)
+    finally:
+        _resolving.discard(path)
+
+
+def resolve_parents(node, game_dir, key, sections, mod_dir=None):
+    """
+    Applies a parentFile link the way the game does: the parent (itself resolved) is copied,
+    the top level tags of node replace the parent's and the attributes/set entries are written
+    over the result. Sets aimed at sections that were not parsed are skipped.
+    """
+    if not isinstance(node, dict) or not isinstance(node.get('parentFile'), dict):
+        return node
+    link = node['parentFile']
+    parent = resolved_file(parent_path(game_dir, link.get('@xmlFilename'), mod_dir), game_dir,
+                           key, sections, mod_dir)
+    if not isinstance(parent, dict):
+        return node
+    parent = copy.deepcopy(parent)
+    for k in node.keys():
+        parent[k] = node[k]
+    child_attrs = link.get('attributes')
+    if child_attrs:
+        set_list = child_attrs.get('set')
+        if isinstance(set_list, dict):
+            set_list = [set_list]
+        for s in set_list or ():
+            path_keys = s.get('@path').replace('#', '.@').split('.')[1:]
+            if len(path_keys) > 1 and path_keys[0] not in parent:
+                continue
+            nested_set(dic=parent, keys=path_keys, value=s.get('@value'))
+    return parent
+
+
+def parse_resolved(file, game_dir, sections, key='placeable', mod_dir=None):
+    """
+    parse_sections for files whose key element may inherit from a parentFile, with the whole
+    chain merged in. mod_dir is the folder of the mod that file belongs to, if any.
+    """
+    sections = tuple(sections)
+    if 'parentFile' not in sections:
+        sections += ('parentFile',)
+    d = parse_sections(file, sections)
+    if key in d:
+        d[key] = resolve_parents(d[key], game_dir, key, sections, mod_dir)
+    return d
+
+
+def sniff_xml(file):
+    """
+    (root tag, root type attribute, parentFile xmlFilename, top level child tags) of an xml
+    file, without keeping any of the tree. Files that don't parse give None.
+    """
+    root = None
+    parent = None
+    tags = set()
+    depth = 0
+    try:
+        for event, elem in iter_events(file):
+            if event == 'start':
+                depth += 1
+                if depth == 1:
+                    root = elem
+                elif depth == 2:
+                    tags.add(elem.tag)
+                    if elem.tag == 'parentFile':
+                        parent = elem.get('xmlFilename')
+                continue
+            depth -= 1
+            if depth == 1:
+                root.remove(elem)
+    except ET.ParseError:
+        return None
+    if root is None:
+        return None
+    return root.tag, root.get('type'), parent, tags
+
+
+def route_placeables(files, game_dir, routes, mod_dir=None):
+    """
+    Sorts placeable xml files into routes, a dict of route name to the top level tags (or
+    placeable types) that send a file there. The first route that matches wins. A file with a
+    parentFile is routed by the tags and type of its whole chain, so variants land with their
+    base file. Returns {route: file list}, in the order of files.
+    """
+    sniffed = {}
+
+    def chain(path, seen=()):
+        if path not in sniffed:
+            sniffed[path] = sniff_xml(path) if is_file(path) else None
+        info = sniffed[path]
+        if info is None or info[0] != 'placeable':
+            return None, set()
+        tag, place_type, parent, tags = info
+        if parent and path not in seen:
+            parent_type, parent_tags = chain(parent_path(game_dir, parent, mod_dir),
+                                             seen + (path,))
+            return place_type or parent_type, tags | parent_tags
+        return place_type, tags
+
+    index = {route: [] for route in routes}
+    for path in files:
+        place_type, tags = chain(path)
+        for route, keys in routes.items():
+            if place_type in keys or tags.intersection(keys):
+                index[route].append(path)
+                break
+    return index
+
+
+def placeable_index(game_dir, routes):
+    # walks data/placeables once and routes every placeable xml, see route_placeables
+    return route_placeables(walk_files(os.path.join(game_dir, 'data', 'placeables'), '.xml'),
+                            game_dir, routes)
@@ -0,0 +1,100 @@
+import functools
+import os
+import zipfile
+
+# A zip archive anywhere in a path is treated like a folder, so a game folder, dataS folder or
+# mod can be given as some.zip (or some.zip/inner/folder) and every path built from it, including
+# $data and parentFile links, points inside the archive. Members are streamed from the archive
+# handle straight into the parser; nothing is extracted to disk.
+
+
+def split_zip(path):
+    """
+    (archive path, member name) for a path that goes through a zip archive, (None, path)
+    otherwise.
+    """
+    parts = os.path.normpath(path).split(os.sep)
+    for i, part in enumerate(parts):
+        if part.lower().endswith('.zip'):
+            archive = os.sep.join(parts[:i + 1]) or os.sep
+            if os.path.isfile(archive):
+                return archive, '/'.join(parts[i + 1:])
+    return None, path
+
+
+@functools.lru_cache(maxsize=256)
+def _open_archive(path, mtime, size, pid):
+    # the central directory is read once per archive version; size and mtime are part of the key
+    # so a replaced archive is opened again, and the pid so forked workers don't share (and
+    # seek) the parent's file handle
+    zf = zipfile.ZipFile(path)
+    return zf, {i.filename.rstrip('/'): i for i in zf.infolist()}
+
+
+def open_archive(path):
+    st = os.stat(path)
+    return _open_archive(path, st.st_mtime, st.st_size, os.getpid())
+
+
+def open_file(path):
+    archive, member = split_zip(path)
+    if archive is None:
+        return open(path, 'rb')
+    zf, infos = open_archive(archive)
+    if member not in infos:
+        raise FileNotFoundError(path)
+    return zf.open(infos[member])
+
+
+def is_file(path):
+    archive, member = split_zip(path)
+    if archive is None:
+        return os.path.isfile(path)
+    if not member:
+        return False
+    info = open_archive(archive)[1].get(member)
+    return info is not None and not info.is_dir()
+
+
+def file_stat(path):
+    """(size, mtime) of a file. Members of an archive take the archive's mtime."""
+    archive, member = split_zip(path)
+    if archive is None:
+        st = os.stat(path)
+        return st.st_size, st.st_mtime
+    info = open_archive(archive)[1].get(member)
+    if info is None:
+        raise FileNotFoundError(path)
+    return info.file_size, os.stat(archive).st_mtime
+
+
+def walk_files(folder, ext):
+    """
+    Every file ending in ext below folder, descending into zip archives found on the way (and
+    into folder itself when it is, or is inside, an archive).
+    """
+    ext = ext.lower()
+    found = []
+    archive, member = split_zip(folder)
+    if archive is not None:
+        prefix = member + '/' if member else ''
+        for name, info in open_archive(archive)[1].items():
+            if name.startswith(prefix) and not info.is_dir() and name.lower().endswith(ext):
+                found.append(os.path.join(archive, *name.split('/')))
+        return sorted(found)
+    stack = [folder]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+        with entries:
+            for entry in entries:
+                name = entry.name.lower()
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif name.endswith(ext):
+                    found.append(entry.path)
+                elif name.endswith('.zip') and zipfile.is_zipfile(entry.path):
+                    found.extend(walk_files(entry.path, ext))
+    return sorted(found)
@@ -0,0 +1,91 @@
+import sys
+import csv
+import time
+import argparse
+import sqlite3 as sqlite
+import numpy as np
+from fs_scenario import compile_model, check_views, price_scenarios, scenario_stats
+
+# Monte Carlo of the fill prices of a scrape database (fs25, prod25.sql): every price moved at
+# random, independently, profit_hour of every production and placeable recomputed by
+# fs_scenario for thousands of price vectors at once, and how far each row's profit and rank
+# move reported. The engine is checked against the views at the base prices first. Animals
+# are left out, their prices go through the animal simulator.
+
+COLUMNS = ('profit_hour', 'profit_mean', 'profit_std', 'profit_p5', 'profit_p50', 'profit_p95',
+           'loss_share', 'rank', 'rank_mean', 'rank_best', 'rank_worst', 'top_share')
+
+
+def csv_number(value):
+    # NaN (NULL in the views) as an empty field
+    return '' if np.isnan(value) else float(value)
+
+
+if __name__ == '__main__':
+    my_args = sys.argv[1:]
+    parser = argparse.ArgumentParser(
+                    prog='price_scenarios',
+                    description='Moves the fill prices of a scrape database at random and '
+                                'reports the spread of profit_hour of every production and '
+                                'placeable, and how stable their ranking is.',
+                    epilog='Script finished.')
+    parser.add_argument('db_path', help='The scrape database, e.g. db/scrape25.sqlite.')
+    parser.add_argument('-n', '--scenarios', type=int, default=10000,
+                        help='Number of price scenarios (default 10000).')
+    parser.add_argument('--spread', type=float, default=0.2,
+                        help='Largest move of a price, as a share of it (default 0.2).')
+    parser.add_argument('-s', '--seed', type=int, help='Seed of the random prices.')
+    parser.add_argument('-r', '--rank-by', choices=('profit_hour', 'profit_index'),
+                        default='profit_hour', help='What to rank by (default profit_hour).')
+    parser.add_argument('-t', '--top', type=int, default=10,
+                        help='Size of the top counted in top_share (default 10).')
+    parser.add_argument('-l', '--limit', type=int, default=20,
+                        help='Rows to print, by base rank (default 20, 0 for all).')
+    parser.add_argument('-o', '--out', help='CSV file to write the stats of every row to.')
+    parser.add_argument('--chunk', type=int, default=1000,
+                        help='Scenarios evaluated at a time (default 1000).')
+    args = parser.parse_args(my_args)
+
+    con = sqlite.connect(args.db_path)
+    try:
+        model = compile_model(con)
+        wrong = check_views(con, model)
+    except sqlite.OperationalError as e:
+        parser.error(f'{args.db_path} is not an fs25 scrape database with the profit views: {e}')
+    con.close()
+    if wrong:
+        for key, column, view, ours in wrong[:20]:
+            print(f"MISMATCH {key} {column}: view {view}, engine {ours}")
+        print(f"{len(wrong)} values differ from the views at the base prices")
+        sys.exit(1)
+    print(f"{len(model.keys)} rows, {len(model.fills)} fill prices, "
+          f"the views match at the base prices")
+
+    start = time.perf_counter()
+    prices = price_scenarios(model, args.scenarios, args.spread, args.seed)
+    stats, summary = scenario_stats(model, prices, args.rank_by, args.top, args.chunk)
+    seconds = time.perf_counter() - start
+
+    order = sorted(range(len(model.keys)),
+                   key=lambda i: (np.isnan(stats['rank'][i]), stats['rank'][i]))
+    print(f"{'rank':>5}  {'name':<32}{'profit_hour':>12}{'p5':>10}{'p50':>10}{'p95':>10}"
+          f"{'loss':>7}{'mean rank':>10}{'best-worst':>12}{'top':>7}")
+    for i in order[:args.limit or None]:
+        s = {c: stats[c][i] for c in COLUMNS}
+        rank = '' if np.isnan(s['rank']) else int(s['rank'])
+        spread = '' if np.isnan(s['rank']) else f"{int(s['rank_best'])}-{int(s['rank_worst'])}"
+        print(f"{rank:>5}  {str(model.names[i] or model.keys[i][2])[:31]:<32}"
+              f"{s['profit_hour']:>12.1f}{s['profit_p5']:>10.1f}{s['profit_p50']:>10.1f}"
+              f"{s['profit_p95']:>10.1f}{s['loss_share']:>7.0%}{s['rank_mean']:>10.1f}"
+              f"{spread:>12}{s['top_share']:>7.0%}")
+
+    if args.out:
+        with open(args.out, 'w', encoding='utf8', newline='') as file:
+            writer = csv.writer(file, lineterminator='\n')
+            writer.writerow(('point_id', 'point_type', 'prod_id', 'name') + COLUMNS)
+            for i in order:
+                writer.writerow(model.keys[i] + (model.names[i],)
+                                + tuple(csv_number(stats[c][i]) for c in COLUMNS))
+        print(f"stats of {len(order)} rows written to {args.out}")
+    print(f"{summary['scenarios']} scenarios ranked by {args.rank_by}, mean Spearman rho "
+          f"{summary['rank_rho']:.3f} against the base ranking, in {seconds:.2f} s")
@@ -1,58 +1,64 @@
+--
+-- profit_hour, animal_prod_profit_day, prod_profit and point_profit are tables filled from the
+-- <name>_view views, indexed by their points and ranking. fs_profit.refresh_profit brings them up
+-- to date for changed input rows without rebuilding them
+--
+-- the profits are worked out for every period of the year in one pass (<name>_by_period):
+-- period 0 at the base prices of fill, read by the tables and fruit_profit, and periods 1-12 at
+-- the seasonal prices of fill_factor, read by the <name>_period views
+--
+
+--
+-- fill prices in each period. fills without economy factors keep their base price all year
+--
+DROP VIEW IF EXISTS periods;
+CREATE VIEW periods AS
+WITH RECURSIVE period_no (period) AS (
+SELECT 0 UNION ALL SELECT period + 1 FROM period_no WHERE period < 12
+)
+SELECT period FROM period_no;
+
+DROP VIEW IF EXISTS fill_period;
+CREATE VIEW fill_period AS
+SELECT a.period, b.name, b.title, b.show, b.unit, b.mass_l,
+       CASE WHEN a.period = 0 THEN b.price_l ELSE b.price_l * coalesce(c.value, 1) END price_l
+  FROM periods a
+ CROSS JOIN fill b
+  LEFT JOIN fill_factor c ON b.name = c.name AND a.period = c.period;
+
 --
 -- regular production profit
 --
 
-DROP VIEW IF EXISTS profit_hour; 
-CREATE VIEW profit_hour AS
+DROP VIEW IF EXISTS profit_hour_by_period;
+CREATE VIEW profit_hour_by_period AS
 WITH fill_free AS (
-SELECT name, title, show, unit, mass_l, 
+SELECT period, name, title, show, unit, mass_l, 
        CASE WHEN name = 'WATER' THEN 0 ELSE price_l END price_l
-  FROM fill
-
-), place_fill AS (
-SELECT id point_id, type point_type, 
-       lower(fill_type) prod_id, fill_type,
-	   'out' direction, liter_day/24 amount, capacity,
-	   0 sell_direct
-  FROM placeable
- WHERE liter_day IS NOT NULL
-
-), prod_in AS (
-SELECT a.*, b.price_l, a.amount * b.price_l price_in
-  FROM prod_fill a 
-  LEFT JOIN fill_free b ON a.fill_type = b.name 
- WHERE a.direction = 'in'
-
-), prod_in_sum AS (
-SELECT point_id, point_type, prod_id, sum(price_in) price_in_sum
-  FROM prod_in
- GROUP BY point_id, point_type, prod_id
-
-), prod_out AS (
-SELECT a.*, b.price_l, a.amount * b.price_l price_out
-  FROM prod_fill a 
-  LEFT JOIN fill_free b ON a.fill_type = b.name 
- WHERE a.direction = 'out'
-
-), prod_out_sum AS (
-SELECT point_id, point_type, prod_id, sum(price_out) price_out_sum
-  FROM prod_out
- GROUP BY point_id, point_type, prod_id
+  FROM fill_period
+
+), prod_sum AS (
+SELECT p.period, a.point_id, a.point_type, a.prod_id,
+       sum(CASE WHEN a.direction = 'in' THEN a.amount * b.price_l END) price_in_sum,
+       sum(CASE WHEN a.direction = 'out' THEN a.amount * b.price_l END) price_out_sum
+  FROM periods p
+ CROSS JOIN prod_fill a
+  LEFT JOIN fill_free b ON a.fill_type = b.name AND p.period = b.period
+ GROUP BY p.period, a.point_id, a.point_type, a.prod_id
+-- productions without inputs are left out
+HAVING max(a.direction = 'in')
 
 ), prod_join AS (
-SELECT a.*, c.name, b.price_out_sum, b.price_out_sum - a.price_in_sum profit_cycle,
-       c.cycles_hour, c.cost_hour
-  FROM prod_in_sum a
-  LEFT JOIN prod_out_sum b ON a.point_id = b.point_id 
-        AND a.point_type = b.point_type
-        AND a.prod_id = b.prod_id
+SELECT a.period, a.point_id, a.point_type, a.prod_id, a.price_in_sum, c.name, a.price_out_sum,
+       a.price_out_sum - a.price_in_sum profit_cycle, c.cycles_hour, c.cost_hour
+  FROM prod_sum a
   LEFT JOIN production c ON a.point_id = c.point_id
         AND a.point_type = c.point_type
         AND a.prod_id = c.id
 
 ), point_join AS (
 SELECT a.*, (a.profit_cycle * a.cycles_hour) - a.cost_hour profit_hour,
-       b.price point_price, b.shared_throughput
+       b.price point_price, b.shared_throughput, b.source
   FROM prod_join a
   LEFT JOIN prod_point b ON a.point_id = b.id AND a.point_type = b.type AND a.point_type = b.type
 
@@ -61,70 +67,95 @@ SELECT *, (point_price / profit_hour) / 24 cost_recoup_days
   FROM point_join 
 
 ), place_recoup_fill AS (
-SELECT a.id point_id, a.type point_type, lower(a.fill_type) prod_id, 
+SELECT p.period, a.id point_id, a.type point_type, lower(a.fill_type) prod_id, 
        0 price_in_sum, a.name, 
 	   a.liter_day/24 * b.price_l price_out_sum,
 	   NULL profit_cycle, NULL cycles_hour,
 	   a.price_upkeep_day/24.0 cost_hour,
 	   a.liter_day/24 * b.price_l profit_hour,
-	   a.price point_price, 0 shared_throughput,
+	   a.price point_price, 0 shared_throughput, a.source,
 	   a.price / (a.liter_day * b.price_l) cost_recoup_days
-  FROM placeable a
-  LEFT JOIN fill b ON a.fill_type = b.name
+  FROM periods p
+ CROSS JOIN placeable a
+  LEFT JOIN fill_period b ON a.fill_type = b.name AND p.period = b.period
  WHERE a.liter_day IS NOT NULL
 
 ), place_recoup_direct AS (
-SELECT id point_id, type point_type,
-       CASE WHEN category = 'generators' THEN lower('ELECTRICCHARGE') ELSE NULL END prod_id, 
-       0 price_in_sum, name, 
-	   income_hour price_out_sum,
+SELECT p.period, a.id point_id, a.type point_type,
+       CASE WHEN a.category = 'generators' THEN lower('ELECTRICCHARGE') ELSE NULL END prod_id, 
+       0 price_in_sum, a.name, 
+	   a.income_hour price_out_sum,
 	   NULL profit_cycle, NULL cycles_hour,
-	   price_upkeep_day/24.0 cost_hour,
-	   income_hour - (price_upkeep_day/24.0) profit_hour,
-	   price point_price, 1 shared_throughput,
-	   price / ((income_hour * 24) - price_upkeep_day) cost_recoup_days
-  FROM placeable
- WHERE income_hour IS NOT NULL
+	   a.price_upkeep_day/24.0 cost_hour,
+	   a.income_hour - (a.price_upkeep_day/24.0) profit_hour,
+	   a.price point_price, 1 shared_throughput, a.source,
+	   a.price / ((a.income_hour * 24) - a.price_upkeep_day) cost_recoup_days
+  FROM periods p
+ CROSS JOIN placeable a
+ WHERE a.income_hour IS NOT NULL
 )
 
-SELECT * FROM cost_recoup UNION
-SELECT * FROM place_recoup_fill UNION
-SELECT * FROM place_recoup_direct
-ORDER BY profit_hour DESC;
+-- the productions, fill and income placeables never share a row; UNION ALL lets a refresh
+-- narrow the view down to the points it refreshes
+SELECT * FROM cost_recoup UNION ALL
+SELECT * FROM place_recoup_fill UNION ALL
+SELECT * FROM place_recoup_direct;
+
+DROP VIEW IF EXISTS profit_hour_view;
+CREATE VIEW profit_hour_view AS
+SELECT point_id, point_type, prod_id, price_in_sum, name, price_out_sum, profit_cycle,
+       cycles_hour, cost_hour, profit_hour, point_price, shared_throughput, source,
+       cost_recoup_days
+  FROM profit_hour_by_period
+ WHERE period = 0
+ ORDER BY profit_hour DESC;
+
+DROP TABLE IF EXISTS profit_hour;
+-- the profit tables declare their columns: CREATE TABLE AS would only keep the
+-- affinity of each, and a column of the views holds integers in one database
+-- and reals in another
+CREATE TABLE profit_hour (
+   point_id TEXT, point_type TEXT, prod_id TEXT, price_in_sum REAL, name TEXT,
+   price_out_sum REAL, profit_cycle REAL, cycles_hour REAL, cost_hour REAL, profit_hour REAL,
+   point_price REAL, shared_throughput BOOLEAN, source TEXT, cost_recoup_days REAL
+);
+INSERT INTO profit_hour SELECT * FROM profit_hour_view;
+CREATE INDEX profit_hour_point ON profit_hour (point_id, point_type, prod_id);
+CREATE INDEX profit_hour_rank ON profit_hour (profit_hour DESC);
 
 --
 -- animal production profit  (not accurate for meat production)
 --
-DROP VIEW IF EXISTS animal_prod_profit_day;
-CREATE VIEW animal_prod_profit_day AS
+DROP VIEW IF EXISTS animal_prod_profit_day_by_period;
+CREATE VIEW animal_prod_profit_day_by_period AS
 -- adjusts water to be free and the price of forage to be minimum costs 
 -- based on input prices assuming a mixer
 WITH mix AS (
-SELECT name, title, show, unit, mass_l, price_l,
+SELECT period, name, title, show, unit, mass_l, price_l,
        CASE WHEN name = 'DRYGRASS_WINDROW' THEN 0.5 
 	        WHEN name = 'STRAW' THEN 0.3
 		    WHEN name = 'SILAGE' THEN 0.2 END pct_mix 
-  FROM fill 
+  FROM fill_period
  WHERE name IN ('DRYGRASS_WINDROW', 'SILAGE', 'STRAW')
  
 ), wgts AS (
- SELECT name, mass_l * pct_mix mass_wgt, price_l * pct_mix price_wgt
+ SELECT period, name, mass_l * pct_mix mass_wgt, price_l * pct_mix price_wgt
    FROM mix
 
 ), tmr AS (
-SELECT 'FORAGE' name, sum(mass_wgt) mass, sum(price_wgt) price FROM wgts
+SELECT period, 'FORAGE' name, sum(mass_wgt) mass, sum(price_wgt) price FROM wgts GROUP BY period
 
 ), fill_alt AS (
 -- customizes forage price to reflect opportunity cost of selling ingredients
-SELECT a.name, a.title, a.show, a.unit,
+SELECT a.period, a.name, a.title, a.show, a.unit,
 	   coalesce(b.mass, a.mass_l) mass_l,
        coalesce(b.price, a.price_l) price_l
-  FROM fill a
-  LEFT JOIN tmr b ON a.name = b.name
+  FROM fill_period a
+  LEFT JOIN tmr b ON a.name = b.name AND a.period = b.period
 
 ), fill_free AS (
 -- assumes you are not paying water to fill animal points
-SELECT name, title, show, unit, mass_l, 
+SELECT period, name, title, show, unit, mass_l, 
        CASE WHEN name = 'WATER' THEN 0 
 			ELSE price_l END price_l
   FROM fill_alt
@@ -145,11 +176,12 @@ SELECT a.subtype, a.type, b.fill_type, b.title, a.direction, a.age_mo, a.liter_d
  WHERE a.direction = 'in' AND rn = 1
 
 ), aprod_in AS (
-SELECT a.*, b.price_l,
+SELECT p.period, a.*, b.price_l,
        c.consumption, d.prod_wgt, d.eat_wgt,
-	   row_number() over(partition by a.type, a.subtype, a.title order by b.price_l) rn
-  FROM afill_in a 
-  LEFT JOIN fill_free b ON a.fill_type = b.name
+	   row_number() over(partition by p.period, a.type, a.subtype, a.title order by b.price_l) rn
+  FROM periods p
+ CROSS JOIN afill_in a 
+  LEFT JOIN fill_free b ON a.fill_type = b.name AND p.period = b.period
   LEFT JOIN animal_food c ON a.type = c.type
   LEFT JOIN animal_food_group d ON a.type = d.type AND a.title = d.title
 
@@ -159,14 +191,14 @@ SELECT *, liter_day * eat_wgt * price_l price_wgt
  WHERE consumption = 'PARALLEL' AND rn = 1
 
 ), aprod_in_parallel_calc AS (
-SELECT subtype, type, group_concat(fill_type, ', ') fill_type, NULL title,
+SELECT period, subtype, type, group_concat(fill_type, ', ') fill_type, NULL title,
        direction, age_mo, fill_subtype, consumption,
        sum(prod_wgt) prod_wgt, sum(price_wgt) price_day 
   FROM aprod_in_parallel
- GROUP BY subtype, type, direction, age_mo, fill_subtype, consumption
+ GROUP BY period, subtype, type, direction, age_mo, fill_subtype, consumption
 
 ), aprod_in_serial AS (
-SELECT subtype, type, fill_type, title, direction, age_mo, fill_subtype, consumption,
+SELECT period, subtype, type, fill_type, title, direction, age_mo, fill_subtype, consumption,
        prod_wgt, liter_day * price_l price_day  
   FROM aprod_in
  WHERE consumption = 'SERIAL'
@@ -176,22 +208,23 @@ SELECT * FROM aprod_in_serial UNION
 SELECT * FROM aprod_in_parallel_calc
 
 ), aprod_in_notfood AS (
-SELECT a.subtype, a.type, UPPER(a.fill_type) fill_type, NULL title, a.direction, a.age_mo, a.liter_day,
+SELECT p.period, a.subtype, a.type, UPPER(a.fill_type) fill_type, NULL title, a.direction, a.age_mo, a.liter_day,
        a.fill_type fill_subtype, b.price_l, b.price_l * a.liter_day price_day
-  FROM afill_max a
-  LEFT JOIN fill_free b ON UPPER(a.fill_type) = b.name
+  FROM periods p
+ CROSS JOIN afill_max a
+  LEFT JOIN fill_free b ON UPPER(a.fill_type) = b.name AND p.period = b.period
  WHERE a.direction = 'in' AND a.fill_type != 'food' AND a.rn = 1
 
 ), aprod_in_notfood_sum AS (
-SELECT subtype, type, sum(price_day) price_day_other
+SELECT period, subtype, type, sum(price_day) price_day_other
   FROM aprod_in_notfood
- GROUP BY subtype, type 
+ GROUP BY period, subtype, type 
 
 ), aprod_in_final AS (
 SELECT a.*, coalesce(b.price_day_other, 0) price_day_other,
        a.price_day + coalesce(b.price_day_other, 0) cost_day 
   FROM aprod_in_union a
- LEFT JOIN aprod_in_notfood_sum b ON a.subtype = b.subtype
+ LEFT JOIN aprod_in_notfood_sum b ON a.subtype = b.subtype AND a.period = b.period
 
 ), aprod_out AS (
 SELECT a.subtype, a.type, a.direction, a.age_mo, a.liter_day, a.fill_type fill_cat, c.fill_type capacity_type,
@@ -204,20 +237,21 @@ SELECT a.subtype, a.type, a.direction, a.age_mo, a.liter_day, a.fill_type fill_c
    AND (a.fill_type = 'pallets' OR c.fill_type IS NOT NULL) 
  
 ), aprod_out_calc AS (
-SELECT a.id, a.type, a.subtype, a.direction, a.age_mo, a.fill_type, a.unit_max, 
+SELECT p.period, a.id, a.type, a.subtype, a.direction, a.age_mo, a.fill_type, a.unit_max, 
        a.price point_cost, a.upkeep_price point_upkeep, a.liter_day, b.price_l,
-	   a.liter_day * b.price_l * unit_max price_day, fill_type = 'MANURE' has_manure
-  FROM aprod_out a
-  LEFT JOIN fill b ON a.fill_type = b.name
+	   a.liter_day * b.price_l * unit_max price_day, a.fill_type = 'MANURE' has_manure
+  FROM periods p
+ CROSS JOIN aprod_out a
+  LEFT JOIN fill_period b ON a.fill_type = b.name AND p.period = b.period
 
 ), aprod_out_sum AS (
-SELECT id, type, subtype, direction, unit_max, point_cost, point_upkeep, 
+SELECT period, id, type, subtype, direction, unit_max, point_cost, point_upkeep, 
        sum(price_day) revenue_day, max(has_manure) has_manure, max(age_mo) age_mo
   FROM aprod_out_calc
- GROUP BY id, type, subtype, direction, unit_max, point_cost, point_upkeep
+ GROUP BY period, id, type, subtype, direction, unit_max, point_cost, point_upkeep
 
 ), aprod_out_manure AS (
-SELECT id, type, subtype, direction, age_mo, unit_max,
+SELECT period, id, type, subtype, direction, age_mo, unit_max,
        CASE WHEN has_manure THEN point_cost + 25000 ELSE point_cost END point_cost,
 	   CASE WHEN has_manure THEN point_upkeep + 25 ELSE point_upkeep END point_upkeep,
 	   revenue_day, has_manure
@@ -249,15 +283,15 @@ SELECT a.*, b.price_buy_unit, a.unit_max * b.price_buy_unit animal_cost
   LEFT JOIN price_buy_sum b ON a.subtype = b.subtype
 
 ), aprod_join AS (
-SELECT a.id, a.type, a.subtype, a.unit_max, a.point_cost, a.point_upkeep, a.revenue_day, a.has_manure, 
+SELECT a.period, a.id, a.type, a.subtype, a.unit_max, a.point_cost, a.point_upkeep, a.revenue_day, a.has_manure, 
        a.price_buy_unit, a.animal_cost,
        b.fill_type, b.consumption, b.prod_wgt, b.cost_day cost_day_unit, a.unit_max * b.cost_day cost_day,
 	   a.revenue_day * b.prod_wgt revenue_day_adj
   FROM aprod_out_final a
-  LEFT JOIN aprod_in_final b ON a.subtype = b.subtype
+  LEFT JOIN aprod_in_final b ON a.subtype = b.subtype AND a.period = b.period
 
 ), aprod_calc AS (
-SELECT id, type, subtype, unit_max, point_cost, point_upkeep, revenue_day, has_manure, 
+SELECT period, id, type, subtype, unit_max, point_cost, point_upkeep, revenue_day, has_manure, 
        price_buy_unit, animal_cost, fill_type, consumption, prod_wgt, cost_day_unit, 
 	   cost_day, revenue_day_adj, revenue_day_adj - (cost_day + point_upkeep) profit_day,
 	   point_cost + animal_cost point_animal_cost
@@ -267,44 +301,88 @@ SELECT id, type, subtype, unit_max, point_cost, point_upkeep, revenue_day, has_m
 SELECT *, point_animal_cost / profit_day cost_recoup_days 
   FROM aprod_calc;
 
+DROP VIEW IF EXISTS animal_prod_profit_day_view;
+CREATE VIEW animal_prod_profit_day_view AS
+SELECT id, type, subtype, unit_max, point_cost, point_upkeep, revenue_day, has_manure,
+       price_buy_unit, animal_cost, fill_type, consumption, prod_wgt, cost_day_unit, cost_day,
+       revenue_day_adj, profit_day, point_animal_cost, cost_recoup_days
+  FROM animal_prod_profit_day_by_period
+ WHERE period = 0;
+
+DROP TABLE IF EXISTS animal_prod_profit_day;
+CREATE TABLE animal_prod_profit_day (
+   id TEXT, type TEXT, subtype TEXT, unit_max INTEGER, point_cost REAL, point_upkeep REAL,
+   revenue_day REAL, has_manure BOOLEAN, price_buy_unit REAL, animal_cost REAL, fill_type TEXT,
+   consumption TEXT, prod_wgt REAL, cost_day_unit REAL, cost_day REAL, revenue_day_adj REAL,
+   profit_day REAL, point_animal_cost REAL, cost_recoup_days REAL
+);
+INSERT INTO animal_prod_profit_day SELECT * FROM animal_prod_profit_day_view;
+CREATE INDEX animal_prod_profit_day_point ON animal_prod_profit_day (id, subtype);
+CREATE INDEX animal_prod_profit_day_type ON animal_prod_profit_day (type);
+CREATE INDEX animal_prod_profit_day_rank ON animal_prod_profit_day (profit_day DESC);
+
 
 --
--- joined production with profit index calcs
+-- joined production with profit index calcs, base game and mods ranked together
 --
-DROP VIEW IF EXISTS prod_profit;
-CREATE VIEW prod_profit AS
+DROP VIEW IF EXISTS prod_profit_view;
+CREATE VIEW prod_profit_view AS
 WITH prod_join AS (
 SELECT point_id, point_type, prod_id, NULL food_choice, profit_hour * 24 profit_day, 
-       shared_throughput, point_price upfront_cost, cost_recoup_days 
+       shared_throughput, point_price upfront_cost, cost_recoup_days, source
   FROM profit_hour
- UNION
-SELECT id point_id, 'animal' point_type, subtype prod_id, fill_type food_choice, profit_day,
-       NULL shared_throughput, point_animal_cost upfront_cost, cost_recoup_days
-  FROM animal_prod_profit_day 
+ UNION ALL
+SELECT DISTINCT a.id point_id, 'animal' point_type, a.subtype prod_id, a.fill_type food_choice,
+       a.profit_day, NULL shared_throughput, a.point_animal_cost upfront_cost,
+       a.cost_recoup_days, b.source
+  FROM animal_prod_profit_day a
+  LEFT JOIN animal_point b ON a.id = b.id
 )
 
 SELECT *, profit_day/abs(cost_recoup_days) profit_index  
   FROM prod_join
  ORDER BY profit_day/abs(cost_recoup_days) DESC;
 
+DROP TABLE IF EXISTS prod_profit;
+CREATE TABLE prod_profit (
+   point_id TEXT, point_type TEXT, prod_id TEXT, food_choice TEXT, profit_day REAL,
+   shared_throughput BOOLEAN, upfront_cost REAL, cost_recoup_days REAL, source TEXT,
+   profit_index REAL
+);
+INSERT INTO prod_profit SELECT * FROM prod_profit_view;
+CREATE INDEX prod_profit_point ON prod_profit (point_id, point_type, prod_id);
+CREATE INDEX prod_profit_rank ON prod_profit (profit_index DESC);
+
 
 --
 -- total point production, with shared vs not shared throughput taken into accout.
 --
-DROP VIEW IF EXISTS point_profit; 
-CREATE VIEW point_profit AS
+DROP VIEW IF EXISTS point_profit_view;
+CREATE VIEW point_profit_view AS
 WITH max_profit AS (
-SELECT point_id, point_type, upfront_cost, shared_throughput,
+SELECT point_id, point_type, upfront_cost, shared_throughput, source,
 	   CASE WHEN shared_throughput = 0 THEN sum(profit_day)
 	        WHEN shared_throughput = 1  OR shared_throughput IS NULL THEN max(profit_day) END profit_day_max
   FROM prod_profit
- GROUP BY point_id, point_type, upfront_cost, shared_throughput
+ GROUP BY point_id, point_type, upfront_cost, shared_throughput, source
 )
 
 SELECT * FROM max_profit ORDER BY profit_day_max DESC;
 
-DROP VIEW IF EXISTS fruit_profit;
-CREATE VIEW fruit_profit AS
+DROP TABLE IF EXISTS point_profit;
+CREATE TABLE point_profit (
+   point_id TEXT, point_type TEXT, upfront_cost REAL, shared_throughput BOOLEAN, source TEXT,
+   profit_day_max REAL
+);
+INSERT INTO point_profit SELECT * FROM point_profit_view;
+CREATE INDEX point_profit_point ON point_profit (point_id, point_type);
+CREATE INDEX point_profit_rank ON point_profit (profit_day_max DESC);
+
+--
+-- field profit per m2, seeds bought and the harvest sold at the prices of one period
+--
+DROP VIEW IF EXISTS fruit_profit_by_period;
+CREATE VIEW fruit_profit_by_period AS
 WITH seeds AS (
 SELECT name, 
        CASE WHEN name = 'rice' THEN 'RICESAPLINGS'
@@ -317,16 +395,226 @@ SELECT name,
   FROM fruit
 
 ), fruit_join AS (
-SELECT a.*, b.seed_type, b.harvest_no, c.price_l,
+SELECT p.period, a.*, b.seed_type, b.harvest_no, c.price_l,
        a.seed_rate * coalesce(e.price_l, 0) seed_cost_m2,
 	   a.liter_m2 * c.price_l * b.harvest_no fruit_revenue_m2,
 	   a.windrow_liter_m2 * d.price_l * b.harvest_no windrow_revenue_m2
-  FROM fruit a
+  FROM periods p
+ CROSS JOIN fruit a
   LEFT JOIN seeds b ON a.name = b.name
-  LEFT JOIN fill c ON upper(a.name) = c.name
-  LEFT JOIN fill d ON upper(a.windrow_out) = d.name
-  LEFT JOIN fill e ON b.seed_type = e.name
+  LEFT JOIN fill_period c ON upper(a.name) = c.name AND p.period = c.period
+  LEFT JOIN fill_period d ON upper(a.windrow_out) = d.name AND p.period = d.period
+  LEFT JOIN fill_period e ON b.seed_type = e.name AND p.period = e.period
+)
+
+SELECT *, coalesce(fruit_revenue_m2, 0) + coalesce(windrow_revenue_m2, 0) - coalesce(seed_cost_m2, 0) profit_m2
+  FROM fruit_join;
+
+DROP VIEW IF EXISTS fruit_profit;
+CREATE VIEW fruit_profit AS
+SELECT name, seed_rate, seed_available, seed_needs_rolling, liter_m2, chopper_type, bee_bonus,
+       windrow_out, windrow_liter_m2, windrow_cut_fill, windrow_cut_factor, growth_resets_spray,
+       growth_require_lime, soil_lowdensity_req, soil_increases_density, soil_consumes_lime,
+       soil_start_spraylevel, cultivation_allowed, mulch_chopper_type, source, seed_type,
+       harvest_no, price_l, seed_cost_m2, fruit_revenue_m2, windrow_revenue_m2, profit_m2
+  FROM fruit_profit_by_period
+ WHERE period = 0
+ ORDER BY profit_m2 DESC;
+
+--
+-- seasonal profit: one row per production and period (1-12) at the prices of fill_factor, with
+-- the period it earns most and least in and its average over the year. the other columns are
+-- those of the base price views. a production is either priced in every period or in none, so
+-- the best and worst periods are the first and last of its periods by profit
+--
+DROP VIEW IF EXISTS profit_hour_period;
+CREATE VIEW profit_hour_period AS
+SELECT *,
+       first_value(period) over prod best_period, max(profit_hour) over prod profit_hour_best,
+       last_value(period) over prod worst_period, min(profit_hour) over prod profit_hour_worst,
+       avg(profit_hour) over prod profit_hour_avg
+  FROM profit_hour_by_period
+ WHERE period > 0
+WINDOW prod AS (partition by point_id, point_type, prod_id
+                order by profit_hour DESC, period
+                rows between unbounded preceding and unbounded following)
+ ORDER BY profit_hour_avg DESC, point_id, point_type, prod_id, period;
+
+-- a parallel ration is the cheapest fill of each food group, which can change with the period
+DROP VIEW IF EXISTS animal_prod_profit_day_period;
+CREATE VIEW animal_prod_profit_day_period AS
+SELECT *,
+       first_value(period) over prod best_period, max(profit_day) over prod profit_day_best,
+       last_value(period) over prod worst_period, min(profit_day) over prod profit_day_worst,
+       avg(profit_day) over prod profit_day_avg
+  FROM animal_prod_profit_day_by_period
+ WHERE period > 0
+WINDOW prod AS (partition by id, subtype, consumption,
+                CASE WHEN consumption = 'PARALLEL' THEN NULL ELSE fill_type END
+                order by profit_day DESC, period
+                rows between unbounded preceding and unbounded following)
+ ORDER BY profit_day_avg DESC, id, subtype, fill_type, period;
+
+DROP VIEW IF EXISTS fruit_profit_period;
+CREATE VIEW fruit_profit_period AS
+SELECT *,
+       first_value(period) over prod best_period, max(profit_m2) over prod profit_m2_best,
+       last_value(period) over prod worst_period, min(profit_m2) over prod profit_m2_worst,
+       avg(profit_m2) over prod profit_m2_avg
+  FROM fruit_profit_by_period
+ WHERE period > 0
+WINDOW prod AS (partition by name
+                order by profit_m2 DESC, period
+                rows between unbounded preceding and unbounded following)
+ ORDER BY profit_m2_avg DESC, name, period;
+
+DROP VIEW IF EXISTS prod_profit_period;
+CREATE VIEW prod_profit_period AS
+WITH prod_join AS (
+SELECT period, point_id, point_type, prod_id, NULL food_choice, NULL food_key,
+       profit_hour * 24 profit_day, shared_throughput, point_price upfront_cost,
+       cost_recoup_days, source
+  FROM profit_hour_by_period
+ WHERE period > 0
+ UNION ALL
+SELECT DISTINCT a.period, a.id point_id, 'animal' point_type, a.subtype prod_id,
+       a.fill_type food_choice,
+       CASE WHEN a.consumption = 'PARALLEL' THEN NULL ELSE a.fill_type END food_key,
+       a.profit_day, NULL shared_throughput, a.point_animal_cost upfront_cost,
+       a.cost_recoup_days, b.source
+  FROM animal_prod_profit_day_by_period a
+  LEFT JOIN animal_point b ON a.id = b.id
+ WHERE a.period > 0
+)
+
+SELECT period, point_id, point_type, prod_id, food_choice, profit_day, shared_throughput,
+       upfront_cost, cost_recoup_days, source, profit_day/abs(cost_recoup_days) profit_index,
+       first_value(period) over prod best_period, max(profit_day) over prod profit_day_best,
+       last_value(period) over prod worst_period, min(profit_day) over prod profit_day_worst,
+       avg(profit_day) over prod profit_day_avg
+  FROM prod_join
+WINDOW prod AS (partition by point_id, point_type, prod_id, food_key
+                order by profit_day DESC, period
+                rows between unbounded preceding and unbounded following)
+ ORDER BY profit_day_avg DESC, point_id, point_type, prod_id, food_choice, period;
+
+--
+-- best selling station of every fill type on every map, looked up by its (map, fill_type) key.
+-- stations take their <fillType> entries at their own price scale and the rest of the fill types
+-- they accept (by name or category) at the base price
+--
+DROP TABLE IF EXISTS sell_best;
+CREATE TABLE sell_best (
+   map TEXT, fill_type TEXT, point_id TEXT, price_scale REAL, great_demand BOOLEAN,
+   PRIMARY KEY (map, fill_type)
+) WITHOUT ROWID;
+INSERT INTO sell_best (map, fill_type, point_id, price_scale, great_demand)
+WITH RECURSIVE cat_split (category, fill_type, rest) AS (
+SELECT upper(name), '',
+       replace(replace(replace(fill_types, char(9), ' '), char(10), ' '), char(13), ' ') || ' '
+  FROM fill_category
+ UNION ALL
+SELECT category, substr(rest, 1, instr(rest, ' ') - 1), substr(rest, instr(rest, ' ') + 1)
+  FROM cat_split
+ WHERE rest != ''
+
+), point_fill AS (
+SELECT point_id, upper(fill_type) fill_type, price_scale, great_demand
+  FROM sell_point_fill
+ UNION
+SELECT a.point_id, upper(b.fill_type) fill_type, 1.0 price_scale, 0 great_demand
+  FROM sell_point_category a
+ INNER JOIN cat_split b ON a.category = b.category AND b.fill_type != ''
+ WHERE NOT EXISTS (SELECT 1 FROM sell_point_fill c
+                    WHERE c.point_id = a.point_id AND upper(c.fill_type) = upper(b.fill_type))
+
+), map_fill AS (
+SELECT a.map, b.fill_type, b.point_id, b.price_scale, b.great_demand,
+       row_number() over(partition by a.map, b.fill_type
+                         order by b.price_scale DESC, b.point_id) rn
+  FROM map_placeable a
+ INNER JOIN point_fill b ON a.point_id = b.point_id
+)
+
+SELECT map, fill_type, point_id, price_scale, great_demand
+  FROM map_fill
+ WHERE rn = 1;
+
+--
+-- base and best selling price of every fill type on every map. best_price_l is NULL where no
+-- station on the map takes the fill
+--
+DROP VIEW IF EXISTS sell_price;
+CREATE VIEW sell_price AS
+WITH maps AS (
+SELECT DISTINCT map FROM map_placeable
+)
+
+SELECT a.map, b.name fill_type, b.price_l, c.point_id, d.name point_name, c.price_scale,
+       b.price_l * c.price_scale best_price_l
+  FROM maps a
+ CROSS JOIN fill b
+  LEFT JOIN sell_best c ON c.map = a.map AND c.fill_type = b.name
+  LEFT JOIN sell_point d ON c.point_id = d.id;
+
+--
+-- profit_hour on each map with outputs sold at the map's best station, inputs bought at the
+-- base price. outputs no station on the map takes keep the base price
+--
+DROP VIEW IF EXISTS profit_hour_map;
+CREATE VIEW profit_hour_map AS
+WITH maps AS (
+SELECT DISTINCT map FROM map_placeable
+
+), out_gain AS (
+SELECT m.map, a.point_id, a.point_type, a.prod_id,
+       sum(a.amount * b.price_l * (coalesce(s.price_scale, 1) - 1)) gain
+  FROM maps m
+ CROSS JOIN prod_fill a
+ INNER JOIN fill b ON a.fill_type = b.name
+  LEFT JOIN sell_best s ON s.map = m.map AND s.fill_type = a.fill_type
+ WHERE a.direction = 'out'
+ GROUP BY m.map, a.point_id, a.point_type, a.prod_id
+ UNION ALL
+SELECT m.map, a.id point_id, a.type point_type, lower(a.fill_type) prod_id,
+       a.liter_day/24 * b.price_l * (coalesce(s.price_scale, 1) - 1) gain
+  FROM maps m
+ CROSS JOIN placeable a
+ INNER JOIN fill b ON a.fill_type = b.name
+  LEFT JOIN sell_best s ON s.map = m.map AND s.fill_type = a.fill_type
+ WHERE a.liter_day IS NOT NULL
+)
+
+-- gain is per cycle for productions and per hour for placeables, which have no cycles
+SELECT m.map, p.point_id, p.point_type, p.prod_id, p.name, p.source, p.point_price,
+       p.price_out_sum + coalesce(g.gain, 0) price_out_best,
+       p.profit_hour profit_hour_base,
+       p.profit_hour + coalesce(g.gain, 0) * coalesce(p.cycles_hour, 1) profit_hour
+  FROM maps m
+ CROSS JOIN profit_hour p
+  LEFT JOIN out_gain g ON g.map = m.map AND g.point_id = p.point_id
+        AND g.point_type = p.point_type AND g.prod_id = p.prod_id
+ ORDER BY m.map, profit_hour DESC;
+
+--
+-- fruit_profit on each map with the fruit and windrow sold at the map's best station
+--
+DROP VIEW IF EXISTS fruit_profit_map;
+CREATE VIEW fruit_profit_map AS
+WITH maps AS (
+SELECT DISTINCT map FROM map_placeable
+
+), fruit_best AS (
+SELECT m.map, a.name, a.seed_cost_m2, a.profit_m2 profit_m2_base,
+       a.fruit_revenue_m2 * coalesce(b.price_scale, 1) fruit_revenue_m2,
+       a.windrow_revenue_m2 * coalesce(c.price_scale, 1) windrow_revenue_m2,
+       b.point_id fruit_point_id, c.point_id windrow_point_id
+  FROM maps m
+ CROSS JOIN fruit_profit a
+  LEFT JOIN sell_best b ON b.map = m.map AND b.fill_type = upper(a.name)
+  LEFT JOIN sell_best c ON c.map = m.map AND c.fill_type = upper(a.windrow_out)
 )
 
 SELECT *, coalesce(fruit_revenue_m2, 0) + coalesce(windrow_revenue_m2, 0) - coalesce(seed_cost_m2, 0) profit_m2
-  FROM fruit_join order by profit_m2 DESC;
+  FROM fruit_best
+ ORDER BY map, profit_m2 DESC;
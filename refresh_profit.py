@@ -0,0 +1,43 @@
+import os
+import sys
+import argparse
+import scrape_economy_25 as scrape
+from fs_profit import PROFIT_TABLES, profit_materialized, refresh_profit
+
+# Brings the profit tables of a scrape database up to date after its fill, production or animal
+# rows changed (edited by hand, or by a rescrape of some stages), rewriting only the rows of the
+# points and animal types they touch. Run from the folder of prod25.sql.
+
+
+if __name__ == '__main__':
+    my_args = sys.argv[1:]
+    parser = argparse.ArgumentParser(
+                    prog='refresh_profit',
+                    description='Refreshes the materialized profit tables (' +
+                                ', '.join(PROFIT_TABLES) + ') of a scrape database for the '
+                                'input rows changed since they were last refreshed.',
+                    epilog='Script finished.')
+    parser.add_argument('db_path', help='The scrape database, e.g. db/scrape25.sqlite.')
+    parser.add_argument('--full', action='store_true',
+                        help='Fill every profit table again from its view.')
+    args = parser.parse_args(my_args)
+    if not os.path.isfile(args.db_path):
+        parser.error(f'no database at {args.db_path}')
+
+    # through create_db, which adds the columns the queries read to databases from before them
+    con = scrape.create_db(args.db_path)
+    if not profit_materialized(con):
+        # a database from before the profit tables (or before they declared their columns),
+        # or without the queries
+        print(f"Adding production queries from {scrape.QUERY_FILE}...")
+        scrape.add_production_queries(con)
+    else:
+        result = refresh_profit(con, full=args.full)
+        if result['full']:
+            print(f"Rebuilt the profit tables, {result['rows']} rows, in "
+                  f"{result['seconds']:.3f} s")
+        else:
+            print(f"{result['changed']} changed input rows: {result['points']} points and "
+                  f"{result['animals']} animal types refreshed, {result['rows']} rows, in "
+                  f"{result['seconds']:.3f} s")
+    con.close()
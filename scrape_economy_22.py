@@ -1,10 +1,12 @@
-import xmltodict
 import os
-import pathlib
 import sqlite3 as sqlite
 import sqlparse
 import argparse
 import sys
+import functools
+from fs_load import BulkLoader, map_files
+from fs_spec import Col, Table, spec_sections
+from fs_xml import parse_sections, placeable_index
 
 
 def tryint(text):
@@ -167,8 +169,132 @@ def create_db(db_path=':memory:'):
     return con
 
 
-def get_prod(game_dir, con):
+# indexes on the join and lookup keys of the queries file and the animal simulator
+# (animal_queries) beyond the primary keys, built once the rows are loaded
+INDEX_SQL = (
+    "CREATE INDEX IF NOT EXISTS prod_fill_fill ON prod_fill (fill_type);",
+    "CREATE INDEX IF NOT EXISTS animal_fill_subtype ON animal_fill (subtype, direction);",
+    "CREATE INDEX IF NOT EXISTS animal_fill_type ON animal_fill (type);",
+    "CREATE INDEX IF NOT EXISTS animal_type ON animal (type);",
+    "CREATE INDEX IF NOT EXISTS animal_food_group_type ON animal_food_group (type, title);",
+    "CREATE INDEX IF NOT EXISTS animal_point_type ON animal_point (type);",
+    "CREATE INDEX IF NOT EXISTS animal_capacity_point ON animal_capacity (point_id, fill_type);",
+    "CREATE INDEX IF NOT EXISTS placeable_fill ON placeable (fill_type);",
+)
+
+
+def add_indexes(con):
     c = con.cursor()
+    for stmt in INDEX_SQL:
+        c.execute(stmt)
+    con.commit()
+
+
+# top level tags (or placeable types) that send a placeable xml to a stage, first match wins
+PLACEABLE_ROUTES = {
+    'prod': ('productionPoint',),
+    'animal_pen': ('husbandry',),
+    'placeable': ('beehive', 'manureHeap'),
+}
+
+
+@functools.lru_cache(maxsize=None)
+def placeable_routes(game_dir):
+    # one scan of data/placeables shared by every stage
+    return placeable_index(game_dir, PLACEABLE_ROUTES)
+
+
+def prod_files(game_dir):
+    return list(placeable_routes(game_dir)['prod'])
+
+
+def prod_file_rows(file):
+    point_out = []
+    prod_out = []
+    fill_out = []
+
+    point_dict = dict()
+    file_name = os.path.basename(file)
+    point_id = os.path.splitext(file_name)[0]
+    d = parse_sections(file, ('storeData', 'productionPoint'))
+
+    # production point
+    point_dict['id'] = point_id
+    place = d.get('placeable')
+    if place:
+        store = place.get('storeData')
+        if store:
+            point_dict['name'] = store.get('name')
+            point_dict['price'] = tryint(store.get('price'))
+            # lifetime = int(store.get('lifetime'))
+            prod_point = place.get('productionPoint')
+            if prod_point:
+                prods = prod_point.get('productions')
+                point_dict['shared_throughput'] = trybool(prods.get('@sharedThroughputCapacity'))
+                point_out.append(point_dict)
+
+                # storage capacity is shared by every production of the point
+                storage = prod_point.get('storage')
+                cap_list = storage.get('capacity')
+                if isinstance(cap_list, dict):
+                    cap_list = [cap_list]
+                capacity = {}
+                for cap in cap_list:
+                    capacity[cap.get('@fillType')] = tryfloat(cap.get('@capacity'))
+
+                # individual productions
+                prod_list = prods.get('production')
+                if isinstance(prod_list, dict):
+                    prod_list = [prod_list]
+                for p in prod_list:
+                    prod_dict = dict()
+                    prod_dict['point_id'] = point_id
+                    prod_id = p.get('@id')
+                    prod_dict['id'] = prod_id
+                    prod_name = p.get('@name')
+                    prod_params = p.get('@params')
+                    if prod_params:
+                        prod_name = prod_name % tuple(prod_params.split('|'))
+                    prod_dict['name'] = prod_name
+                    prod_dict['cycles_hour'] = tryint(p.get('@cyclesPerHour'))
+                    prod_dict['cost_hour'] = tryfloat(p.get('@costsPerActiveHour'))
+                    prod_out.append(prod_dict)
+
+                    # inputs
+                    inputs = p.get('inputs')
+                    input_list = inputs.get('input')
+                    if isinstance(input_list, dict):
+                        input_list = [input_list]
+                    for i in input_list:
+                        input_dict = dict()
+                        input_dict['point_id'] = point_id
+                        input_dict['prod_id'] = prod_id
+                        input_dict['fill_type'] = i.get('@fillType')
+                        input_dict['direction'] = 'in'
+                        input_dict['amount'] = tryfloat(i.get('@amount'))
+                        input_dict['capacity'] = capacity.get(input_dict['fill_type'])
+                        input_dict['sell_direct'] = trybool(i.get('@sellDirectly'))
+                        fill_out.append(input_dict)
+
+                    # outputs
+                    outputs = p.get('outputs')
+                    output_list = outputs.get('output')
+                    if isinstance(output_list, dict):
+                        output_list = [output_list]
+                    for o in output_list:
+                        output_dict = dict()
+                        output_dict['point_id'] = point_id
+                        output_dict['prod_id'] = prod_id
+                        output_dict['fill_type'] = o.get('@fillType')
+                        output_dict['direction'] = 'out'
+                        output_dict['amount'] = tryfloat(o.get('@amount'))
+                        output_dict['capacity'] = capacity.get(output_dict['fill_type'])
+                        output_dict['sell_direct'] = trybool(o.get('@sellDirectly'))
+                        fill_out.append(output_dict)
+    return point_out, prod_out, fill_out
+
+
+def get_prod(game_dir, con, jobs=1):
     point_sql = '\n'.join((
         "INSERT OR IGNORE INTO prod_point (id, name, price, shared_throughput) ",
         "VALUES (:id, :name, :price, :shared_throughput);"
@@ -178,118 +304,50 @@ def get_prod(game_dir, con):
         "VALUES (:point_id, :id, :name, :cycles_hour, :cost_hour);"
     ))
     fill_sql = '\n'.join((
-        "INSERT OR IGNORE INTO prod_fill (point_id, prod_id, fill_type, direction, amount, sell_direct) ",
-        "VALUES (:point_id, :prod_id, :fill_type, :direction, :amount, :sell_direct);"
+        "INSERT OR IGNORE INTO prod_fill (point_id, prod_id, fill_type, direction, amount, capacity, ",
+        "   sell_direct) ",
+        "VALUES (:point_id, :prod_id, :fill_type, :direction, :amount, :capacity, :sell_direct);"
     ))
-    cap_sql = '\n'.join((
-        "UPDATE prod_fill SET capacity = :capacity ",
-        " WHERE point_id = :point_id AND prod_id = :prod_id AND fill_type = :fill_type;"))
-
-    dirs = []
-    dirs.append(os.path.join(game_dir, "data", "placeables",  "lizard", "productionPoints"))
-    dirs.append(os.path.join(game_dir, "data", "placeables", "lizard", "greenhouses"))
-    dirs.append(os.path.join(game_dir, "data", "placeables", "planET"))
-    folders = []
-    for path in dirs:
-        folders.extend([d for d in pathlib.Path(os.path.join(path)).iterdir() if d.is_dir()])
-    folders = sorted(folders)
 
-    point_out = []
-    prod_out = []
-    fill_out = []
-    cap_out = []
-    for folder_path in folders:
-        files = [p for p in pathlib.Path(folder_path).iterdir() if p.is_file()]
-        xml_files = [x for x in files if os.path.splitext(x)[1] == '.xml']
-        if xml_files:
-            point_dict = dict()
-            file = xml_files[0]
-            file_name = os.path.basename(file)
-            point_id = os.path.splitext(file_name)[0]
-            with open(file, 'r') as f:
-                data = f.read()
-            d = xmltodict.parse(data)
-
-            # production point
-            point_dict['id'] = point_id
-            place = d.get('placeable')
-            if place:
-                store = place.get('storeData')
-                if store:
-                    point_dict['name'] = store.get('name')
-                    point_dict['price'] = tryint(store.get('price'))
-                    # lifetime = int(store.get('lifetime'))
-                    prod_point = place.get('productionPoint')
-                    if prod_point:
-                        prods = prod_point.get('productions')
-                        point_dict['shared_throughput'] = trybool(prods.get('@sharedThroughputCapacity'))
-                        point_out.append(point_dict)
-
-                        # individual productions
-                        prod_list = prods.get('production')
-                        if isinstance(prod_list, dict):
-                            prod_list = [prod_list]
-                        for p in prod_list:
-                            prod_dict = dict()
-                            prod_dict['point_id'] = point_id
-                            prod_id = p.get('@id')
-                            prod_dict['id'] = prod_id
-                            prod_name = p.get('@name')
-                            prod_params = p.get('@params')
-                            if prod_params:
-                                prod_name = prod_name % tuple(prod_params.split('|'))
-                            prod_dict['name'] = prod_name
-                            prod_dict['cycles_hour'] = tryint(p.get('@cyclesPerHour'))
-                            prod_dict['cost_hour'] = tryfloat(p.get('@costsPerActiveHour'))
-                            prod_out.append(prod_dict)
-
-                            # inputs
-                            inputs = p.get('inputs')
-                            input_list = inputs.get('input')
-                            if isinstance(input_list, dict):
-                                input_list = [input_list]
-                            for i in input_list:
-                                input_dict = dict()
-                                input_dict['point_id'] = point_id
-                                input_dict['prod_id'] = prod_id
-                                input_dict['fill_type'] = i.get('@fillType')
-                                input_dict['direction'] = 'in'
-                                input_dict['amount'] = tryfloat(i.get('@amount'))
-                                input_dict['sell_direct'] = trybool(i.get('@sellDirectly'))
-                                fill_out.append(input_dict)
-
-                            # outputs
-                            outputs = p.get('outputs')
-                            output_list = outputs.get('output')
-                            if isinstance(output_list, dict):
-                                output_list = [output_list]
-                            for o in output_list:
-                                output_dict = dict()
-                                output_dict['point_id'] = point_id
-                                output_dict['prod_id'] = prod_id
-                                output_dict['fill_type'] = o.get('@fillType')
-                                output_dict['direction'] = 'out'
-                                output_dict['amount'] = tryfloat(o.get('@amount'))
-                                output_dict['sell_direct'] = trybool(o.get('@sellDirectly'))
-                                fill_out.append(output_dict)
-
-                            # capacity
-                            storage = prod_point.get('storage')
-                            cap_list = storage.get('capacity')
-                            if isinstance(cap_list, dict):
-                                cap_list = [cap_list]
-                            for cap in cap_list:
-                                cap_dict = dict()
-                                cap_dict['point_id'] = point_id
-                                cap_dict['prod_id'] = prod_id
-                                cap_dict['fill_type'] = cap.get('@fillType')
-                                cap_dict['capacity'] = tryfloat(cap.get('@capacity'))
-                                cap_out.append(cap_dict)
-        c.executemany(point_sql, point_out)
-        c.executemany(prod_sql, prod_out)
-        c.executemany(fill_sql, fill_out)
-        c.executemany(cap_sql, cap_out)
-        con.commit()
+    xml_files = prod_files(game_dir)
+
+    with BulkLoader(con) as load:
+        for points, prods, fills in map_files(prod_file_rows, xml_files, jobs=jobs):
+            load.add(point_sql, points)
+            load.add(prod_sql, prods)
+            load.add(fill_sql, fills)
+
+
+FRUIT_SPEC = Table(
+    'fruit', rows='map.fruitTypes.fruitType', source='data/maps/maps_fruitTypes.xml', columns=(
+        Col('name', '@name'),
+        Col('seed_rate', 'cultivation@seedUsagePerSqm', tryfloat),
+        Col('seed_need', 'cultivation@needsSeeding', trybool),
+        Col('liter_m2', 'harvest@literPerSqm', tryfloat),
+        Col('bee_bonus', 'harvest@beeYieldBonusPercentage', tryfloat, 0),
+        Col('windrow_out', 'windrow@name'),
+        Col('windrow_liter_m2', 'windrow@litersPerSqm', tryfloat),
+        Col('regrows', 'growth@regrows', trybool, False),
+        Col('state_growth_no', 'growth@numGrowthStates', tryint),
+        Col('state_regrowth', 'growth@firstRegrowthState', tryint),
+        Col('state_growth_time', 'growth@growthStateTime', tryint),
+        Col('state_withered', 'growth@witheredState', tryint),
+        Col('state_harvest_min', 'harvest@minHarvestingGrowthState', tryint),
+        Col('state_harvest_max', 'harvest@maxHarvestingGrowthState', tryint),
+        Col('state_forage_min', 'harvest@minForageGrowthState', tryint),
+        Col('state_cut', 'harvest@cutState', tryint),
+    ))
+
+FRUIT_CONVERT_SPEC = Table(
+    'type_convert', rows=('map.fruitTypeConverters.fruitTypeConverter', 'converter'),
+    source='data/maps/maps_fruitTypes.xml', columns=(
+        Col('type', None, default='fruit'),
+        Col('name', '^@name'),
+        Col('input', '@from'),
+        Col('output', '@to'),
+        Col('factor', '@factor', tryfloat),
+        Col('windrow_factor', '@windrowFactor', tryfloat),
+    ))
 
 
 def get_fruit(game_dir, con):
@@ -306,70 +364,43 @@ def get_fruit(game_dir, con):
         "INSERT OR IGNORE INTO type_convert (type, name, input, output, factor, windrow_factor) ",
         "VALUES (:type, :name, :input, :output, :factor, :windrow_factor);",
     ))
-    c = con.cursor()
-    map_dir = os.path.join(game_dir, "data", "maps")
-    fruit_file = os.path.join(map_dir, "maps_fruitTypes.xml")
-    with open(fruit_file, 'r') as f:
-        data = f.read()
-    d = xmltodict.parse(data)
-    fruit_list = d.get('map').get('fruitTypes').get('fruitType')
-
-    # fruits
-    fruit_out = []
-    for fruit in fruit_list:
-        fruit_dict = dict()
-        fruit_dict['name'] = fruit.get('@name')
-        fruit_dict['seed_rate'] = tryfloat(fruit.get('cultivation').get('@seedUsagePerSqm'))
-        fruit_dict['seed_need'] = trybool(fruit.get('cultivation').get('@needsSeeding'))
-        fruit_dict['liter_m2'] = tryfloat(fruit.get('harvest').get('@literPerSqm'))
-        fruit_dict['bee_bonus'] = tryfloat(fruit.get('harvest').get('@beeYieldBonusPercentage'))
-        if fruit_dict['bee_bonus'] is None:
-            fruit_dict['bee_bonus'] = 0
-        windrow = fruit.get('windrow')
-        if windrow:
-            fruit_dict['windrow_out'] = windrow.get('@name')
-            fruit_dict['windrow_liter_m2'] = tryfloat(windrow.get('@litersPerSqm'))
-        else:
-            fruit_dict['windrow_out'] = None
-            fruit_dict['windrow_liter_m2'] = None
-
-        fruit_dict['regrows'] = trybool(fruit.get('growth').get('@regrows'))
-        if fruit_dict['regrows'] is None:
-            fruit_dict['regrows'] = False
-        fruit_dict['state_growth_no'] = tryint(fruit.get('growth').get('@numGrowthStates'))
-        fruit_dict['state_regrowth'] = tryint(fruit.get('growth').get('@firstRegrowthState'))
-        fruit_dict['state_growth_time'] = tryint(fruit.get('growth').get('@growthStateTime'))
-        fruit_dict['state_withered'] = tryint(fruit.get('growth').get('@witheredState'))
-        fruit_dict['state_harvest_min'] = tryint(fruit.get('harvest').get('@minHarvestingGrowthState'))
-        fruit_dict['state_harvest_max'] = tryint(fruit.get('harvest').get('@maxHarvestingGrowthState'))
-        fruit_dict['state_forage_min'] = tryint(fruit.get('harvest').get('@minForageGrowthState'))
-        fruit_dict['state_cut'] = tryint(fruit.get('harvest').get('@cutState'))
-        fruit_out.append(fruit_dict)
-
-    # fruit conversions
-    convert_list = d.get('map').get('fruitTypeConverters').get('fruitTypeConverter')
-    if isinstance(convert_list, dict):
-        convert_list = [convert_list]
-    convert_out = []
-    convert_type = 'fruit'
-    for convert in convert_list:
-        convert_name = convert.get('@name')
-        converter_list = convert.get('converter')
-        if isinstance(converter_list, dict):
-            converter_list = [converter_list]
-        for l in converter_list:
-            convert_dict = dict()
-            convert_dict['type'] = convert_type
-            convert_dict['name'] = convert_name
-            convert_dict['input'] = l.get('@from')
-            convert_dict['output'] = l.get('@to')
-            convert_dict['factor'] = tryfloat(l.get('@factor'))
-            convert_dict['windrow_factor'] = tryfloat(l.get('@windrowFactor'))
-            convert_out.append(convert_dict)
-
-    c.executemany(fruit_sql, fruit_out)
-    c.executemany(convert_sql, convert_out)
-    con.commit()
+    fruit_file = os.path.join(game_dir, FRUIT_SPEC.source)
+    d = parse_sections(fruit_file, spec_sections(FRUIT_SPEC, FRUIT_CONVERT_SPEC))
+    fruit_out = FRUIT_SPEC.extract(d)
+    convert_out = FRUIT_CONVERT_SPEC.extract(d)
+
+    with BulkLoader(con) as load:
+        load.add(fruit_sql, fruit_out)
+        load.add(convert_sql, convert_out)
+
+
+FILL_SPEC = Table(
+    'fill', rows='map.fillTypes.fillType', source='data/maps/maps_fillTypes.xml', columns=(
+        Col('name', '@name'),
+        Col('title', '@title'),
+        Col('show', '@showOnPriceTable', trybool),
+        Col('unit', '@unitShort'),
+        Col('mass_l', 'physics@massPerLiter', tryfloat),
+        Col('price_l', 'economy@pricePerLiter', tryfloat),
+    ))
+
+FILL_FACTOR_SPEC = Table(
+    'fill_factor', rows=('map.fillTypes.fillType', 'economy.factors.factor'),
+    source='data/maps/maps_fillTypes.xml', columns=(
+        Col('name', '^@name'),
+        Col('period', '@period', tryint),
+        Col('value', '@value', tryfloat),
+    ))
+
+FILL_CONVERT_SPEC = Table(
+    'type_convert', rows=('map.fillTypeConverters.fillTypeConverter', 'converter'),
+    source='data/maps/maps_fillTypes.xml', columns=(
+        Col('type', None, default='fill'),
+        Col('name', '^@name'),
+        Col('input', '@from'),
+        Col('output', '@to'),
+        Col('factor', '@factor', tryfloat),
+    ))
 
 
 def get_fill(game_dir, con):
@@ -382,65 +413,16 @@ def get_fill(game_dir, con):
         "VALUES (:name, :title, :show, :unit, :mass_l, :price_l);"
     ))
     factor_sql = "INSERT OR IGNORE INTO fill_factor (name, period, value) VALUES (:name, :period, :value);"
-    c = con.cursor()
-    map_dir = os.path.join(game_dir, "data", "maps")
-    fruit_file = os.path.join(map_dir, "maps_fillTypes.xml")
-    with open(fruit_file, 'r') as f:
-        data = f.read()
-    d = xmltodict.parse(data)
-
-    # fills
-    fill_list = d.get('map').get('fillTypes').get('fillType')
-    if isinstance(fill_list, dict):
-        fill_list = [fill_list]
-    fill_out = []
-    factor_out = []
-    for fill in fill_list:
-        fill_dict = dict()
-        fill_name = fill.get('@name')
-        fill_dict['name'] = fill_name
-        fill_dict['title'] = fill.get('@title')
-        fill_dict['show'] = trybool(fill.get('@showOnPriceTable'))
-        fill_dict['unit'] = fill.get('@unitShort')
-        fill_dict['mass_l'] = tryfloat(fill.get('physics').get('@massPerLiter'))
-        economy = fill.get('economy')
-        fill_dict['price_l'] = tryfloat(economy.get('@pricePerLiter'))
-        fill_out.append(fill_dict)
-
-        # fill factors
-        factors = economy.get('factors')
-        if factors:
-            factor_list = factors.get('factor')
-            for factor in factor_list:
-                factor_dict = dict()
-                factor_dict['name'] = fill_name
-                factor_dict['period'] = tryint(factor.get('@period'))
-                factor_dict['value'] = tryfloat(factor.get('@value'))
-                factor_out.append(factor_dict)
-    c.executemany(fill_sql, fill_out)
-    c.executemany(factor_sql, factor_out)
-
-    # fill conversions
-    convert_list = d.get('map').get('fillTypeConverters').get('fillTypeConverter')
-    if isinstance(convert_list, dict):
-        convert_list = [convert_list]
-    convert_out = []
-    convert_type = 'fill'
-    for convert in convert_list:
-        convert_name = convert.get('@name')
-        converter_list = convert.get('converter')
-        if isinstance(converter_list, dict):
-            converter_list = [converter_list]
-        for l in converter_list:
-            convert_dict = dict()
-            convert_dict['type'] = convert_type
-            convert_dict['name'] = convert_name
-            convert_dict['input'] = l.get('@from')
-            convert_dict['output'] = l.get('@to')
-            convert_dict['factor'] = tryfloat(l.get('@factor'))
-            convert_out.append(convert_dict)
-    c.executemany(convert_sql, convert_out)
-    con.commit()
+    fill_file = os.path.join(game_dir, FILL_SPEC.source)
+    d = parse_sections(fill_file, spec_sections(FILL_SPEC, FILL_FACTOR_SPEC, FILL_CONVERT_SPEC))
+    fill_out = FILL_SPEC.extract(d)
+    factor_out = FILL_FACTOR_SPEC.extract(d)
+    convert_out = FILL_CONVERT_SPEC.extract(d)
+
+    with BulkLoader(con) as load:
+        load.add(fill_sql, fill_out)
+        load.add(factor_sql, factor_out)
+        load.add(convert_sql, convert_out)
 
 
 def get_animals(dataS_dir, con):
@@ -458,12 +440,9 @@ def get_animals(dataS_dir, con):
         "INSERT OR REPLACE INTO animal_fill (subtype, type, fill_type, direction, age_mo, liter_day)",
         "VALUES (:subtype, :type, :fill_type, :direction, :age_mo, :liter_day);"
     ))
-    c = con.cursor()
     animal_dir = os.path.join(dataS_dir, "character")
     animal_file = os.path.join(animal_dir, "animals.xml")
-    with open(animal_file, 'r') as f:
-        data = f.read()
-    d = xmltodict.parse(data)
+    d = parse_sections(animal_file, ('animal',))
     animal_list = d.get('animals').get('animal')
     if isinstance(animal_list, dict):
         animal_list = [animal_list]
@@ -565,10 +544,10 @@ def get_animals(dataS_dir, con):
                         # print(out_dict)
                         fill_out.append(out_dict)
 
-    c.executemany(animal_sql, animal_out)
-    c.executemany(price_sql, price_out)
-    c.executemany(fill_sql, fill_out)
-    con.commit()
+    with BulkLoader(con) as load:
+        load.add(animal_sql, animal_out)
+        load.add(price_sql, price_out)
+        load.add(fill_sql, fill_out)
 
 
 def get_animal_food(dataS_dir, con):
@@ -589,12 +568,9 @@ def get_animal_food(dataS_dir, con):
         "INSERT OR IGNORE INTO animal_food_recipe (fill_type, name, title, fill_types, pct_min, pct_max) ",
         "VALUES (:fill_type, :name, :title, :fill_types, :pct_min, :pct_max);"
     ))
-    c = con.cursor()
     animal_dir = os.path.join(dataS_dir, "character")
     food_file = os.path.join(animal_dir, "animalFood.xml")
-    with open(food_file, 'r') as f:
-        data = f.read()
-    d = xmltodict.parse(data)
+    d = parse_sections(food_file, ('animals', 'mixtures', 'recipes'))
     animal_food = d.get('animalFood')
     animal_list = animal_food.get('animals').get('animal')
     if isinstance(animal_list, dict):
@@ -674,15 +650,48 @@ def get_animal_food(dataS_dir, con):
             rin_dict['pct_min'] = tryfloat(ri.get('@minPercentage'))/100
             rin_dict['pct_max'] = tryfloat(ri.get('@maxPercentage'))/100
             rec_out.append(rin_dict)
-    c.executemany(animal_sql, animal_out)
-    c.executemany(group_sql, group_out)
-    c.executemany(fill_sql, fill_out)
-    c.executemany(mix_sql, mix_out)
-    c.executemany(rec_sql, rec_out)
-    con.commit()
+    with BulkLoader(con) as load:
+        load.add(animal_sql, animal_out)
+        load.add(group_sql, group_out)
+        load.add(fill_sql, fill_out)
+        load.add(mix_sql, mix_out)
+        load.add(rec_sql, rec_out)
+
+
+def animal_pen_files(game_dir):
+    return list(placeable_routes(game_dir)['animal_pen'])
+
+
+ANIMAL_POINT_SPEC = Table('animal_point', rows='placeable', when='husbandry', columns=(
+    Col('place_type', '@type'),
+    Col('name', 'storeData.name'),
+    Col('price', 'storeData.price', tryint),
+    Col('upkeep_price', 'storeData.dailyUpkeep', tryint),
+    Col('type', 'husbandry.animals@type'),
+    Col('unit_max', 'husbandry.animals@maxNumAnimals', tryint),
+    Col('food_cap', 'husbandry.food@capacity', tryint),
+    Col('food_default', ('husbandry.food.foodPlane@defaultFillType',
+                         'husbandry.food.dynamicFoodPlane@defaultFillType')),
+    Col('pallet_fill', 'husbandry.pallets@fillType'),
+    Col('pallet_maxno', 'husbandry.pallets@maxNumPallets', tryint),
+    Col('water_auto', 'husbandry.water@automaticWaterSupply', trybool),
+))
+
+ANIMAL_CAPACITY_SPEC = Table(
+    'animal_capacity', rows='placeable.husbandry.storage.capacity', columns=(
+        Col('fill_type', '@fillType'),
+        Col('capacity', '@capacity', tryint),
+    ))
 
 
-def get_animal_pen(game_dir, con):
+def animal_pen_file_rows(file):
+    point_id = os.path.splitext(os.path.basename(file))[0]
+    d = parse_sections(file, spec_sections(ANIMAL_POINT_SPEC, ANIMAL_CAPACITY_SPEC))
+    return (ANIMAL_POINT_SPEC.extract(d, id=point_id),
+            ANIMAL_CAPACITY_SPEC.extract(d, point_id=point_id))
+
+
+def get_animal_pen(game_dir, con, jobs=1):
     point_sql = '\n'.join((
         "INSERT OR IGNORE INTO animal_point (id, place_type, name, price, upkeep_price, type, unit_max,",
         "   food_cap, food_default, pallet_fill, pallet_maxno, water_auto)",
@@ -693,98 +702,62 @@ def get_animal_pen(game_dir, con):
         "INSERT OR IGNORE INTO animal_capacity (point_id, fill_type, capacity)",
         "VALUES (:point_id, :fill_type, :capacity);"
     ))
-    c = con.cursor()
-    dirs = []
-    dirs.append(os.path.join(game_dir, "data", "placeables", "lizard", "chickenBarnSmall"))
-    dirs.append(os.path.join(game_dir, "data", "placeables", "lizard", "cowBarnSmall"))
-    dirs.append(os.path.join(game_dir, "data", "placeables", "lizard", "horseBarnSmall"))
-    dirs.append(os.path.join(game_dir, "data", "placeables", "lizard", "pigBarnSmall"))
-    dirs.append(os.path.join(game_dir, "data", "placeables", "lizard", "sheepBarnSmall"))
-    dirs.append(os.path.join(game_dir, "data", "placeables", "rudolfHormann", "chickenBarnBig"))
-    dirs.append(os.path.join(game_dir, "data", "placeables", "rudolfHormann", "cowBarnBig"))
-    dirs.append(os.path.join(game_dir, "data", "placeables", "rudolfHormann", "cowBarnMedium"))
-    dirs.append(os.path.join(game_dir, "data", "placeables", "rudolfHormann", "horseBarnBig"))
-    dirs.append(os.path.join(game_dir, "data", "placeables", "rudolfHormann", "horseBarnMedium"))
-    dirs.append(os.path.join(game_dir, "data", "placeables", "rudolfHormann", "pigBarnBig"))
-    dirs.append(os.path.join(game_dir, "data", "placeables", "rudolfHormann", "pigBarnMedium"))
-    dirs.append(os.path.join(game_dir, "data", "placeables", "rudolfHormann", "sheepBarnBig"))
-    dirs.append(os.path.join(game_dir, "data", "placeables", "rudolfHormann", "sheepBarnMedium"))
+    xml_files = animal_pen_files(game_dir)
 
-    point_out = []
-    cap_out = []
-    for folder_path in dirs:
-        files = [p for p in pathlib.Path(folder_path).iterdir() if p.is_file()]
-        xml_files = [x for x in files if os.path.splitext(x)[1] == '.xml']
-        for file in xml_files:
-            point_dict = dict()
-            file_name = os.path.basename(file)
-            point_id = os.path.splitext(file_name)[0]
-            with open(file, 'r') as f:
-                data = f.read()
-            d = xmltodict.parse(data)
-
-            point_dict['id'] = point_id
-            place = d.get('placeable')
-            if place:
-                point_dict['place_type'] = place.get('@type')
-                store = place.get('storeData')
-                if store:
-                    point_dict['name'] = store.get('name')
-                    point_dict['price'] = tryint(store.get('price'))
-                    point_dict['upkeep_price'] = tryint(store.get('dailyUpkeep'))
-                husbandry = place.get('husbandry')
-                if husbandry:
-                    storage = husbandry.get('storage')
-                    if storage:
-                        cap_list = storage.get('capacity')
-                        if isinstance(cap_list, dict):
-                            cap_list = [cap_list]
-                        for cap in cap_list:
-                            cap_dict = dict()
-                            cap_dict['point_id'] = point_id
-                            cap_dict['fill_type'] = cap.get('@fillType')
-                            cap_dict['capacity'] = tryint(cap.get('@capacity'))
-                            cap_out.append(cap_dict)
-
-                    animals = husbandry.get('animals')
-                    if animals:
-                        point_dict['type'] = animals.get('@type')
-                        point_dict['unit_max'] = tryint(animals.get('@maxNumAnimals'))
-                    else:
-                        point_dict['type'] = None
-                        point_dict['unit_max'] = None
-                    food = husbandry.get('food')
-                    if food:
-                        point_dict['food_cap'] = tryint(food.get('@capacity'))
-                        if food.get('foodPlane'):
-                            point_dict['food_default'] = food.get('foodPlane').get('@defaultFillType')
-                        elif food.get('dynamicFoodPlane'):
-                            point_dict['food_default'] = food.get('dynamicFoodPlane').get('@defaultFillType')
-                        else:
-                            point_dict['food_default'] = None
-                    else:
-                        point_dict['food_cap'] = None
-                        point_dict['food_default'] = None
-                    pallets = husbandry.get('pallets')
-                    if pallets:
-                        point_dict['pallet_fill'] = pallets.get('@fillType')
-                        point_dict['pallet_maxno'] = tryint(pallets.get('@maxNumPallets'))
-                    else:
-                        point_dict['pallet_fill'] = None
-                        point_dict['pallet_maxno'] = None
-                    water = husbandry.get('water')
-                    if water:
-                        point_dict['water_auto'] = trybool(water.get('@automaticWaterSupply'))
-                    else:
-                        point_dict['water_auto'] = None
-                    point_out.append(point_dict)
-
-    c.executemany(point_sql, point_out)
-    c.executemany(cap_sql, cap_out)
-    con.commit()
+    with BulkLoader(con) as load:
+        for points, caps in map_files(animal_pen_file_rows, xml_files, jobs=jobs):
+            load.add(point_sql, points)
+            load.add(cap_sql, caps)
+
+
+def placeable_files(game_dir):
+    return list(placeable_routes(game_dir)['placeable'])
 
 
-def get_placeable(game_dir, con):
+def placeable_file_rows(file):
+    place_out = []
+
+    point_dict = dict()
+    file_name = os.path.basename(file)
+    point_id = os.path.splitext(file_name)[0]
+    d = parse_sections(file, ('parentFile', 'storeData', 'beehive', 'manureHeap'))
+
+    # point
+    point_dict['id'] = point_id
+    place = d.get('placeable')
+    if place:
+        parent = place.get('parentFile')
+        if parent:
+            return place_out
+        point_dict['type'] = place.get('@type')
+        store = place.get('storeData')
+        if store:
+            point_dict['name'] = store.get('name')
+            point_dict['price'] = tryint(store.get('price'))
+            point_dict['price_upkeep_day'] = store.get('dailyUpkeep')
+            point_dict['brand'] = store.get('brand')
+            point_dict['category'] = store.get('category')
+            # here in case of multiple types of tags
+            point_dict['radius'] = None
+            point_dict['liter_day'] = None
+            point_dict['capacity'] = None
+            point_dict['is_extension'] = None
+            point_dict['fill_type'] = None
+        beehive = place.get('beehive')
+        if beehive:
+            point_dict['radius'] = tryfloat(beehive.get('@actionRadius'))
+            point_dict['liter_day'] = tryfloat(beehive.get('@litersHoneyPerDay'))
+            point_dict['fill_type'] = 'HONEY'
+        manure_heap = place.get('manureHeap')
+        if manure_heap:
+            point_dict['capacity'] = tryfloat(manure_heap.get('@capacity'))
+            point_dict['is_extension'] = tryfloat(manure_heap.get('@isExtension'))
+            point_dict['fill_type'] = 'MANURE'
+        place_out.append(point_dict)
+    return place_out
+
+
+def get_placeable(game_dir, con, jobs=1):
     place_sql = '\n'.join((
         "INSERT OR IGNORE INTO placeable (",
         "   id, name, type, price, price_upkeep_day, brand, category, capacity, is_extension, radius, liter_day,",
@@ -792,62 +765,12 @@ def get_placeable(game_dir, con):
         "VALUES (:id, :name, :type, :price, :price_upkeep_day, :brand, :category, :capacity, :is_extension, :radius,",
         "   :liter_day, :fill_type);"
     ))
-    c = con.cursor()
-    dirs = []
-    dirs.append(os.path.join(game_dir, "data", "placeables", "lizard", "beeHives"))
-    folders = []
-    for path in dirs:
-        folders.extend([d for d in pathlib.Path(os.path.join(path)).iterdir() if d.is_dir()])
-    folders.append(pathlib.Path(os.path.join(game_dir, "data", "placeables", "lizard", "manureHeap")))
-    folders = sorted(folders)
+    xml_files = placeable_files(game_dir)
+
+    with BulkLoader(con) as load:
+        for places in map_files(placeable_file_rows, xml_files, jobs=jobs):
+            load.add(place_sql, places)
 
-    place_out = []
-    for folder_path in folders:
-        files = [p for p in pathlib.Path(folder_path).iterdir() if p.is_file()]
-        xml_files = [x for x in files if os.path.splitext(x)[1] == '.xml']
-        if xml_files:
-            for file in xml_files:
-                point_dict = dict()
-                file_name = os.path.basename(file)
-                point_id = os.path.splitext(file_name)[0]
-                with open(file, 'r') as f:
-                    data = f.read()
-                d = xmltodict.parse(data)
-
-                # point
-                point_dict['id'] = point_id
-                place = d.get('placeable')
-                if place:
-                    parent = place.get('parentFile')
-                    if parent:
-                        continue
-                    point_dict['type'] = place.get('@type')
-                    store = place.get('storeData')
-                    if store:
-                        point_dict['name'] = store.get('name')
-                        point_dict['price'] = tryint(store.get('price'))
-                        point_dict['price_upkeep_day'] = store.get('dailyUpkeep')
-                        point_dict['brand'] = store.get('brand')
-                        point_dict['category'] = store.get('category')
-                        # here in case of multiple types of tags
-                        point_dict['radius'] = None
-                        point_dict['liter_day'] = None
-                        point_dict['capacity'] = None
-                        point_dict['is_extension'] = None
-                        point_dict['fill_type'] = None
-                    beehive = place.get('beehive')
-                    if beehive:
-                        point_dict['radius'] = tryfloat(beehive.get('@actionRadius'))
-                        point_dict['liter_day'] = tryfloat(beehive.get('@litersHoneyPerDay'))
-                        point_dict['fill_type'] = 'HONEY'
-                    manure_heap = place.get('manureHeap')
-                    if manure_heap:
-                        point_dict['capacity'] = tryfloat(manure_heap.get('@capacity'))
-                        point_dict['is_extension'] = tryfloat(manure_heap.get('@isExtension'))
-                        point_dict['fill_type'] = 'MANURE'
-                    place_out.append(point_dict)
-    c.executemany(place_sql, place_out)
-    con.commit()
 
 def add_production_queries(con):
     c = con.cursor()
@@ -866,19 +789,24 @@ if __name__ == '__main__':
                                 'populates a sqlite database with results.',
                     epilog='Script finished.')
 
-    parser.add_argument('game_dir', help = 'The base game path containing the `data` folder.')
+    parser.add_argument('game_dir',
+                        help = 'The base game path containing the `data` folder, or a zip '
+                               'archive of it.')
     parser.add_argument('db_path',
                         help = 'The path at which to store the scraped contents database')
 
     parser.add_argument('-d', '--dataS_dir',
-                        help = 'The path containing the dataS directory (unzipped and unencrypted'
-                               ' of course).')
+                        help = 'The path containing the dataS directory (unencrypted of course).'
+                               ' It may also be a zip archive, e.g. dataS.zip or dataS.zip/dataS.')
+    parser.add_argument('-j', '--jobs', type = int, default = 1,
+                        help = 'Number of processes used to parse placeable XML files '
+                               '(default 1, no pool).')
     
     args = parser.parse_args(my_args)
     
     con = create_db(db_path=args.db_path)
     print("Scraping production...")
-    get_prod(game_dir=args.game_dir, con=con)
+    get_prod(game_dir=args.game_dir, con=con, jobs=args.jobs)
     print("Scraping fruit...")
     get_fruit(game_dir=args.game_dir, con=con)
     print("Scraping fill...")
@@ -889,9 +817,10 @@ if __name__ == '__main__':
         print("Scraping animal food...")
         get_animal_food(dataS_dir=args.dataS_dir, con=con)
     print("Scraping animal pens...")
-    get_animal_pen(game_dir=args.game_dir, con=con)
+    get_animal_pen(game_dir=args.game_dir, con=con, jobs=args.jobs)
     print("Scraping beehives...")
-    get_placeable(game_dir=args.game_dir, con=con)
+    get_placeable(game_dir=args.game_dir, con=con, jobs=args.jobs)
+    add_indexes(con)
     print("Adding production queries...")
     add_production_queries(con=con)
     con.close()
@@ -1,11 +1,26 @@
 import os
-import pathlib
 import sqlite3 as sqlite
 import argparse
 import sys
-import copy
+import functools
+import collections
+import hashlib
+import json
+import re
+import time
+import tempfile
 import sqlparse
-import xmltodict
+from fs_l10n import (fingerprint, format_text, inline_l10n, l10n_files, read_l10n,
+                     resolve_rows)
+from fs_load import BulkLoader, map_files, publish, pull_partitions, restore
+from fs_prof import count, profile_file, profile_report, profiling, start_stage, stop_stage
+from fs_profit import PROFIT_TABLES, drop_profit_views, record_inputs, refresh_profit
+from fs_sched import Stage, schedule, schedule_report
+from fs_spec import Col, Table, as_list, spec_sections
+from fs_watch import make_watcher, watch_changes
+from fs_xml import (parent_path, parse_resolved, parse_sections, placeable_index,
+                    resolved_file, route_placeables, sniff_xml)
+from fs_zip import file_stat, is_file, open_file, walk_files
 
 def tryint(text):
     if text:
@@ -41,37 +56,243 @@ def trybool(text):
         conv = None
     return conv
 
-def nested_set(dic, keys, value):
-    for key in keys[:-1]:
-        if not isinstance(dic[key], dict):
-            v = dic[key]
-            dic[key] = {'#text': v}
-        dic = dic.setdefault(key, {})
-    dic[keys[-1]] = value
-
-
-def get_parent(game_dir, child, parent_link, key):
-    parent_f = os.path.join(game_dir, parent_link.get('@xmlFilename').replace('$', ''))
-    with open(parent_f, 'r', encoding='utf8') as f:
-        data2 = f.read()
-    d2 = xmltodict.parse(data2)
-    parent = d2.get(key)
-    for k in child.keys():
-        parent[k] = child[k]
-    child_attrs = parent_link.get('attributes')
-    if child_attrs:
-        set_list = child_attrs.get('set')
-        if isinstance(set_list, dict):
-            set_list = [set_list]
-        for s in set_list:
-            path_keys = s.get('@path').replace('#', '.@').split('.')[1:]
-            value = s.get('@value')
-            nested_set(dic=parent, keys=path_keys, value=value)
-    return parent
-
-
-def create_db(db_path=':memory:'):
+
+def row_type(name, fields):
+    # a row of a table filled file by file: a named tuple of its columns in the order of their
+    # INSERT, None unless given. It takes a fraction of the memory of a dict, pickles without
+    # the column names and goes to executemany as it is
+    fields = fields.split()
+    return collections.namedtuple(name, fields, defaults=(None,) * len(fields))
+
+
+# primary key columns of the tables filled file by file, used to find the rows a source file
+# produced when it changes or disappears
+MANIFEST_KEYS = {
+    'prod_point': ('id', 'type'),
+    'production': ('point_id', 'point_type', 'id'),
+    'prod_fill': ('point_id', 'point_type', 'prod_id', 'fill_type'),
+    'animal_point': ('id',),
+    'animal_capacity': ('point_id', 'fill_type'),
+    'placeable': ('id',),
+    'vehicle': ('id',),
+    'vehicle_motor': ('vehicle_id', 'idx'),
+    'sell_point': ('id',),
+    'sell_point_fill': ('point_id', 'fill_type'),
+    'sell_point_category': ('point_id', 'category'),
+}
+
+PARENT_RE = re.compile(rb'<parentFile\s[^>]*xmlFilename="([^"]+)"')
+
+
+def file_mod(path, mods):
+    # (source, mod folder) of the mod in mods, (source, folder) pairs, a file belongs to
+    for source, mod_dir in mods or ():
+        if path.startswith(mod_dir + os.sep):
+            return source, mod_dir
+    return 'base', None
+
+
+def file_state(path, game_dir, known=None, mods=None):
+    # size and mtime are checked first so unchanged files are never read
+    size, mtime = file_stat(path)
+    if known is not None and known['size'] == size and known['mtime'] == mtime:
+        return dict(known)
+    with open_file(path) as f:
+        data = f.read()
+    parent = PARENT_RE.search(data)
+    if parent:
+        parent = parent_path(game_dir, parent.group(1).decode('utf8'), file_mod(path, mods)[1])
+    return {'path': path, 'size': size, 'mtime': mtime,
+            'sha1': hashlib.sha1(data).hexdigest(), 'parent': parent}
+
+
+def manifest_write(con, stage, states):
+    c = con.cursor()
+    c.executemany('\n'.join((
+        "INSERT OR REPLACE INTO scrape_manifest (stage, path, size, mtime, sha1, parent)",
+        "VALUES (:stage, :path, :size, :mtime, :sha1, :parent);"
+    )), [dict(st, stage=stage) for st in states])
+
+
+def table_rows(tables, result):
+    # pairs the row lists returned by a *_file_rows function with the tables they go to
+    if len(tables) == 1:
+        result = (result,)
+    return zip(tables, result)
+
+
+def row_keys(tables, result):
+    keys = set()
+    for table, rows in table_rows(tables, result):
+        cols = MANIFEST_KEYS[table]
+        for row in rows:
+            keys.add((table, json.dumps([getattr(row, k) for k in cols])))
+    return keys
+
+
+def manifest_scrape(con, stage, files, tables, file_rows, game_dir, jobs=1, mods=None):
+    """
+    Compares the files of a stage against the manifest, parses every added or changed file
+    (plus files whose parentFile or row keys they share) and deletes the rows of everything
+    reparsed or deleted. Yields (file state, file_rows result) pairs in file order, ready to be
+    written and passed to manifest_record. mods are the (source, folder) pairs of the mods the
+    files may come from.
+
+    Files parsed only to see which other files their row keys pull in are held until written.
+    Once every file is to be parsed anyway (the first scrape, or after a reset) nothing more can
+    be pulled in, and the rest are parsed as they are written instead.
+
+    When the stage is profiled every parsed file's read, parse, extract and write (the time the
+    caller takes with its rows) seconds go to scrape_profile.
+    """
+    c = con.cursor()
+    profiled = profiling()
+    if profiled:
+        file_rows = functools.partial(profile_file, file_rows)
+    known = {r['path']: dict(r) for r in c.execute(
+        "SELECT path, size, mtime, sha1, parent FROM scrape_manifest WHERE stage = ?;", (stage,))}
+    paths = {os.path.normpath(f): f for f in files}
+    current = {}
+    queue = list(paths)
+    while queue:
+        path = queue.pop()
+        if path in current or not is_file(path):
+            continue
+        current[path] = file_state(path, game_dir, known.get(path), mods)
+        if current[path]['parent']:
+            queue.append(current[path]['parent'])
+
+    dirty = {p for p in current if p not in known or known[p]['sha1'] != current[p]['sha1']}
+    dirty |= set(known) - set(current)
+
+    keys_by_path = {}
+    paths_by_key = {}
+    for r in c.execute("SELECT path, table_name, row_key FROM scrape_manifest_row "
+                       "WHERE stage = ?;", (stage,)):
+        key = (r['table_name'], r['row_key'])
+        keys_by_path.setdefault(r['path'], set()).add(key)
+        paths_by_key.setdefault(key, set()).add(r['path'])
+
+    # a changed parent changes its children, and a row key shared with another file has to be
+    # rewritten from both files in order so the first one still wins the INSERT OR IGNORE
+    results = {}
+    while True:
+        grown = True
+        while grown:
+            grown = False
+            for path, st in current.items():
+                if path not in dirty and st['parent'] in dirty:
+                    dirty.add(path)
+                    grown = True
+            for path in list(dirty):
+                for key in keys_by_path.get(path, ()):
+                    others = paths_by_key[key] - dirty
+                    if others:
+                        dirty |= others
+                        grown = True
+        parse = [p for p in paths if p in dirty and p in current and p not in results]
+        if not parse or all(p in dirty for p in paths if p in current):
+            break
+        for path, result in zip(parse, map_files(file_rows, [paths[p] for p in parse],
+                                                 jobs=jobs)):
+            results[path] = result
+            for key in row_keys(tables, result[0] if profiled else result):
+                dirty |= paths_by_key.get(key, set())
+
+    stale = {}
+    for path in dirty:
+        for table, row_key in keys_by_path.get(path, ()):
+            stale.setdefault(table, set()).add(row_key)
+    for table in reversed(list(dict.fromkeys(tables))):
+        where = ' AND '.join(f"{k} IS ?" for k in MANIFEST_KEYS[table])
+        c.executemany(f"DELETE FROM {table} WHERE {where};",
+                      [json.loads(k) for k in sorted(stale.get(table, ()))])
+    c.executemany("DELETE FROM scrape_manifest_row WHERE stage = ? AND path = ?;",
+                  [(stage, p) for p in dirty])
+    c.executemany("DELETE FROM scrape_manifest WHERE stage = ? AND path = ?;",
+                  [(stage, p) for p in dirty])
+    todo = [p for p in paths if p in dirty and p in current]
+    parsed = set(todo)
+    manifest_write(con, stage, [st for p, st in current.items() if p not in parsed])
+    fresh = map_files(file_rows, [paths[p] for p in todo if p not in results], jobs=jobs)
+    timings = []
+    for path in todo:
+        result = results.pop(path) if path in results else next(fresh)
+        if not profiled:
+            yield current[path], result
+            continue
+        result, timing = result
+        for key in ('read', 'parse', 'extract'):
+            count(key, timing[key])
+        start = time.perf_counter()
+        yield current[path], result
+        timing['write'] = time.perf_counter() - start
+        timings.append((stage, path, sum(timing.values()), timing['read'], timing['parse'],
+                        timing['extract'], timing['write'],
+                        sum(len(rows) for table, rows in table_rows(tables, result))))
+    c.executemany('\n'.join((
+        "INSERT OR REPLACE INTO scrape_profile (stage, path, seconds, read_s, parse_s, extract_s,",
+        "  write_s, rows)",
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?);"
+    )), timings)
+
+
+def manifest_record(con, stage, state, tables, result):
+    c = con.cursor()
+    manifest_write(con, stage, [state])
+    c.executemany('\n'.join((
+        "INSERT OR IGNORE INTO scrape_manifest_row (stage, path, table_name, row_key)",
+        "VALUES (?, ?, ?, ?);"
+    )), [(stage, state['path'], table, key) for table, key in sorted(row_keys(tables, result))])
+
+
+def manifest_stage_current(con, stage, files, game_dir, mods=None):
+    """
+    True when a single pass stage has already been scraped from files and nothing it read has
+    changed since. Every other file the stage read must have been listed by one of files, so a
+    mod that was dropped since makes the stage current no longer.
+    """
+    c = con.cursor()
+    known = {r['path']: dict(r) for r in c.execute(
+        "SELECT path, size, mtime, sha1, parent FROM scrape_manifest WHERE stage = ?;", (stage,))}
+    roots = {os.path.normpath(f) for f in files}
+    if not roots.issubset(known):
+        return False
+    for path, entry in known.items():
+        if path not in roots and entry['parent'] not in roots:
+            return False
+        if not is_file(path):
+            return False
+        if file_state(path, game_dir, entry, mods)['sha1'] != entry['sha1']:
+            return False
+    return True
+
+
+def manifest_replace_stage(con, stage, files, game_dir, listed_by=None, mods=None):
+    # listed_by maps the files that were found through another file (foliage files through the
+    # fruit types file) to that file, which is kept as their parent
+    c = con.cursor()
+    c.execute("DELETE FROM scrape_manifest WHERE stage = ?;", (stage,))
+    states = []
+    for f in files:
+        state = file_state(os.path.normpath(f), game_dir, mods=mods)
+        if listed_by and f in listed_by:
+            state['parent'] = os.path.normpath(listed_by[f])
+        states.append(state)
+    manifest_write(con, stage, states)
+
+
+# tables whose rows may come from a mod, tagged with the mod's name in source
+SOURCE_TABLES = ('prod_point', 'fruit', 'fill', 'animal_point', 'placeable', 'vehicle',
+                 'sell_point')
+
+
+def create_db(db_path=':memory:', restore_from=None):
+    # restore_from, a database file whose contents db_path starts with (an in-memory database
+    # building on the last scrape)
     con = sqlite.connect(db_path)
+    if restore_from is not None:
+        restore(con, restore_from)
     con.row_factory = sqlite.Row
     c = con.cursor()
     c.execute("PRAGMA foreign_keys = ON;")
@@ -79,6 +300,7 @@ def create_db(db_path=':memory:'):
         '\n'.join((
             "CREATE TABLE IF NOT EXISTS prod_point (",
             "    id TEXT, type TEXT, name TEXT, price REAL, shared_throughput BOOLEAN,",
+            "    source TEXT DEFAULT 'base',",
             "    PRIMARY KEY (id, type)"
             ");"
         )),
@@ -107,14 +329,14 @@ def create_db(db_path=':memory:'):
             "   windrow_cut_factor REAL, growth_resets_spray BOOLEAN, growth_require_lime BOOLEAN,",
             "   soil_lowdensity_req BOOLEAN, soil_increases_density BOOLEAN,",
             "   soil_consumes_lime BOOLEAN, soil_start_spraylevel INTEGER,",
-            "   cultivation_allowed BOOLEAN, mulch_chopper_type TEXT",
+            "   cultivation_allowed BOOLEAN, mulch_chopper_type TEXT, source TEXT DEFAULT 'base'",
             ");",
         )),
         "CREATE TABLE IF NOT EXISTS fruit_category (name TEXT PRIMARY KEY, fruit_types TEXT);",
         '\n'.join((
             "CREATE TABLE IF NOT EXISTS fill (",
             "   name TEXT PRIMARY KEY, title TEXT, show BOOLEAN, unit TEXT, mass_l REAL,",
-            "   price_l REAL",
+            "   price_l REAL, source TEXT DEFAULT 'base', title_text TEXT",
             ");"
         )),
         '\n'.join((
@@ -181,7 +403,8 @@ def create_db(db_path=':memory:'):
             "CREATE TABLE IF NOT EXISTS animal_point (",
             "   id TEXT PRIMARY KEY, place_type TEXT, name TEXT, price REAL, upkeep_price REAL,",
             "   type TEXT, unit_max INTEGER, food_cap INTEGER, food_default TEXT,",
-            "   pallet_fill TEXT, pallet_maxno INTEGER, water_auto BOOLEAN",
+            "   pallet_fill TEXT, pallet_maxno INTEGER, water_auto BOOLEAN,",
+            "   source TEXT DEFAULT 'base'",
             ");"
         )),
         '\n'.join((
@@ -194,7 +417,80 @@ def create_db(db_path=':memory:'):
             "CREATE TABLE IF NOT EXISTS placeable (",
             "   id TEXT PRIMARY KEY, name TEXT, type TEXT, price REAL, price_upkeep_day REAL,",
             "   brand TEXT, category TEXT, capacity REAL, is_extension BOOLEAN, radius REAL,",
-            "   liter_day REAL, fill_type TEXT, income_hour REAL",
+            "   liter_day REAL, fill_type TEXT, income_hour REAL, source TEXT DEFAULT 'base'",
+            ");"
+        )),
+        '\n'.join((
+            "CREATE TABLE IF NOT EXISTS vehicle (",
+            "   id TEXT PRIMARY KEY, type TEXT, name TEXT, brand TEXT, category TEXT, price REAL,",
+            "   upkeep_day REAL, lifetime REAL, power INTEGER, needed_power INTEGER,",
+            "   max_speed REAL, working_width REAL, fuel_fill TEXT, fuel_usage REAL,",
+            "   source TEXT DEFAULT 'base'",
+            ");"
+        )),
+        '\n'.join((
+            "CREATE TABLE IF NOT EXISTS vehicle_motor (",
+            "   vehicle_id TEXT, idx INTEGER, name TEXT, hp INTEGER, price REAL, max_speed REAL,",
+            "   fuel_fill TEXT, fuel_usage REAL,",
+            "   PRIMARY KEY (vehicle_id, idx),",
+            "   FOREIGN KEY(vehicle_id) REFERENCES vehicle(id)",
+            ");"
+        )),
+        '\n'.join((
+            "CREATE TABLE IF NOT EXISTS sell_point (",
+            "   id TEXT PRIMARY KEY, type TEXT, name TEXT, source TEXT DEFAULT 'base'",
+            ");"
+        )),
+        '\n'.join((
+            "CREATE TABLE IF NOT EXISTS sell_point_fill (",
+            "   point_id TEXT, fill_type TEXT, price_scale REAL, great_demand BOOLEAN,",
+            "   PRIMARY KEY (point_id, fill_type),",
+            "   FOREIGN KEY(point_id) REFERENCES sell_point(id)",
+            ");"
+        )),
+        '\n'.join((
+            "CREATE TABLE IF NOT EXISTS sell_point_category (",
+            "   point_id TEXT, category TEXT,",
+            "   PRIMARY KEY (point_id, category),",
+            "   FOREIGN KEY(point_id) REFERENCES sell_point(id)",
+            ");"
+        )),
+        '\n'.join((
+            "CREATE TABLE IF NOT EXISTS map_placeable (",
+            "   map TEXT, point_id TEXT, placed INTEGER,",
+            "   PRIMARY KEY (map, point_id)",
+            ");"
+        )),
+        '\n'.join((
+            "CREATE TABLE IF NOT EXISTS l10n (",
+            "   lang TEXT, key TEXT, text TEXT,",
+            "   PRIMARY KEY (lang, key)",
+            ");"
+        )),
+        "CREATE TABLE IF NOT EXISTS scrape_l10n (stage TEXT PRIMARY KEY, fingerprint TEXT);",
+        '\n'.join((
+            "CREATE TABLE IF NOT EXISTS scrape_profile (",
+            "   stage TEXT, path TEXT, seconds REAL, read_s REAL, parse_s REAL, extract_s REAL,",
+            "   write_s REAL, rows INTEGER,",
+            "   PRIMARY KEY (stage, path)",
+            ");"
+        )),
+        '\n'.join((
+            "CREATE TABLE IF NOT EXISTS scrape_profile_stage (",
+            "   stage TEXT PRIMARY KEY, seconds REAL, files INTEGER, rows INTEGER, read_s REAL,",
+            "   parse_s REAL, extract_s REAL, write_s REAL",
+            ");"
+        )),
+        '\n'.join((
+            "CREATE TABLE IF NOT EXISTS scrape_manifest (",
+            "   stage TEXT, path TEXT, size INTEGER, mtime REAL, sha1 TEXT, parent TEXT,",
+            "   PRIMARY KEY (stage, path)"
+            ");"
+        )),
+        '\n'.join((
+            "CREATE TABLE IF NOT EXISTS scrape_manifest_row (",
+            "   stage TEXT, path TEXT, table_name TEXT, row_key TEXT,",
+            "   PRIMARY KEY (stage, path, table_name, row_key)",
             ");"
         ))
     ]
@@ -205,191 +501,393 @@ def create_db(db_path=':memory:'):
         except sqlite.OperationalError as error:
             print(stmt)
             raise error
+    # databases scraped before mods were read lack the source column
+    for table in SOURCE_TABLES:
+        cols = [r['name'] for r in c.execute(f"PRAGMA table_info({table});")]
+        if 'source' not in cols:
+            c.execute(f"ALTER TABLE {table} ADD COLUMN source TEXT DEFAULT 'base';")
+    # and before names were localised the fill title text
+    if 'title_text' not in [r['name'] for r in c.execute("PRAGMA table_info(fill);")]:
+        c.execute("ALTER TABLE fill ADD COLUMN title_text TEXT;")
     con.commit()
     return con
 
 
-def get_prod(game_dir, con):
+# indexes on the join and lookup keys of the queries file, fs_profit and the animal simulator
+# (animal_queries) beyond the primary keys. A scrape builds them once its stages have loaded
+# their rows (see check_plans.py for the plans they are there for)
+INDEX_SQL = (
+    "CREATE INDEX IF NOT EXISTS prod_fill_fill ON prod_fill (fill_type);",
+    "CREATE INDEX IF NOT EXISTS animal_fill_subtype ON animal_fill (subtype, direction);",
+    "CREATE INDEX IF NOT EXISTS animal_fill_type ON animal_fill (type);",
+    "CREATE INDEX IF NOT EXISTS animal_type ON animal (type);",
+    "CREATE INDEX IF NOT EXISTS animal_food_group_type ON animal_food_group (type, title);",
+    "CREATE INDEX IF NOT EXISTS animal_food_fill_fill ON animal_food_fill (fill_type);",
+    "CREATE INDEX IF NOT EXISTS animal_point_type ON animal_point (type);",
+    "CREATE INDEX IF NOT EXISTS placeable_fill ON placeable (fill_type);",
+    "CREATE INDEX IF NOT EXISTS map_placeable_point ON map_placeable (point_id);",
+)
+
+
+def add_indexes(con):
     c = con.cursor()
+    for stmt in INDEX_SQL:
+        c.execute(stmt)
+    con.commit()
+
+
+# top level tags (or placeable types) that send a placeable xml to a stage, first match wins
+PLACEABLE_ROUTES = {
+    'prod': ('productionPoint',),
+    'animal_pen': ('husbandry',),
+    'placeable': ('beehive', 'manureHeap', 'solarPanels', 'windTurbine', 'riceField'),
+}
+
+
+# placeable routes of each game folder already scanned in this process
+PLACEABLE_INDEX = {}
+
+
+def placeable_routes(game_dir):
+    # one scan of data/placeables shared by every stage. The scheduler scans in a stage of its
+    # own and hands the result to the worker processes through PLACEABLE_INDEX
+    if game_dir not in PLACEABLE_INDEX:
+        PLACEABLE_INDEX[game_dir] = placeable_index(game_dir, PLACEABLE_ROUTES)
+    return PLACEABLE_INDEX[game_dir]
+
+
+# modDesc.xml (and map config) sections that declare what a mod adds
+MOD_SECTIONS = ('storeItems', 'maps', 'fillTypes', 'fruitTypes', 'l10n')
+
+
+def as_map(d):
+    # mod fill and fruit types files are read like the base map files whatever their root tag is
+    return {'map': next(iter(d.values()))} if d else {}
+
+
+def mod_type_files(d, key, item, file, game_dir, mod_dir):
+    # the files a modDesc or map config points to for key (fillTypes, fruitTypes); types listed
+    # inline make the declaring file itself a source
+    out = []
+    for decl in as_list(d.get(key)):
+        if not isinstance(decl, dict):
+            continue
+        if decl.get('@filename'):
+            out.append(parent_path(game_dir, decl.get('@filename'), mod_dir))
+        elif decl.get(item):
+            out.append(file)
+    return out
+
+
+def mod_l10n(desc, desc_file, mod_dir):
+    # (prefix of the mod's l10n files, its modDesc.xml when that holds texts itself)
+    l10n = desc.get('l10n')
+    if not isinstance(l10n, dict):
+        return None, None
+    prefix = l10n.get('@filenamePrefix')
+    return (os.path.join(mod_dir, *prefix.split('/')) if prefix else None,
+            desc_file if l10n.get('text') else None)
+
+
+def mod_info(mod_dir, game_dir):
+    """
+    What a mod folder (or zip archive) adds, as declared in its modDesc.xml: its store items
+    sorted into PLACEABLE_ROUTES and the files of its fill and fruit types, including those of
+    the maps it brings, its vehicles, its maps as game_maps has them and where its texts are.
+    None when there is no modDesc.xml.
+    """
+    mod_dir = os.path.normpath(mod_dir)
+    desc_file = os.path.join(mod_dir, 'modDesc.xml')
+    if not is_file(desc_file):
+        return None
+    source = os.path.basename(mod_dir)
+    if source.lower().endswith('.zip'):
+        source = source[:-4]
+    desc = parse_sections(desc_file, MOD_SECTIONS).get('modDesc') or {}
+    store_files = []
+    for store_items in as_list(desc.get('storeItems')):
+        for item in as_list(store_items.get('storeItem') if store_items else None):
+            if item.get('@xmlFilename'):
+                store_files.append(parent_path(game_dir, item.get('@xmlFilename'), mod_dir))
+    store_files = [f for f in dict.fromkeys(store_files) if is_file(f)]
+
+    configs = [(desc_file, desc)]
+    maps_out = []
+    for maps in as_list(desc.get('maps')):
+        for m in as_list(maps.get('map') if maps else None):
+            if not m.get('@configFilename'):
+                continue
+            config_file = parent_path(game_dir, m.get('@configFilename'), mod_dir)
+            if is_file(config_file):
+                config = parse_sections(config_file, ('fillTypes', 'fruitTypes', 'placeables'))
+                config = next(iter(config.values())) or {}
+                configs.append((config_file, config))
+                placed = map_placeables_file(config, game_dir, mod_dir)
+                if placed is not None:
+                    maps_out.append((f"{source}:{m.get('@id') or os.path.basename(config_file)}",
+                                     placed, mod_dir))
+    # store items that aren't placeables are vehicles and tools, unless their root says otherwise
+    routes = route_placeables(store_files, game_dir, PLACEABLE_ROUTES, mod_dir)
+    routed = {f for files in routes.values() for f in files}
+    vehicles = [f for f in store_files
+                if f not in routed and (sniff_xml(f) or (None,))[0] == 'vehicle']
+
+    fill_files = []
+    fruit_files = []
+    for file, d in configs:
+        fill_files += mod_type_files(d, 'fillTypes', 'fillType', file, game_dir, mod_dir)
+        fruit_files += mod_type_files(d, 'fruitTypes', 'fruitType', file, game_dir, mod_dir)
+    return {
+        'source': source,
+        'dir': mod_dir,
+        'routes': routes,
+        'vehicles': vehicles,
+        'maps': maps_out,
+        'l10n': mod_l10n(desc, desc_file, mod_dir),
+        'fill': [f for f in dict.fromkeys(fill_files) if is_file(f)],
+        'fruit': [f for f in dict.fromkeys(fruit_files) if is_file(f)],
+    }
+
+
+def find_mods(mods_dir, game_dir, jobs=1):
+    """
+    Every mod in mods_dir, a folder or zip archive with a modDesc.xml, read in the process pool.
+    The list is sorted by mod name, which is also the order mods override the base game and
+    each other in.
+    """
+    with os.scandir(mods_dir) as entries:
+        dirs = sorted(e.path for e in entries
+                      if e.is_dir() or e.name.lower().endswith('.zip'))
+    info = functools.partial(mod_info, game_dir=game_dir)
+    mods = [m for m in map_files(info, dirs, jobs=jobs) if m is not None]
+    return sorted(mods, key=lambda m: m['source'])
+
+
+def mod_dirs(mods):
+    # the (source, folder) pairs passed to the workers instead of the whole mod list
+    return tuple((m['source'], m['dir']) for m in mods or ())
+
+
+def mod_route_files(mods, route):
+    return [f for m in mods or () for f in m['routes'][route]]
+
+
+def overlay_rows(layers, key):
+    """
+    Merges the row lists of several sources in precedence order, base game first. A later source
+    overrides the columns it sets on a row with the same key and leaves the others alone, the
+    way the game loads a mod's fillType over an existing one. Within one source the first of two
+    equal keys wins, as INSERT OR IGNORE would have it.
+    """
+    out = {}
+    for rows in layers:
+        seen = set()
+        for row in rows:
+            k = tuple(row[c] for c in key)
+            if k in seen:
+                continue
+            seen.add(k)
+            if k in out:
+                out[k] = dict(out[k], **{c: v for c, v in row.items() if v is not None})
+            else:
+                out[k] = row
+    return list(out.values())
+
+
+def overlay_categories(layers):
+    # a category declared again adds its types to the existing ones instead of replacing them
+    out = {}
+    for rows in layers:
+        for row in rows:
+            if row['name'] not in out:
+                out[row['name']] = dict(row)
+                continue
+            cat = out[row['name']]
+            have = (cat['text'] or '').split()
+            new = [t for t in (row['text'] or '').split() if t not in have]
+            if new:
+                cat['text'] = ' '.join([cat['text'] or ''] + new).strip()
+    return list(out.values())
+
+
+def prod_files(game_dir, mods=None):
+    return list(placeable_routes(game_dir)['prod']) + mod_route_files(mods, 'prod')
+
+
+def mod_point_id(file, mods):
+    # (point id, source, mod folder) of a placeable file; ids of mod files are prefixed with the
+    # mod name so they can't collide with the base game or another mod
+    source, mod_dir = file_mod(file, mods)
+    point_id = os.path.splitext(os.path.basename(file))[0]
+    if mod_dir is not None:
+        point_id = f"{source}:{point_id}"
+    return point_id, source, mod_dir
+
+
+ProdPoint = row_type('ProdPoint', 'id type name price shared_throughput source')
+Production = row_type('Production', 'point_id point_type id name cycles_hour cost_hour')
+ProdFill = row_type('ProdFill', 'point_id point_type prod_id fill_type direction amount capacity '
+                                'sell_direct')
+
+
+def prod_file_rows(file, game_dir, mods=None, texts=None):
+    point_out = []
+    prod_out = []
+    fill_out = []
+
+    point_id, source, mod_dir = mod_point_id(file, mods)
+    point_type = os.path.basename(os.path.dirname(os.path.dirname(file)))
+    d = parse_resolved(file, game_dir, ('storeData', 'productionPoint'), mod_dir=mod_dir)
+
+    # production point
+    place = d.get('placeable')
+    if place:
+        store = place.get('storeData')
+        if store:
+            point_name = store_text(store.get('name'), texts)
+            # lifetime = int(store.get('lifetime'))
+            prod_point = place.get('productionPoint')
+            if prod_point:
+                prods = prod_point.get('productions')
+                if prods.get('@sharedThroughputCapacity'):
+                    shared = trybool(prods.get('@sharedThroughputCapacity'))
+                else:
+                    shared = True
+                point_out.append(ProdPoint(point_id, point_type, point_name,
+                                           tryint(store.get('price')), shared, source))
+
+                # storage capacity is shared by every production of the point
+                storage = prod_point.get('storage')
+                cap_list = storage.get('capacity')
+                if isinstance(cap_list, dict):
+                    cap_list = [cap_list]
+                capacity = {}
+                for cap in cap_list:
+                    capacity[cap.get('@fillType')] = tryfloat(cap.get('@capacity'))
+
+                # individual productions
+                prod_list = prods.get('production')
+                if isinstance(prod_list, dict):
+                    prod_list = [prod_list]
+                for p in prod_list:
+                    prod_id = p.get('@id')
+                    prod_name = format_text(p.get('@name'), p.get('@params'), texts)
+                    prod_out.append(Production(point_id, point_type, prod_id, prod_name,
+                                               tryint(p.get('@cyclesPerHour')),
+                                               tryfloat(p.get('@costsPerActiveHour'))))
+
+                    # inputs
+                    inputs = p.get('inputs')
+                    input_list = inputs.get('input')
+                    if isinstance(input_list, dict):
+                        input_list = [input_list]
+                    for i in input_list:
+                        fill_type = i.get('@fillType')
+                        fill_out.append(ProdFill(point_id, point_type, prod_id, fill_type, 'in',
+                                                 tryfloat(i.get('@amount')),
+                                                 capacity.get(fill_type),
+                                                 trybool(i.get('@sellDirectly'))))
+
+                    # outputs
+                    outputs = p.get('outputs')
+                    output_list = outputs.get('output')
+                    if isinstance(output_list, dict):
+                        output_list = [output_list]
+                    for o in output_list:
+                        fill_type = o.get('@fillType')
+                        sell_direct = trybool(o.get('@sellDirectly'))
+                        if sell_direct is None:
+                            sell_direct = False
+                        fill_out.append(ProdFill(point_id, point_type, prod_id, fill_type, 'out',
+                                                 tryfloat(o.get('@amount')),
+                                                 capacity.get(fill_type), sell_direct))
+    return point_out, prod_out, fill_out
+
+
+def get_prod(game_dir, con, jobs=1, mods=None, texts=None):
     point_sql = '\n'.join((
-        "INSERT OR IGNORE INTO prod_point (id, type, name, price, shared_throughput) ",
-        "VALUES (:id, :type, :name, :price, :shared_throughput);"
+        "INSERT OR IGNORE INTO prod_point (id, type, name, price, shared_throughput, source) ",
+        "VALUES (?, ?, ?, ?, ?, ?);"
     ))
     prod_sql = '\n'.join((
         "INSERT OR IGNORE INTO production (point_id, point_type, id, name, cycles_hour, cost_hour)",
-        "VALUES (:point_id, :point_type, :id, :name, :cycles_hour, :cost_hour);"
+        "VALUES (?, ?, ?, ?, ?, ?);"
     ))
     fill_sql = '\n'.join((
         "INSERT OR IGNORE INTO prod_fill (point_id, point_type, prod_id, fill_type, direction,",
-        "  amount, sell_direct) ",
-        "VALUES (:point_id, :point_type, :prod_id, :fill_type, :direction, :amount, :sell_direct);"
+        "  amount, capacity, sell_direct) ",
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?);"
     ))
-    cap_sql = '\n'.join((
-        "UPDATE prod_fill SET capacity = :capacity ",
-        " WHERE point_id = :point_id AND point_type = :point_type AND prod_id = :prod_id",
-        "   AND fill_type = :fill_type;"))
-
-    dirs = []
-    dirs.append(os.path.join(game_dir, "data", "placeables",  "brandless",
-                             "productionPointsGeneric"))
-    dirs.append(os.path.join(game_dir, "data", "placeables",  "brandless", "productionPointsSmall"))
-    dirs.append(os.path.join(game_dir, "data", "placeables", "brandless", "greenhouses",
-                             "greenHouseGlass"))
-    dirs.append(os.path.join(game_dir, "data", "placeables", "brandless", "greenhouses",
-                             "greenHouseMushrooms"))
-    dirs.append(os.path.join(game_dir, "data", "placeables", "brandless", "greenhouses",
-                             "greenHousesTarp"))
-    dirs.append(os.path.join(game_dir, "data", "placeables", "brandless", "greenhouses",
-                             "greenHousesSaplings"))
-    dirs.append(os.path.join(game_dir, "data", "placeables", "planET"))
-    dirs.append(os.path.join(game_dir, "data", "placeables", "mapUS", "cooperUS"))
-    dirs.append(os.path.join(game_dir, "data", "placeables", "mapUS", "cementFactoryUS"))
-    dirs.append(os.path.join(game_dir, "data", "placeables", "mapUS", "cannedPackagedFactoryUS"))
-    dirs.append(os.path.join(game_dir, "data", "placeables", "mapUS", "ropemakerUS"))
-
-    xml_files = []
-    for folder_path in dirs:
-        for p in pathlib.Path(folder_path).rglob("*"):
-            if os.path.splitext(p)[1] == '.xml':
-                xml_files.append(p)
-
-    xml_files.append(pathlib.Path(game_dir, "data", "placeables", "mapUS", "playgroundMaker",
-                                  "playgroundMakerHall.xml"))
-    xml_files.append(pathlib.Path(game_dir, "data", "placeables", "mapEU", "pianoFactory",
-                                  "pianoFactoryPlaceable.xml"))
-    xml_files.append(pathlib.Path(game_dir, "data", "placeables", "mapEU", "potatoProcessingPlant",
-                                  "potatoProcessingPlantPlaceable.xml"))
-    xml_files.append(pathlib.Path(game_dir, "data", "placeables", "mapEU", "preservedFoodFactory",
-                                  "preservedFoodFactoryPlaceable.xml"))
-    xml_files.append(pathlib.Path(game_dir, "data", "placeables", "mapEU", "soupFactory",
-                                  "soupFactoryPlaceable.xml"))
-    xml_files = sorted(xml_files)
 
-    point_out = []
-    prod_out = []
-    fill_out = []
-    cap_out = []
-
-    for file in xml_files:
-        point_dict = {}
-        file_name = os.path.basename(file)
-        point_id = os.path.splitext(file_name)[0]
-        point_type = os.path.basename(os.path.dirname(os.path.dirname(file)))
-        with open(file, 'r', encoding='utf8') as f:
-            data = f.read()
-        d = xmltodict.parse(data)
-
-        # production point
-        point_dict['id'] = point_id
-        point_dict['type'] = point_type
-        place = d.get('placeable')
-        if place:
-            store = place.get('storeData')
-            if store:
-                store_name = store.get('name')
-                if isinstance(store_name, dict):
-                    name_params = store_name.get('@params')
-                    name_text = store_name.get('#text')
-                    point_dict['name'] = name_text % tuple(name_params.split('|'))
-                else:
-                    point_dict['name'] = store_name
-                point_dict['price'] = tryint(store.get('price'))
-                # lifetime = int(store.get('lifetime'))
-                prod_point = place.get('productionPoint')
-                if prod_point:
-                    prods = prod_point.get('productions')
-                    if prods.get('@sharedThroughputCapacity'):
-                        point_dict['shared_throughput'] = \
-                          trybool(prods.get('@sharedThroughputCapacity'))
-                    else:
-                        point_dict['shared_throughput'] = True
-                    point_out.append(point_dict)
-
-                    # individual productions
-                    prod_list = prods.get('production')
-                    if isinstance(prod_list, dict):
-                        prod_list = [prod_list]
-                    for p in prod_list:
-                        prod_dict = {}
-                        prod_dict['point_id'] = point_id
-                        prod_dict['point_type'] = point_type
-                        prod_id = p.get('@id')
-                        prod_dict['id'] = prod_id
-                        prod_name = p.get('@name')
-                        prod_params = p.get('@params')
-                        if prod_params:
-                            prod_name = prod_name % tuple(prod_params.split('|'))
-                        prod_dict['name'] = prod_name
-                        prod_dict['cycles_hour'] = tryint(p.get('@cyclesPerHour'))
-                        prod_dict['cost_hour'] = tryfloat(p.get('@costsPerActiveHour'))
-                        prod_out.append(prod_dict)
-
-                        # inputs
-                        inputs = p.get('inputs')
-                        input_list = inputs.get('input')
-                        if isinstance(input_list, dict):
-                            input_list = [input_list]
-                        for i in input_list:
-                            input_dict = {}
-                            input_dict['point_id'] = point_id
-                            input_dict['point_type'] = point_type
-                            input_dict['prod_id'] = prod_id
-                            input_dict['fill_type'] = i.get('@fillType')
-                            input_dict['direction'] = 'in'
-                            input_dict['amount'] = tryfloat(i.get('@amount'))
-                            input_dict['sell_direct'] = trybool(i.get('@sellDirectly'))
-                            fill_out.append(input_dict)
-
-                        # outputs
-                        outputs = p.get('outputs')
-                        output_list = outputs.get('output')
-                        if isinstance(output_list, dict):
-                            output_list = [output_list]
-                        for o in output_list:
-                            output_dict = {}
-                            output_dict['point_id'] = point_id
-                            output_dict['point_type'] = point_type
-                            output_dict['prod_id'] = prod_id
-                            output_dict['fill_type'] = o.get('@fillType')
-                            output_dict['direction'] = 'out'
-                            output_dict['amount'] = tryfloat(o.get('@amount'))
-                            output_dict['sell_direct'] = trybool(o.get('@sellDirectly'))
-                            if output_dict['sell_direct'] is None:
-                                output_dict['sell_direct'] = False
-                            fill_out.append(output_dict)
-
-                        # capacity
-                        storage = prod_point.get('storage')
-                        cap_list = storage.get('capacity')
-                        if isinstance(cap_list, dict):
-                            cap_list = [cap_list]
-                        for cap in cap_list:
-                            cap_dict = {}
-                            cap_dict['point_id'] = point_id
-                            cap_dict['point_type'] = point_type
-                            cap_dict['prod_id'] = prod_id
-                            cap_dict['fill_type'] = cap.get('@fillType')
-                            cap_dict['capacity'] = tryfloat(cap.get('@capacity'))
-                            cap_out.append(cap_dict)
-        c.executemany(point_sql, point_out)
-        c.executemany(prod_sql, prod_out)
-        c.executemany(fill_sql, fill_out)
-        c.executemany(cap_sql, cap_out)
-        con.commit()
-
-
-def get_fruit(game_dir, con):
+    xml_files = prod_files(game_dir, mods)
+    tables = ('prod_point', 'production', 'prod_fill')
+    l10n_reset(con, 'prod', texts)
+    with BulkLoader(con) as load:
+        file_rows = functools.partial(prod_file_rows, game_dir=game_dir, mods=mod_dirs(mods),
+                                      texts=texts)
+        scraped = manifest_scrape(con, 'prod', xml_files, tables, file_rows, game_dir, jobs=jobs,
+                                  mods=mod_dirs(mods))
+        for state, result in scraped:
+            points, prods, fills = result
+            load.add(point_sql, resolve_rows(points, texts, 'name'))
+            load.add(prod_sql, resolve_rows(prods, texts, 'name'))
+            load.add(fill_sql, fills)
+            manifest_record(con, 'prod', state, tables, result)
+
+
+FRUIT_SPEC = Table('fruit', rows='foliageType.fruitType', columns=(
+    Col('name', '@name'),
+    Col('seed_rate', 'seeding@litersPerSqm', tryfloat),
+    Col('seed_available', 'seeding@isAvailable', trybool),
+    Col('seed_needs_rolling', 'seeding@needsRolling', trybool),
+    Col('liter_m2', 'harvest@litersPerSqm', tryfloat),
+    Col('chopper_type', 'harvest@chopperType', tryfloat),
+    Col('bee_bonus', 'harvest@beeYieldBonusPercentage', tryfloat, 0),
+    Col('windrow_out', 'windrow@fillType'),
+    Col('windrow_liter_m2', 'windrow@litersPerSqm', tryfloat),
+    Col('windrow_cut_fill', 'windrow@cutFillType'),
+    Col('windrow_cut_factor', 'windrow@windrowCutFactor', tryfloat),
+    Col('growth_resets_spray', 'growth@resetsSpray', trybool),
+    Col('growth_require_lime', 'growth@growthRequiresLime', trybool),
+    Col('soil_lowdensity_req', 'soil@lowDensityRequired', trybool),
+    Col('soil_increases_density', 'soil@increasesDensity', trybool),
+    Col('soil_consumes_lime', 'soil@consumesLime', trybool),
+    Col('soil_start_spraylevel', 'soil@startSprayLevel', tryint),
+    Col('cultivation_allowed', 'cultivation@isAllowed', trybool),
+    Col('mulch_chopper_type', 'mulcher@chopperType'),
+))
+
+FRUIT_CATEGORY_SPEC = Table(
+    'fruit_category', rows='map.fruitTypeCategories.fruitTypeCategory',
+    source='data/maps/maps_fruitTypes.xml', columns=(
+        Col('name', '@name'),
+        Col('text', '#text'),
+    ))
+
+FRUIT_CONVERT_SPEC = Table(
+    'type_convert', rows=('map.fruitTypeConverters.fruitTypeConverter', 'converter'),
+    source='data/maps/maps_fruitTypes.xml', columns=(
+        Col('type', None, default='fruit'),
+        Col('name', '^@name'),
+        Col('input', '@from'),
+        Col('output', '@to'),
+        Col('factor', '@factor', tryfloat),
+    ))
+
+
+def get_fruit(game_dir, con, mods=None):
     fruit_sql = '\n'.join((
         "INSERT OR IGNORE INTO fruit (",
         "   name, seed_rate, seed_available, seed_needs_rolling, liter_m2, chopper_type,",
         "   bee_bonus, windrow_out, windrow_liter_m2, windrow_cut_fill, windrow_cut_factor,",
         "   growth_resets_spray, growth_require_lime, soil_lowdensity_req, soil_increases_density,",
-        "   soil_consumes_lime, soil_start_spraylevel, cultivation_allowed, mulch_chopper_type)",
+        "   soil_consumes_lime, soil_start_spraylevel, cultivation_allowed, mulch_chopper_type,",
+        "   source)",
         "VALUES (:name, :seed_rate, :seed_available, :seed_needs_rolling, :liter_m2,",
         "   :chopper_type, :bee_bonus, :windrow_out, :windrow_liter_m2, :windrow_cut_fill,",
         "   :windrow_cut_factor, :growth_resets_spray, :growth_require_lime, :soil_lowdensity_req,",
         "   :soil_increases_density, :soil_consumes_lime, :soil_start_spraylevel,",
-        "   :cultivation_allowed, :mulch_chopper_type);"
+        "   :cultivation_allowed, :mulch_chopper_type, :source);"
     ))
 
     fruit_cat_sql = ("INSERT OR IGNORE INTO fruit_category (name, fruit_types) "
@@ -401,210 +899,139 @@ def get_fruit(game_dir, con):
     ))
 
     c = con.cursor()
-    map_dir = os.path.join(game_dir, "data", "maps")
-    fruit_file = os.path.join(map_dir, "maps_fruitTypes.xml")
-    with open(fruit_file, 'r', encoding='utf8') as f:
-        data = f.read()
-    d = xmltodict.parse(data)
-    fruit_file_list = d.get('map').get('fruitTypes').get('fruitType')
-
-    fruit_out = []
-    for foliage in fruit_file_list:
-        fruit_subf = os.path.join(game_dir, foliage.get('@filename').replace('$', ''))
-        with open(fruit_subf, 'r', encoding='utf8') as f:
-            data2 = f.read()
-        d2 = xmltodict.parse(data2)
-        fruit = d2.get('foliageType').get('fruitType')
-        fruit_dict = {}
-        fruit_dict['name'] = fruit.get('@name')
-
-        seeding = fruit.get('seeding')
-        if seeding:
-            fruit_dict['seed_rate'] = tryfloat(seeding.get('@litersPerSqm'))
-            fruit_dict['seed_available'] = trybool(seeding.get('@isAvailable'))
-            fruit_dict['seed_needs_rolling'] = trybool(seeding.get('@needsRolling'))
-        else:
-            fruit_dict['seed_rate'] = None
-            fruit_dict['seed_available'] = None
-            fruit_dict['seed_needsrolling'] = None
-
-        harvest = fruit.get('harvest')
-        if harvest:
-            fruit_dict['liter_m2'] = tryfloat(harvest.get('@litersPerSqm'))
-            fruit_dict['chopper_type'] = tryfloat(harvest.get('@chopperType'))
-            fruit_dict['bee_bonus'] = tryfloat(harvest.get('@beeYieldBonusPercentage'))
-            if fruit_dict['bee_bonus'] is None:
-                fruit_dict['bee_bonus'] = 0
-        else:
-            fruit_dict['liter_m2'] = None
-            fruit_dict['chopper_type'] = None
-            fruit_dict['bee_bonus'] = None
-
-        windrow = fruit.get('windrow')
-        if windrow:
-            fruit_dict['windrow_out'] = windrow.get('@fillType')
-            fruit_dict['windrow_liter_m2'] = tryfloat(windrow.get('@litersPerSqm'))
-            fruit_dict['windrow_cut_fill'] = windrow.get('@cutFillType')
-            fruit_dict['windrow_cut_factor'] = tryfloat(windrow.get('@windrowCutFactor'))
-        else:
-            fruit_dict['windrow_out'] = None
-            fruit_dict['windrow_liter_m2'] = None
-            fruit_dict['windrow_cut_fill'] = None
-            fruit_dict['windrow_cut_factor'] = None
-
-        growth = fruit.get('growth')
-        if growth:
-            fruit_dict['growth_resets_spray'] = trybool(growth.get('@resetsSpray'))
-            fruit_dict['growth_require_lime'] = trybool(growth.get('@growthRequiresLime'))
-        else:
-            fruit_dict['growth_resets_spray'] = None
-            fruit_dict['growth_require_lime'] = None
-
-        soil = fruit.get('soil')
-        if soil:
-            fruit_dict['soil_lowdensity_req'] = trybool(soil.get('@lowDensityRequired'))
-            fruit_dict['soil_increases_density'] = trybool(soil.get('@increasesDensity'))
-            fruit_dict['soil_consumes_lime'] = trybool(soil.get('@consumesLime'))
-            fruit_dict['soil_start_spraylevel'] = tryint(soil.get('@startSprayLevel'))
-        else:
-            fruit_dict['soil_lowdensity_req'] = None
-            fruit_dict['soil_increases_density'] = None
-            fruit_dict['soil_consumes_lime'] = None
-            fruit_dict['soil_start_spraylevel'] = None
-
-        cult = fruit.get('cultivation')
-        if cult:
-            fruit_dict['cultivation_allowed'] = trybool(cult.get('@isAllowed'))
-        else:
-            fruit_dict['cultivation_allowed'] = None
-
-        mulch = fruit.get('mulcher')
-        if mulch:
-            fruit_dict['mulch_chopper_type'] = mulch.get('@chopperType')
-        else:
-            fruit_dict['mulch_chopper_type'] = None
-
-        fruit_out.append(fruit_dict)
-    c.executemany(fruit_sql, fruit_out)
-    con.commit()
+    fruit_file = os.path.join(game_dir, FRUIT_CONVERT_SPEC.source)
+    # base game first, then the mods in the order they override it
+    layers = [('base', fruit_file, None)]
+    layers += [(m['source'], f, m['dir']) for m in mods or () for f in m['fruit']
+               if os.path.normpath(f) != os.path.normpath(fruit_file)]
+    type_files = [f for source, f, mod_dir in layers]
+    if manifest_stage_current(con, 'fruit', type_files, game_dir, mod_dirs(mods)):
+        return
+
+    fruit_layers = []
+    cat_layers = []
+    convert_layers = []
+    source_files = list(type_files)
+    listed_by = {}
+    for source, type_file, mod_dir in layers:
+        d = as_map(parse_sections(type_file, spec_sections(FRUIT_CATEGORY_SPEC, FRUIT_CONVERT_SPEC)
+                                  + ('fruitTypes',)))
+        # each fruit is described in its own foliage file. a mod map listing the base game's
+        # foliage files doesn't make those fruits its own
+        fruit_out = []
+        fruit_types = (d.get('map') or {}).get('fruitTypes')
+        for foliage in as_list(fruit_types.get('fruitType') if fruit_types else None):
+            fruit_subf = parent_path(game_dir, foliage.get('@filename'), mod_dir)
+            if fruit_subf in listed_by:
+                continue
+            source_files.append(fruit_subf)
+            listed_by[fruit_subf] = type_file
+            fruit_out.extend(FRUIT_SPEC.extract(parse_sections(fruit_subf, FRUIT_SPEC.sections()),
+                                                source=source))
+        fruit_layers.append(fruit_out)
+        cat_layers.append(FRUIT_CATEGORY_SPEC.extract(d))
+        convert_layers.append(FRUIT_CONVERT_SPEC.extract(d))
+    fruit_out = overlay_rows(fruit_layers, ('name',))
+    fruit_cats = overlay_categories(cat_layers)
+    convert_out = overlay_rows(convert_layers, ('type', 'name', 'input'))
+
+    with BulkLoader(con) as load:
+        c.execute("DELETE FROM fruit;")
+        c.execute("DELETE FROM fruit_category;")
+        c.execute("DELETE FROM type_convert WHERE type = 'fruit';")
+        load.add(fruit_sql, fruit_out)
+        load.add(fruit_cat_sql, fruit_cats)
+        load.add(convert_sql, convert_out)
+        manifest_replace_stage(con, 'fruit', source_files, game_dir, listed_by, mod_dirs(mods))
+
+
+FILL_SPEC = Table(
+    'fill', rows='map.fillTypes.fillType', source='data/maps/maps_fillTypes.xml', columns=(
+        Col('name', '@name'),
+        Col('title', '@title'),
+        Col('show', '@showOnPriceTable', trybool),
+        Col('unit', '@unitShort'),
+        Col('mass_l', 'physics@massPerLiter', tryfloat),
+        Col('price_l', 'economy@pricePerLiter', tryfloat),
+    ))
 
-    # fruit categories
-    fruit_cats = d.get('map').get('fruitTypeCategories').get('fruitTypeCategory')
-    for l in fruit_cats:
-        l['name'] = l.pop('@name')
-        l['text'] = l.pop('#text')
-    c.executemany(fruit_cat_sql, fruit_cats)
-    con.commit()
+FILL_FACTOR_SPEC = Table(
+    'fill_factor', rows=('map.fillTypes.fillType', 'economy.factors.factor'),
+    source='data/maps/maps_fillTypes.xml', columns=(
+        Col('name', '^@name'),
+        Col('period', '@period', tryint),
+        Col('value', '@value', tryfloat),
+    ))
 
-    # fruit conversions
-    convert_list = d.get('map').get('fruitTypeConverters').get('fruitTypeConverter')
-    convert_out = []
-    convert_type = 'fruit'
-    for convert in convert_list:
-        convert_name = convert.get('@name')
-        converter_list = convert.get('converter')
-        if isinstance(converter_list, dict):
-            converter_list = [converter_list]
-        for l in converter_list:
-            convert_dict = {}
-            convert_dict['type'] = convert_type
-            convert_dict['name'] = convert_name
-            convert_dict['input'] = l.get('@from')
-            convert_dict['output'] = l.get('@to')
-            convert_dict['factor'] = tryfloat(l.get('@factor'))
-            convert_out.append(convert_dict)
-    c.executemany(convert_sql, convert_out)
-    con.commit()
+FILL_CONVERT_SPEC = Table(
+    'type_convert', rows=('map.fillTypeConverters.fillTypeConverter', 'converter'),
+    source='data/maps/maps_fillTypes.xml', columns=(
+        Col('type', None, default='fill'),
+        Col('name', '^@name'),
+        Col('input', '@from'),
+        Col('output', '@to'),
+        Col('factor', '@factor', tryfloat),
+    ))
 
+FILL_CATEGORY_SPEC = Table(
+    'fill_category', rows='map.fillTypeCategories.fillTypeCategory',
+    source='data/maps/maps_fillTypes.xml', columns=(
+        Col('name', '@name'),
+        Col('text', '#text'),
+    ))
 
 
-def get_fill(game_dir, con):
+def get_fill(game_dir, con, mods=None, texts=None):
     convert_sql = '\n'.join((
         "INSERT OR IGNORE INTO type_convert (type, name, input, output, factor) ",
         "VALUES (:type, :name, :input, :output, :factor);"
     ))
     fill_sql = '\n'.join((
-        "INSERT OR IGNORE INTO fill (name, title, show, unit, mass_l, price_l) ",
-        "VALUES (:name, :title, :show, :unit, :mass_l, :price_l);"
+        "INSERT OR IGNORE INTO fill (name, title, show, unit, mass_l, price_l, source,",
+        "  title_text)",
+        "VALUES (:name, :title, :show, :unit, :mass_l, :price_l, :source, :title_text);"
     ))
     factor_sql = ("INSERT OR IGNORE INTO fill_factor (name, period, value) VALUES "
                   "(:name, :period, :value);")
 
     cat_sql = "INSERT OR IGNORE INTO fill_category (name, fill_types) VALUES (:name, :text);"
     c = con.cursor()
-    map_dir = os.path.join(game_dir, "data", "maps")
-    fruit_file = os.path.join(map_dir, "maps_fillTypes.xml")
-    with open(fruit_file, 'r', encoding='utf8') as f:
-        data = f.read()
-    d = xmltodict.parse(data)
-
-    # fills
-    fill_list = d.get('map').get('fillTypes').get('fillType')
-    if isinstance(fill_list, dict):
-        fill_list = [fill_list]
-    fill_out = []
-    factor_out = []
-    for fill in fill_list:
-        fill_dict = {}
-        fill_name = fill.get('@name')
-        fill_dict['name'] = fill_name
-        fill_dict['title'] = fill.get('@title')
-        fill_dict['show'] = trybool(fill.get('@showOnPriceTable'))
-        fill_dict['unit'] = fill.get('@unitShort')
-        if fill.get('physics') is not None:
-            fill_dict['mass_l'] = tryfloat(fill.get('physics').get('@massPerLiter'))
-        else:
-            fill_dict['mass_l'] = None
-        economy = fill.get('economy')
-        if economy is not None:
-            fill_dict['price_l'] = tryfloat(economy.get('@pricePerLiter'))
-
-        # fill factors
-            factors = economy.get('factors')
-            if factors is not None:
-                factor_list = factors.get('factor')
-                for factor in factor_list:
-                    factor_dict = {}
-                    factor_dict['name'] = fill_name
-                    factor_dict['period'] = tryint(factor.get('@period'))
-                    factor_dict['value'] = tryfloat(factor.get('@value'))
-                    factor_out.append(factor_dict)
-        else:
-            fill_dict['price_l'] = None
-        fill_out.append(fill_dict)
-    c.executemany(fill_sql, fill_out)
-    c.executemany(factor_sql, factor_out)
-
-    # fill conversions
-    convert_list = d.get('map').get('fillTypeConverters').get('fillTypeConverter')
-    if isinstance(convert_list, dict):
-        convert_list = [convert_list]
-    convert_out = []
-    convert_type = 'fill'
-    for convert in convert_list:
-        convert_name = convert.get('@name')
-        converter_list = convert.get('converter')
-        if isinstance(converter_list, dict):
-            converter_list = [converter_list]
-        for l in converter_list:
-            convert_dict = {}
-            convert_dict['type'] = convert_type
-            convert_dict['name'] = convert_name
-            convert_dict['input'] = l.get('@from')
-            convert_dict['output'] = l.get('@to')
-            convert_dict['factor'] = tryfloat(l.get('@factor'))
-            convert_out.append(convert_dict)
-    c.executemany(convert_sql, convert_out)
-    con.commit()
-
-    # fill categories
-    cat_list = d.get('map').get('fillTypeCategories').get('fillTypeCategory')
-    for l in cat_list:
-        l['name'] = l.pop('@name')
-        l['text'] = l.pop('#text')
-
-    c.executemany(cat_sql, cat_list)
-    con.commit()
+    fill_file = os.path.join(game_dir, FILL_SPEC.source)
+    # base game first, then the mods in the order they override it
+    layers = [('base', fill_file)]
+    layers += [(m['source'], f) for m in mods or () for f in m['fill']
+               if os.path.normpath(f) != os.path.normpath(fill_file)]
+    type_files = [f for source, f in layers]
+    l10n_reset(con, 'fill', texts)
+    if manifest_stage_current(con, 'fill', type_files, game_dir, mod_dirs(mods)):
+        return
+
+    sections = spec_sections(FILL_SPEC, FILL_FACTOR_SPEC, FILL_CONVERT_SPEC, FILL_CATEGORY_SPEC)
+    fill_layers = []
+    factor_layers = []
+    convert_layers = []
+    cat_layers = []
+    for source, type_file in layers:
+        d = as_map(parse_sections(type_file, sections))
+        fill_layers.append(FILL_SPEC.extract(d, source=source))
+        factor_layers.append(FILL_FACTOR_SPEC.extract(d))
+        convert_layers.append(FILL_CONVERT_SPEC.extract(d))
+        cat_layers.append(FILL_CATEGORY_SPEC.extract(d))
+    fill_out = resolve_rows(overlay_rows(fill_layers, ('name',)), texts, 'title', to='title_text')
+    factor_out = overlay_rows(factor_layers, ('name', 'period'))
+    convert_out = overlay_rows(convert_layers, ('type', 'name', 'input'))
+    cat_list = overlay_categories(cat_layers)
+
+    with BulkLoader(con) as load:
+        c.execute("DELETE FROM fill_factor;")
+        c.execute("DELETE FROM fill;")
+        c.execute("DELETE FROM fill_category;")
+        c.execute("DELETE FROM type_convert WHERE type = 'fill';")
+        load.add(fill_sql, fill_out)
+        load.add(factor_sql, factor_out)
+        load.add(convert_sql, convert_out)
+        load.add(cat_sql, cat_list)
+        manifest_replace_stage(con, 'fill', type_files, game_dir, mods=mod_dirs(mods))
 
 
 def get_animals(dataS_dir, con):
@@ -628,9 +1055,9 @@ def get_animals(dataS_dir, con):
     c = con.cursor()
     animal_dir = os.path.join(dataS_dir, "character")
     animal_file = os.path.join(animal_dir, "animals.xml")
-    with open(animal_file, 'r', encoding='utf8') as f:
-        data = f.read()
-    d = xmltodict.parse(data)
+    if manifest_stage_current(con, 'animals', [animal_file], dataS_dir):
+        return
+    d = parse_sections(animal_file, ('animal',))
     animal_list = d.get('animals').get('animal')
     if isinstance(animal_list, dict):
         animal_list = [animal_list]
@@ -736,12 +1163,14 @@ def get_animals(dataS_dir, con):
                         # print(out_dict)
                         fill_out.append(out_dict)
 
-    c.executemany(animal_sql, animal_out)
-    c.executemany(price_sql, price_out)
-    for st in fill_out:
-        c.execute(fill_sql, st)
-    c.executemany(fill_sql, fill_out)
-    con.commit()
+    with BulkLoader(con) as load:
+        c.execute("DELETE FROM animal_fill;")
+        c.execute("DELETE FROM animal_price;")
+        c.execute("DELETE FROM animal;")
+        load.add(animal_sql, animal_out)
+        load.add(price_sql, price_out)
+        load.add(fill_sql, fill_out)
+        manifest_replace_stage(con, 'animals', [animal_file], dataS_dir)
 
 
 def get_animal_food(dataS_dir, con):
@@ -766,9 +1195,9 @@ def get_animal_food(dataS_dir, con):
     c = con.cursor()
     animal_dir = os.path.join(dataS_dir, "character")
     food_file = os.path.join(animal_dir, "animalFood.xml")
-    with open(food_file, 'r', encoding='utf8') as f:
-        data = f.read()
-    d = xmltodict.parse(data)
+    if manifest_stage_current(con, 'animal_food', [food_file], dataS_dir):
+        return
+    d = parse_sections(food_file, ('animals', 'mixtures', 'recipes'))
     animal_food = d.get('animalFood')
     animal_list = animal_food.get('animals').get('animal')
     if isinstance(animal_list, dict):
@@ -848,214 +1277,895 @@ def get_animal_food(dataS_dir, con):
             rin_dict['pct_min'] = tryfloat(ri.get('@minPercentage'))/100
             rin_dict['pct_max'] = tryfloat(ri.get('@maxPercentage'))/100
             rec_out.append(rin_dict)
-    c.executemany(animal_sql, animal_out)
-    c.executemany(group_sql, group_out)
-    c.executemany(fill_sql, fill_out)
-    c.executemany(mix_sql, mix_out)
-    c.executemany(rec_sql, rec_out)
-    con.commit()
+    with BulkLoader(con) as load:
+        for table in ('animal_food', 'animal_food_group', 'animal_food_fill', 'animal_food_mix',
+                      'animal_food_recipe'):
+            c.execute(f"DELETE FROM {table};")
+        load.add(animal_sql, animal_out)
+        load.add(group_sql, group_out)
+        load.add(fill_sql, fill_out)
+        load.add(mix_sql, mix_out)
+        load.add(rec_sql, rec_out)
+        manifest_replace_stage(con, 'animal_food', [food_file], dataS_dir)
+
+
+def animal_pen_files(game_dir, mods=None):
+    return list(placeable_routes(game_dir)['animal_pen']) + mod_route_files(mods, 'animal_pen')
+
+
+ANIMAL_POINT_SPEC = Table('animal_point', rows='placeable', when='husbandry', columns=(
+    Col('place_type', '@type'),
+    Col('name', 'storeData.name'),
+    Col('price', 'storeData.price', tryint),
+    Col('upkeep_price', 'storeData.dailyUpkeep', tryint),
+    Col('type', 'husbandry.animals@type'),
+    Col('unit_max', 'husbandry.animals@maxNumAnimals', tryint),
+    Col('food_cap', 'husbandry.food@capacity', tryint),
+    Col('food_default', ('husbandry.food.foodPlane@defaultFillType',
+                         'husbandry.food.dynamicFoodPlane@defaultFillType')),
+    Col('pallet_fill', 'husbandry.pallets.palletSpawner@fillTypes'),
+    Col('pallet_maxno', 'husbandry.pallets.palletSpawner@maxNumPallets', tryint),
+    Col('water_auto', 'husbandry.water@automaticWaterSupply', trybool),
+))
+
+ANIMAL_CAPACITY_SPEC = Table(
+    'animal_capacity', rows='placeable.husbandry.storage.capacity', columns=(
+        Col('fill_type', '@fillType'),
+        Col('capacity', '@capacity', tryint),
+    ))
+
 
+AnimalPoint = row_type('AnimalPoint', 'id place_type name price upkeep_price type unit_max '
+                                      'food_cap food_default pallet_fill pallet_maxno water_auto '
+                                      'source')
+AnimalCapacity = row_type('AnimalCapacity', 'point_id fill_type capacity')
 
-def get_animal_pen(game_dir, con):
+
+def animal_pen_file_rows(file, game_dir, mods=None, texts=None):
+    point_id, source, mod_dir = mod_point_id(file, mods)
+    d = parse_resolved(file, game_dir, spec_sections(ANIMAL_POINT_SPEC, ANIMAL_CAPACITY_SPEC),
+                       mod_dir=mod_dir)
+    points = ANIMAL_POINT_SPEC.records(d, AnimalPoint, id=point_id, source=source)
+    return ([p._replace(name=store_text(p.name, texts)) for p in points],
+            ANIMAL_CAPACITY_SPEC.records(d, AnimalCapacity, point_id=point_id))
+
+
+def get_animal_pen(game_dir, con, jobs=1, mods=None, texts=None):
     point_sql = '\n'.join((
         "INSERT OR IGNORE INTO animal_point (id, place_type, name, price, upkeep_price, type,",
-        "  unit_max, food_cap, food_default, pallet_fill, pallet_maxno, water_auto)",
-        "VALUES (:id, :place_type, :name, :price, :upkeep_price, :type, :unit_max, :food_cap, ",
-        "   :food_default, :pallet_fill, :pallet_maxno, :water_auto);"
+        "  unit_max, food_cap, food_default, pallet_fill, pallet_maxno, water_auto, source)",
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);"
     ))
     cap_sql = '\n'.join((
         "INSERT OR IGNORE INTO animal_capacity (point_id, fill_type, capacity)",
-        "VALUES (:point_id, :fill_type, :capacity);"
+        "VALUES (?, ?, ?);"
     ))
-    c = con.cursor()
-    dirs = []
-    dirs.append(os.path.join(game_dir, "data", "placeables", "brandless","animalHusbandries"))
-    dirs.append(os.path.join(game_dir, "data", "placeables", "rudolfHormann", "chickenBarnBig"))
-    dirs.append(os.path.join(game_dir, "data", "placeables", "rudolfHormann", "cowBarnBig"))
-    dirs.append(os.path.join(game_dir, "data", "placeables", "rudolfHormann", "cowBarnMedium"))
-    dirs.append(os.path.join(game_dir, "data", "placeables", "rudolfHormann", "horseBarnBig"))
-    dirs.append(os.path.join(game_dir, "data", "placeables", "rudolfHormann", "horseBarnMedium"))
-    dirs.append(os.path.join(game_dir, "data", "placeables", "rudolfHormann", "pigBarnBig"))
-    dirs.append(os.path.join(game_dir, "data", "placeables", "rudolfHormann", "pigBarnMedium"))
-    dirs.append(os.path.join(game_dir, "data", "placeables", "rudolfHormann", "sheepBarnBig"))
-    dirs.append(os.path.join(game_dir, "data", "placeables", "rudolfHormann", "sheepBarnMedium"))
+    xml_files = animal_pen_files(game_dir, mods)
+    tables = ('animal_point', 'animal_capacity')
+    l10n_reset(con, 'animal_pen', texts)
+    with BulkLoader(con) as load:
+        file_rows = functools.partial(animal_pen_file_rows, game_dir=game_dir,
+                                      mods=mod_dirs(mods), texts=texts)
+        scraped = manifest_scrape(con, 'animal_pen', xml_files, tables, file_rows, game_dir,
+                                  jobs=jobs, mods=mod_dirs(mods))
+        for state, result in scraped:
+            points, caps = result
+            load.add(point_sql, resolve_rows(points, texts, 'name'))
+            load.add(cap_sql, caps)
+            manifest_record(con, 'animal_pen', state, tables, result)
 
-    point_out = []
-    cap_out = []
-    xml_files = []
-    for folder_path in dirs:
-        for p in pathlib.Path(folder_path).rglob("*"):
-            if os.path.splitext(p)[1] == '.xml':
-                xml_files.append(p)
-    xml_files = sorted(xml_files)
-    for file in xml_files:
-        point_dict = {}
-        file_name = os.path.basename(file)
-        point_id = os.path.splitext(file_name)[0]
-        with open(file, 'r', encoding='utf8') as f:
-            data = f.read()
-        d = xmltodict.parse(data)
-
-        point_dict['id'] = point_id
-        place = d.get('placeable')
-        if place:
-            point_dict['place_type'] = place.get('@type')
-            store = place.get('storeData')
-            if store:
-                point_dict['name'] = store.get('name')
-                point_dict['price'] = tryint(store.get('price'))
-                point_dict['upkeep_price'] = tryint(store.get('dailyUpkeep'))
-            husbandry = place.get('husbandry')
-            if husbandry:
-                storage = husbandry.get('storage')
-                if storage:
-                    cap_list = storage.get('capacity')
-                    if isinstance(cap_list, dict):
-                        cap_list = [cap_list]
-                    for cap in cap_list:
-                        cap_dict = {}
-                        cap_dict['point_id'] = point_id
-                        cap_dict['fill_type'] = cap.get('@fillType')
-                        cap_dict['capacity'] = tryint(cap.get('@capacity'))
-                        cap_out.append(cap_dict)
-
-                animals = husbandry.get('animals')
-                if animals:
-                    point_dict['type'] = animals.get('@type')
-                    point_dict['unit_max'] = tryint(animals.get('@maxNumAnimals'))
-                else:
-                    point_dict['type'] = None
-                    point_dict['unit_max'] = None
-                food = husbandry.get('food')
-                if food:
-                    point_dict['food_cap'] = tryint(food.get('@capacity'))
-                    if food.get('foodPlane'):
-                        point_dict['food_default'] = food.get('foodPlane')\
-                                .get('@defaultFillType')
-                    elif food.get('dynamicFoodPlane'):
-                        point_dict['food_default'] = food.get('dynamicFoodPlane')\
-                                .get('@defaultFillType')
-                    else:
-                        point_dict['food_default'] = None
-                else:
-                    point_dict['food_cap'] = None
-                    point_dict['food_default'] = None
-                pallets = husbandry.get('pallets')
-                if pallets:
-                    point_dict['pallet_fill'] = pallets.get('palletSpawner').get('@fillTypes')
-                    point_dict['pallet_maxno'] = tryint(pallets.get('palletSpawner')\
-                            .get('@maxNumPallets'))
-                else:
-                    point_dict['pallet_fill'] = None
-                    point_dict['pallet_maxno'] = None
-                water = husbandry.get('water')
-                if water:
-                    point_dict['water_auto'] = trybool(water.get('@automaticWaterSupply'))
-                else:
-                    point_dict['water_auto'] = None
-                point_out.append(point_dict)
 
-    c.executemany(point_sql, point_out)
-    c.executemany(cap_sql, cap_out)
-    con.commit()
+def placeable_files(game_dir, mods=None):
+    return list(placeable_routes(game_dir)['placeable']) + mod_route_files(mods, 'placeable')
+
+
+# top level tags of a placeable xml read by get_placeable
+PLACEABLE_SECTIONS = ('storeData', 'beehive', 'manureHeap', 'solarPanels', 'windTurbine')
+
+
+Placeable = row_type('Placeable', 'id name type price price_upkeep_day brand category capacity '
+                                  'is_extension radius liter_day fill_type income_hour source')
+
 
+def placeable_file_rows(file, game_dir, mods=None, texts=None):
+    place_out = []
 
-def get_placeable(game_dir, con):
+    point_id, source, mod_dir = mod_point_id(file, mods)
+    d = parse_resolved(file, game_dir, PLACEABLE_SECTIONS, mod_dir=mod_dir)
+
+    # point
+    place = d.get('placeable')
+    if place:
+        point = {'id': point_id, 'source': source, 'type': place.get('@type')}
+
+        store = place.get('storeData')
+        if store:
+            point['name'] = store_text(store.get('name'), texts)
+            point['price'] = tryint(store.get('price'))
+            point['price_upkeep_day'] = store.get('dailyUpkeep')
+            point['brand'] = store.get('brand')
+            point['category'] = store.get('category')
+            # here in case of multiple types of tags
+            point['is_extension'] = 0
+
+        beehive = place.get('beehive')
+        if beehive:
+            point['radius'] = tryfloat(beehive.get('@actionRadius'))
+            point['liter_day'] = tryfloat(beehive.get('@litersHoneyPerDay'))
+            point['fill_type'] = 'HONEY'
+
+        manure_heap = place.get('manureHeap')
+        if manure_heap:
+            point['capacity'] = tryfloat(manure_heap.get('@capacity'))
+            point['is_extension'] = trybool(manure_heap.get('@isExtension'))
+            point['fill_type'] = 'MANURE'
+
+        solar_panels = place.get('solarPanels')
+        if solar_panels:
+            point['income_hour'] = tryfloat(
+                    solar_panels.get('solarPanelsConfigurations')\
+                    .get('solarPanelsConfiguration')\
+                    .get('@incomePerHour'))
+
+        wind_turbine = place.get('windTurbine')
+        if wind_turbine:
+            point['income_hour'] = tryfloat(wind_turbine.get('@incomePerHour'))
+
+        place_out.append(Placeable(**point))
+    return place_out
+
+
+def get_placeable(game_dir, con, jobs=1, mods=None, texts=None):
     place_sql = '\n'.join((
         "INSERT OR IGNORE INTO placeable (",
         "   id, name, type, price, price_upkeep_day, brand, category, capacity, is_extension,",
-        "   radius, liter_day, fill_type, income_hour)",
-        "VALUES (:id, :name, :type, :price, :price_upkeep_day, :brand, :category, :capacity,",
-        "  :is_extension, :radius, :liter_day, :fill_type, :income_hour);"
+        "   radius, liter_day, fill_type, income_hour, source)",
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);"
+    ))
+    xml_files = placeable_files(game_dir, mods)
+    tables = ('placeable',)
+    file_rows = functools.partial(placeable_file_rows, game_dir=game_dir, mods=mod_dirs(mods),
+                                  texts=texts)
+    l10n_reset(con, 'placeable', texts)
+    with BulkLoader(con) as load:
+        scraped = manifest_scrape(con, 'placeable', xml_files, tables, file_rows, game_dir,
+                                  jobs=jobs, mods=mod_dirs(mods))
+        for state, places in scraped:
+            load.add(place_sql, resolve_rows(places, texts, 'name'))
+            manifest_record(con, 'placeable', state, tables, places)
+
+
+def vehicle_files(game_dir, mods=None):
+    return (walk_files(os.path.join(game_dir, 'data', 'vehicles'), '.xml')
+            + [f for m in mods or () for f in m['vehicles']])
+
+
+def vehicle_id(file, game_dir, mods):
+    # (vehicle id, source, mod folder) of a vehicle file. Vehicles of different brands share
+    # file names, so the id is the path below data/vehicles (or the mod folder) without .xml
+    source, mod_dir = file_mod(file, mods)
+    folder = mod_dir if mod_dir is not None else os.path.join(game_dir, 'data', 'vehicles')
+    vehicle = os.path.splitext(os.path.relpath(file, folder))[0].replace(os.sep, '/')
+    if mod_dir is not None:
+        vehicle = f"{source}:{vehicle}"
+    return vehicle, source, mod_dir
+
+
+def store_text(value, texts=None):
+    # a storeData text: plain, a %s template with params (resolved with texts before it is
+    # filled, see format_text), or one element per language in mods
+    if isinstance(value, dict):
+        if value.get('#text') and value.get('@params'):
+            return format_text(value['#text'], value['@params'], texts)
+        if '#text' in value:
+            return value['#text']
+        value = value.get('en', next(iter(value.values()), None))
+    return value if isinstance(value, str) else None
+
+
+VEHICLE_SPEC = Table('vehicle', rows='vehicle', columns=(
+    Col('type', '@type'),
+    Col('name', 'storeData.name'),
+    Col('brand', 'storeData.brand'),
+    Col('category', 'storeData.category'),
+    Col('price', 'storeData.price', tryint),
+    Col('upkeep_day', 'storeData.dailyUpkeep', tryint),
+    Col('lifetime', 'storeData.lifetime', tryint),
+    Col('power', 'storeData.specs.power', tryint),
+    Col('needed_power', 'storeData.specs.neededPower', tryint),
+    Col('max_speed', 'storeData.specs.maxSpeed', tryfloat),
+    Col('working_width', 'storeData.specs.workingWidth', tryfloat),
+))
+
+# consumer, the 1 based consumerConfiguration the motor burns from, is swapped for its fuel
+VEHICLE_MOTOR_SPEC = Table(
+    'vehicle_motor', rows='vehicle.motorized.motorConfigurations.motorConfiguration', columns=(
+        Col('name', '@name'),
+        Col('hp', '@hp', tryint),
+        Col('price', '@price', tryint, 0),
+        Col('max_speed', 'motor@maxForwardSpeed', tryfloat),
+        Col('consumer', '@consumerConfigurationIndex', tryint, 1),
+    ))
+
+# consumers that aren't the fuel (AdBlue, compressed air)
+NOT_FUEL = ('def', 'air')
+
+Vehicle = row_type('Vehicle', 'id type name brand category price upkeep_day lifetime power '
+                              'needed_power max_speed working_width fuel_fill fuel_usage source')
+VehicleMotor = row_type('VehicleMotor', 'vehicle_id idx name hp price max_speed fuel_fill '
+                                        'fuel_usage')
+
+
+def consumer_fuel(config):
+    # (fill type, liters per hour at full load) of the fuel of a consumerConfiguration
+    for consumer in as_list(config.get('consumer') if isinstance(config, dict) else None):
+        fill = consumer.get('@fillType')
+        if fill and fill.lower() not in NOT_FUEL:
+            return fill.upper(), tryfloat(consumer.get('@usage'))
+    return None, None
+
+
+def vehicle_file_rows(file, game_dir, mods=None, texts=None):
+    # only storeData and motorized are kept while parsing; files that aren't vehicles (shared
+    # configurations, sounds) give no rows
+    vehicle, source, mod_dir = vehicle_id(file, game_dir, mods)
+    d = parse_resolved(file, game_dir, spec_sections(VEHICLE_SPEC, VEHICLE_MOTOR_SPEC),
+                       key='vehicle', mod_dir=mod_dir)
+    motorized = (d.get('vehicle') or {}).get('motorized')
+    consumers = motorized.get('consumerConfigurations') if isinstance(motorized, dict) else None
+    fuels = [consumer_fuel(c) for c in as_list(
+        consumers.get('consumerConfiguration') if isinstance(consumers, dict) else None)]
+    motors = VEHICLE_MOTOR_SPEC.extract(d, vehicle_id=vehicle)
+    for idx, motor in enumerate(motors, 1):
+        consumer = motor.pop('consumer')
+        motor['idx'] = idx
+        motor['fuel_fill'], motor['fuel_usage'] = (
+            fuels[consumer - 1] if isinstance(consumer, int) and 0 < consumer <= len(fuels)
+            else (None, None))
+    vehicles = VEHICLE_SPEC.extract(d, id=vehicle, source=source)
+    for row in vehicles:
+        row['name'] = store_text(row['name'], texts)
+        # the store shows the first motor configuration
+        if motors:
+            row['fuel_fill'], row['fuel_usage'] = motors[0]['fuel_fill'], motors[0]['fuel_usage']
+        else:
+            row['fuel_fill'], row['fuel_usage'] = fuels[0] if fuels else (None, None)
+    return [Vehicle(**row) for row in vehicles], [VehicleMotor(**row) for row in motors]
+
+
+def get_vehicles(game_dir, con, jobs=1, mods=None, texts=None):
+    vehicle_sql = '\n'.join((
+        "INSERT OR IGNORE INTO vehicle (id, type, name, brand, category, price, upkeep_day,",
+        "  lifetime, power, needed_power, max_speed, working_width, fuel_fill, fuel_usage,",
+        "  source)",
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?);"
+    ))
+    motor_sql = '\n'.join((
+        "INSERT OR IGNORE INTO vehicle_motor (vehicle_id, idx, name, hp, price, max_speed,",
+        "  fuel_fill, fuel_usage)",
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?);"
+    ))
+    xml_files = vehicle_files(game_dir, mods)
+    tables = ('vehicle', 'vehicle_motor')
+    file_rows = functools.partial(vehicle_file_rows, game_dir=game_dir, mods=mod_dirs(mods),
+                                  texts=texts)
+    l10n_reset(con, 'vehicles', texts)
+    with BulkLoader(con) as load:
+        scraped = manifest_scrape(con, 'vehicles', xml_files, tables, file_rows, game_dir,
+                                  jobs=jobs, mods=mod_dirs(mods))
+        for state, result in scraped:
+            vehicles, motors = result
+            load.add(vehicle_sql, resolve_rows(vehicles, texts, 'name'))
+            load.add(motor_sql, resolve_rows(motors, texts, 'name'))
+            manifest_record(con, 'vehicles', state, tables, result)
+
+
+def map_placeables_file(config, game_dir, mod_dir=None):
+    # the list of placeables a map config places, if it names one that exists
+    placeables = config.get('placeables')
+    if not isinstance(placeables, dict) or not placeables.get('@filename'):
+        return None
+    placed = parent_path(game_dir, placeables.get('@filename'), mod_dir)
+    return placed if is_file(placed) else None
+
+
+def game_maps(game_dir):
+    """
+    (map id, placeables list file, mod folder) of the base game maps: the map configs (root
+    <map> with a placeables list) directly inside a data/maps/<map> folder, named after it.
+    """
+    maps_dir = os.path.normpath(os.path.join(game_dir, 'data', 'maps'))
+    out = []
+    for file in walk_files(maps_dir, '.xml'):
+        folder = os.path.dirname(file)
+        if os.path.dirname(folder) != maps_dir:
+            continue
+        config = parse_sections(file, ('placeables',)).get('map')
+        placed = map_placeables_file(config or {}, game_dir)
+        if placed is not None:
+            out.append((os.path.basename(folder), placed, None))
+    return out
+
+
+def map_placements(maps, game_dir):
+    # {(map id, file): times placed} of every placeable the maps place
+    placed = {}
+    for map_id, list_file, mod_dir in maps:
+        d = parse_sections(list_file, ('placeable',)).get('placeables') or {}
+        for p in as_list(d.get('placeable')):
+            if isinstance(p, dict) and p.get('@filename'):
+                file = parent_path(game_dir, p.get('@filename'), mod_dir)
+                placed[(map_id, file)] = placed.get((map_id, file), 0) + 1
+    return placed
+
+
+SELL_POINT_SPEC = Table('sell_point', rows='placeable', when='sellingStation', columns=(
+    Col('type', '@type'),
+    Col('name', 'storeData.name'),
+))
+
+SellPoint = row_type('SellPoint', 'id type name source')
+SellFill = row_type('SellFill', 'point_id fill_type price_scale great_demand')
+SellCategory = row_type('SellCategory', 'point_id category')
+
+SELL_FILL_SPEC = Table('sell_point_fill', rows='placeable.sellingStation.fillType', columns=(
+    Col('fill_type', '@name'),
+    Col('price_scale', '@priceScale', tryfloat, 1.0),
+    Col('great_demand', '@supportsGreatDemand', trybool, False),
+))
+
+
+def sell_file_rows(file, game_dir, mods=None, texts=None):
+    # a placed file without a sellingStation (houses, productions without one) gives no rows.
+    # fill types the station takes without a <fillType> of their own sell at the base price
+    point_id, source, mod_dir = mod_point_id(file, mods)
+    d = parse_resolved(file, game_dir, ('storeData', 'sellingStation'), mod_dir=mod_dir)
+    points = SELL_POINT_SPEC.records(d, SellPoint, id=point_id, source=source)
+    if not points:
+        return [], [], []
+    points = [p._replace(name=store_text(p.name, texts)) for p in points]
+    fills = {}
+    for row in SELL_FILL_SPEC.records(d, SellFill, point_id=point_id):
+        if row.fill_type:
+            fills.setdefault(row.fill_type.upper(), row._replace(fill_type=row.fill_type.upper()))
+    station = d['placeable']['sellingStation']
+    station = station if isinstance(station, dict) else {}
+    for fill in (station.get('@fillTypes') or '').split():
+        fills.setdefault(fill.upper(), SellFill(point_id, fill.upper(), 1.0, False))
+    categories = [SellCategory(point_id, cat.upper())
+                  for cat in dict.fromkeys((station.get('@fillTypeCategories') or '').split())]
+    return points, list(fills.values()), categories
+
+
+def get_sell(game_dir, con, jobs=1, mods=None, texts=None):
+    """
+    Selling stations of the base game and mod maps. Which map places which file is read from
+    the maps' placeables lists on every run into map_placeable; the placed files themselves go
+    through the manifest and only those with a sellingStation give sell_point rows.
+    """
+    point_sql = '\n'.join((
+        "INSERT OR IGNORE INTO sell_point (id, type, name, source)",
+        "VALUES (?, ?, ?, ?);"
     ))
+    fill_sql = '\n'.join((
+        "INSERT OR IGNORE INTO sell_point_fill (point_id, fill_type, price_scale, great_demand)",
+        "VALUES (?, ?, ?, ?);"
+    ))
+    cat_sql = '\n'.join((
+        "INSERT OR IGNORE INTO sell_point_category (point_id, category)",
+        "VALUES (?, ?);"
+    ))
+    map_sql = '\n'.join((
+        "INSERT OR IGNORE INTO map_placeable (map, point_id, placed)",
+        "VALUES (:map, :point_id, :placed);"
+    ))
+    maps = game_maps(game_dir) + [m for mod in mods or () for m in mod['maps']]
+    placed = map_placements(maps, game_dir)
+    xml_files = [f for f in dict.fromkeys(file for map_id, file in placed) if is_file(f)]
+    map_out = [{'map': map_id, 'point_id': mod_point_id(file, mod_dirs(mods))[0], 'placed': n}
+               for (map_id, file), n in placed.items()]
+    tables = ('sell_point', 'sell_point_fill', 'sell_point_category')
+    file_rows = functools.partial(sell_file_rows, game_dir=game_dir, mods=mod_dirs(mods),
+                                  texts=texts)
     c = con.cursor()
-    dirs = []
-    brandless = os.path.join(game_dir, "data", "placeables", "brandless")
-    dirs.append(pathlib.Path(brandless, "beeHives"))
-    dirs.append(pathlib.Path(brandless, "manureHeap"))
-    dirs.append(pathlib.Path(brandless, "riceField"))
-    dirs.append(pathlib.Path(brandless, "electricityGenerators"))
-    place_out = []
-    xml_files = []
-    for folder_path in dirs:
-        for p in pathlib.Path(folder_path).rglob("*"):
-            if os.path.splitext(p)[1] == '.xml':
-                xml_files.append(p)
-    xml_files = sorted(xml_files)
-    for file in xml_files:
-        point_dict = {}
-        file_name = os.path.basename(file)
-        point_id = os.path.splitext(file_name)[0]
-        with open(file, 'r', encoding='utf8') as f:
-            data = f.read()
-        d = xmltodict.parse(data)
-
-        # point
-        point_dict['id'] = point_id
-        place = d.get('placeable')
-        if place:
-            parent = place.get('parentFile')
-            if parent is not None:
-                place = get_parent(game_dir=game_dir, child=place, parent_link=parent,
-                                   key='placeable')
-
-            point_dict['type'] = place.get('@type')
-
-            store = place.get('storeData')
-            if store:
-                store_name = store.get('name')
-                if isinstance(store_name, dict):
-                    name_params = store_name.get('@params')
-                    name_text = store_name.get('#text')
-                    point_dict['name'] = name_text % tuple(name_params.split('|'))
+    l10n_reset(con, 'sell', texts)
+    with BulkLoader(con) as load:
+        c.execute("DELETE FROM map_placeable;")
+        load.add(map_sql, map_out)
+        scraped = manifest_scrape(con, 'sell', xml_files, tables, file_rows, game_dir,
+                                  jobs=jobs, mods=mod_dirs(mods))
+        for state, result in scraped:
+            points, fills, categories = result
+            load.add(point_sql, resolve_rows(points, texts, 'name'))
+            load.add(fill_sql, fills)
+            load.add(cat_sql, categories)
+            manifest_record(con, 'sell', state, tables, result)
+
+
+def l10n_layers(game_dir, dataS_dir, lang, mods=None):
+    """
+    (file, inline) pairs of where the texts of lang come from, base game first and then the
+    mods, each overriding the ones before. The game's l10n_<lang>.xml files are looked for in
+    the l10n folder of the game and the dataS folders and in those folders themselves. inline
+    marks a modDesc.xml with the texts in it.
+    """
+    folders = [os.path.join(game_dir, 'l10n'), game_dir]
+    if dataS_dir is not None:
+        folders += [os.path.join(dataS_dir, 'l10n'), dataS_dir]
+    layers = [(f, False) for f in l10n_files(folders, lang)]
+    for mod in mods or ():
+        prefix, desc_file = mod['l10n']
+        if prefix:
+            # mods fall back to their English texts
+            for mod_lang in dict.fromkeys((lang, 'en')):
+                if is_file(f'{prefix}_{mod_lang}.xml'):
+                    layers.append((f'{prefix}_{mod_lang}.xml', False))
+                    break
+        if desc_file:
+            layers.append((desc_file, True))
+    return layers
+
+
+def get_l10n(game_dir, dataS_dir, con, langs=('en',), mods=None):
+    """
+    Reads the texts of langs into the l10n table, or from it when none of the files changed,
+    and returns the {key: text} index of the first language, which the other stages resolve
+    names with.
+    """
+    text_sql = "INSERT OR REPLACE INTO l10n (lang, key, text) VALUES (?, ?, ?);"
+    c = con.cursor()
+    layers = {lang: l10n_layers(game_dir, dataS_dir, lang, mods) for lang in langs}
+    files = list(dict.fromkeys(f for lang in langs for f, inline in layers[lang]))
+    if manifest_stage_current(con, 'l10n', files, game_dir, mod_dirs(mods)):
+        return dict(c.execute("SELECT key, text FROM l10n WHERE lang = ?;", (langs[0],)))
+
+    index = {}
+    with BulkLoader(con) as load:
+        c.execute("DELETE FROM l10n;")
+        for lang in langs:
+            texts = {}
+            for file, inline in layers[lang]:
+                if inline:
+                    texts.update(inline_l10n(parse_sections(file, ('l10n',)).get('modDesc'), lang))
                 else:
-                    point_dict['name'] = store.get('name')
-                point_dict['price'] = tryint(store.get('price'))
-                point_dict['price_upkeep_day'] = store.get('dailyUpkeep')
-                point_dict['brand'] = store.get('brand')
-                point_dict['category'] = store.get('category')
-                # here in case of multiple types of tags
-                point_dict['radius'] = None
-                point_dict['liter_day'] = None
-                point_dict['capacity'] = None
-                point_dict['is_extension'] = 0
-                point_dict['fill_type'] = None
-                point_dict['income_hour'] = None
-
-            beehive = place.get('beehive')
-            if beehive:
-                point_dict['radius'] = tryfloat(beehive.get('@actionRadius'))
-                point_dict['liter_day'] = tryfloat(beehive.get('@litersHoneyPerDay'))
-                point_dict['fill_type'] = 'HONEY'
-
-            manure_heap = place.get('manureHeap')
-            if manure_heap:
-                point_dict['capacity'] = tryfloat(manure_heap.get('@capacity'))
-                point_dict['is_extension'] = trybool(manure_heap.get('@isExtension'))
-                point_dict['fill_type'] = 'MANURE'
-
-            solar_panels = place.get('solarPanels')
-            if solar_panels:
-                point_dict['income_hour'] = tryfloat(
-                        solar_panels.get('solarPanelsConfigurations')\
-                        .get('solarPanelsConfiguration')\
-                        .get('@incomePerHour'))
-
-            wind_turbine = place.get('windTurbine')
-            if wind_turbine:
-                point_dict['income_hour'] = tryfloat(wind_turbine.get('@incomePerHour'))
-
-            place_out.append(point_dict)
-    c.executemany(place_sql, place_out)
+                    texts.update(read_l10n(file))
+            load.add(text_sql, [(lang, k, v) for k, v in texts.items()])
+            index = index or texts
+        manifest_replace_stage(con, 'l10n', files, game_dir, mods=mod_dirs(mods))
+    return index
+
+
+def stage_partitions(stage):
+    return next(s.outputs for s in scrape_stages() if s.name == stage)
+
+
+def l10n_reset(con, stage, texts):
+    """
+    Names are resolved as files are parsed (templates with params) and as rows are loaded, so
+    when a stage's rows were loaded with other texts (or none) all of them are out of date.
+    Then the stage's partitions, its manifest included, are cleared so every file is read again,
+    and the texts now in use are recorded.
+    """
+    c = con.cursor()
+    mark = fingerprint(texts)
+    row = c.execute("SELECT fingerprint FROM scrape_l10n WHERE stage = ?;", (stage,)).fetchone()
+    if row is not None and row['fingerprint'] == mark:
+        return
+    # children before the tables their foreign keys point at
+    for table, where in reversed(stage_partitions(stage)):
+        c.execute(f"DELETE FROM {table}{' WHERE ' + where if where else ''};")
+    c.execute("INSERT OR REPLACE INTO scrape_l10n (stage, fingerprint) VALUES (?, ?);",
+              (stage, mark))
+    con.commit()
+
+
+def stage_outputs(stage, *tables):
+    # (table, where) partitions a stage writes: its tables (names, or (name, where) pairs for
+    # tables shared with another stage) and its part of the manifest and profile
+    parts = [t if isinstance(t, tuple) else (t, None) for t in tables]
+    parts += [(t, f"stage = '{stage}'") for t in ('scrape_manifest', 'scrape_manifest_row',
+                                                  'scrape_l10n', 'scrape_profile',
+                                                  'scrape_profile_stage')]
+    return tuple(parts)
+
+
+def scrape_stages(with_dataS=True):
+    """
+    The stages of a scrape as fs_sched stages: mods and routes only produce results for the
+    others, l10n the texts the stages with names resolve them with, and every other stage writes
+    its own tables (fruit and fill each their own type of type_convert rows) and so they can run
+    side by side.
+    """
+    placed = ('routes', 'mods', 'l10n')
+    stages = [
+        Stage('mods'),
+        Stage('routes'),
+        Stage('l10n', ('mods',), stage_outputs('l10n', 'l10n')),
+        Stage('prod', placed, stage_outputs('prod', 'prod_point', 'production', 'prod_fill')),
+        Stage('fruit', ('mods',), stage_outputs('fruit', 'fruit', 'fruit_category',
+                                                ('type_convert', "type = 'fruit'"))),
+        Stage('fill', ('mods', 'l10n'), stage_outputs('fill', 'fill', 'fill_factor',
+                                                      'fill_category',
+                                                      ('type_convert', "type = 'fill'"))),
+    ]
+    if with_dataS:
+        stages += [
+            Stage('animals', (), stage_outputs('animals', 'animal', 'animal_price',
+                                               'animal_fill')),
+            Stage('animal_food', (), stage_outputs('animal_food', 'animal_food',
+                                                   'animal_food_group', 'animal_food_fill',
+                                                   'animal_food_mix', 'animal_food_recipe')),
+        ]
+    stages += [
+        Stage('animal_pen', placed, stage_outputs('animal_pen', 'animal_point',
+                                                  'animal_capacity')),
+        Stage('placeable', placed, stage_outputs('placeable', 'placeable')),
+        Stage('vehicles', ('mods', 'l10n'), stage_outputs('vehicles', 'vehicle',
+                                                          'vehicle_motor')),
+        Stage('sell', ('mods', 'l10n'), stage_outputs('sell', 'sell_point', 'sell_point_fill',
+                                                      'sell_point_category', 'map_placeable')),
+    ]
+    return stages
+
+
+STAGE_TITLES = {
+    'mods': 'Reading mods',
+    'routes': 'Indexing placeables',
+    'l10n': 'Reading texts',
+    'prod': 'Scraping production',
+    'fruit': 'Scraping fruit',
+    'fill': 'Scraping fill',
+    'animals': 'Scraping animals',
+    'animal_food': 'Scraping animal food',
+    'animal_pen': 'Scraping animal pens',
+    'placeable': 'Scraping other placeables',
+    'vehicles': 'Scraping vehicles',
+    'sell': 'Scraping selling stations',
+}
+
+
+def profile_clear(con, stage):
+    c = con.cursor()
+    c.execute("DELETE FROM scrape_profile WHERE stage = ?;", (stage,))
+    c.execute("DELETE FROM scrape_profile_stage WHERE stage = ?;", (stage,))
+    con.commit()
+
+
+def profile_record(con, stage, totals):
+    """
+    Writes a stage's row of scrape_profile_stage from its fs_prof totals. Its read, parse and
+    extract seconds are those of its profiled files (summed over the pool's processes) plus
+    its own; a stage without files has whatever isn't reading, parsing or writing as extract.
+    """
+    c = con.cursor()
+    files = c.execute("SELECT count(*) FROM scrape_profile WHERE stage = ?;",
+                      (stage,)).fetchone()[0]
+    seconds = totals['seconds']
+    read, parse, write = totals.get('read', 0), totals.get('parse', 0), totals.get('write', 0)
+    extract = totals['extract'] if files else max(0.0, seconds - read - parse - write)
+    c.execute('\n'.join((
+        "INSERT OR REPLACE INTO scrape_profile_stage (stage, seconds, files, rows, read_s,",
+        "  parse_s, extract_s, write_s)",
+        "VALUES (?, ?, ?, ?, ?, ?, ?, ?);"
+    )), (stage, seconds, files, totals.get('rows', 0), read, parse, extract, write))
     con.commit()
 
+
+def read_profile(con):
+    # (stage rows, file rows) of the last profiled scrape, as dicts
+    c = con.cursor()
+    stages = [dict(r) for r in c.execute("SELECT * FROM scrape_profile_stage;")]
+    files = [dict(r) for r in c.execute("SELECT * FROM scrape_profile;")]
+    return stages, files
+
+
+def run_scrape_stage(name, deps, game_dir, dataS_dir, db_path, jobs=1, mods_dir=None,
+                     staging_dir=None, con=None, langs=('en',), profile=False):
+    """
+    Runs one stage of scrape_stages and returns (staging path, result). Without staging_dir it
+    writes straight into con, or the database at db_path when con is None. With it, the stage
+    gets a staging database of its own, seeded with the stage's current rows from db_path (if
+    given and there) so the manifest still skips unchanged files, whose path is returned for
+    merging. result is what the stage hands to the stages after it (mods, routes, texts).
+
+    With profile the stage's timings replace its rows of the profile tables, without it they
+    are only cleared.
+    """
+    print(f"{STAGE_TITLES[name]}...")
+    if name == 'mods':
+        return None, find_mods(mods_dir, game_dir, jobs=jobs) if mods_dir is not None else []
+    if name == 'routes':
+        return None, placeable_routes(game_dir)
+    results = {dep: result for dep, (staging, result) in deps.items()}
+    if 'routes' in results:
+        PLACEABLE_INDEX[game_dir] = results['routes']
+    mods = results.get('mods')
+    texts = results.get('l10n')
+    outputs = stage_partitions(name)
+
+    staging_path = None
+    own_con = con is None
+    if staging_dir is not None:
+        staging_path = os.path.join(staging_dir, f'{name}.sqlite')
+        con = create_db(staging_path)
+        if db_path is not None and os.path.isfile(db_path):
+            pull_partitions(con, db_path, outputs)
+    elif own_con:
+        con = create_db(db_path)
+    result = None
+    try:
+        profile_clear(con, name)
+        if profile:
+            start_stage()
+        if name == 'l10n':
+            result = get_l10n(game_dir=game_dir, dataS_dir=dataS_dir, con=con, langs=langs,
+                              mods=mods)
+        elif name == 'prod':
+            get_prod(game_dir=game_dir, con=con, jobs=jobs, mods=mods, texts=texts)
+        elif name == 'fruit':
+            get_fruit(game_dir=game_dir, con=con, mods=mods)
+        elif name == 'fill':
+            get_fill(game_dir=game_dir, con=con, mods=mods, texts=texts)
+        elif name == 'animals':
+            get_animals(dataS_dir=dataS_dir, con=con)
+        elif name == 'animal_food':
+            get_animal_food(dataS_dir=dataS_dir, con=con)
+        elif name == 'animal_pen':
+            get_animal_pen(game_dir=game_dir, con=con, jobs=jobs, mods=mods, texts=texts)
+        elif name == 'placeable':
+            get_placeable(game_dir=game_dir, con=con, jobs=jobs, mods=mods, texts=texts)
+        elif name == 'vehicles':
+            get_vehicles(game_dir=game_dir, con=con, jobs=jobs, mods=mods, texts=texts)
+        elif name == 'sell':
+            get_sell(game_dir=game_dir, con=con, jobs=jobs, mods=mods, texts=texts)
+        if profile:
+            profile_record(con, name, stop_stage())
+    finally:
+        stop_stage()
+        if own_con or staging_path is not None:
+            con.close()
+    return staging_path, result
+
+
+def scrape_all(game_dir, db_path, dataS_dir=None, jobs=1, mods_dir=None, stage_jobs=1,
+               in_memory=False, overwrite=False, langs=('en',), profile=False):
+    """
+    Scrapes everything into the database at db_path with the stages scheduled by their
+    dependencies, stage_jobs of them at a time. With more than one, every stage writes to a
+    staging database in its own process and is merged into db_path as it finishes, so the
+    scrape takes about as long as its critical path. Returns (stages, fs_sched timings).
+
+    Without overwrite an existing database is updated from the files that changed. With
+    in_memory the database is built in memory, starting from the one at db_path, and only
+    published to db_path (atomically, in WAL mode) once the scrape and views are done; a failed
+    scrape leaves db_path as it was.
+
+    Names are stored in the first of langs, and the texts of all of them in the l10n table.
+
+    With profile every stage, and every file it parses, is timed into the scrape_profile_stage
+    and scrape_profile tables (see read_profile).
+    """
+    stages = scrape_stages(with_dataS=dataS_dir is not None)
+    previous = db_path if os.path.isfile(db_path) and not overwrite else None
+    if in_memory:
+        con = create_db(':memory:', restore_from=previous)
+    else:
+        if os.path.isfile(db_path) and overwrite:
+            os.remove(db_path)
+        con = create_db(db_path)
+    with tempfile.TemporaryDirectory(prefix='fs_stages_') as staging_dir:
+        # in memory, sequential stages share con and staging databases are seeded from the
+        # previous file, which holds the same rows for every stage that hasn't run yet
+        run = functools.partial(run_scrape_stage, game_dir=game_dir, dataS_dir=dataS_dir,
+                                db_path=previous if in_memory else db_path, jobs=jobs,
+                                mods_dir=mods_dir,
+                                staging_dir=staging_dir if stage_jobs > 1 else None,
+                                con=con if in_memory and stage_jobs <= 1 else None,
+                                langs=tuple(langs), profile=profile)
+        outputs = {s.name: s.outputs for s in stages}
+
+        def merge(name, result):
+            staging_path = result[0]
+            if outputs[name] and staging_path is not None:
+                pull_partitions(con, staging_path, outputs[name])
+                os.remove(staging_path)
+        timings = schedule(stages, run, merge=merge, workers=stage_jobs)
+    # stages without tables (mods, routes) only have the scheduler's timing
+    for s in stages:
+        if not s.outputs:
+            profile_clear(con, s.name)
+            if profile:
+                timing = timings[s.name][0]
+                profile_record(con, s.name, {'seconds': timing.end - timing.start})
+    add_indexes(con)
+    print("Adding production queries...")
+    add_production_queries(con=con)
+    if in_memory:
+        print(f"Writing {db_path}...")
+        publish(con, db_path)
+    con.close()
+    return stages, timings
+
+
+QUERY_FILE = 'prod25.sql'
+
+# the view or table a statement of the queries file makes or fills
+QUERY_OBJECT_RE = re.compile(r'\s*(?:(?:DROP|CREATE)\s+(?:VIEW|TABLE)\s+'
+                             r'(?:IF\s+(?:NOT\s+)?EXISTS\s+)?'
+                             r'|INSERT\s+(?:OR\s+\w+\s+)?INTO\s+)(\w+)', re.IGNORECASE)
+
+
 def add_production_queries(con):
     c = con.cursor()
-    with open('prod25.sql', 'r', encoding='utf8') as file:
+    with open(QUERY_FILE, 'r', encoding='utf8') as file:
         queries_str = file.read()
     queries = sqlparse.split(queries_str)
-    for query in queries:
-        c.execute(query)
+    # in one transaction (the DDL would run in autocommit mode), so that a failing query leaves
+    # the views and tables of the last run in place
+    con.commit()
+    c.execute("BEGIN;")
+    try:
+        drop_profit_views(con)
+        for query in queries:
+            c.execute(query)
+        # the profit tables were just filled from these rows
+        record_inputs(con)
+    except BaseException:
+        con.rollback()
+        raise
+    con.commit()
+
+
+@functools.lru_cache(maxsize=4)
+def split_query_blocks(queries_str):
+    # (name, statements, words) of query_blocks; sqlparse takes a good part of a second on the
+    # queries file, so a watch only pays for it when the file changes
+    blocks = {}
+    name = None
+    for query in sqlparse.split(queries_str):
+        text = sqlparse.format(query, strip_comments=True)
+        match = QUERY_OBJECT_RE.match(text)
+        # a statement making nothing goes with the block before it
+        if match:
+            name = match.group(1).lower()
+        statements, words = blocks.setdefault(name, ([], set()))
+        statements.append(query)
+        words |= set(re.findall(r'\w+', text.lower()))
+    return tuple((n, tuple(statements), frozenset(words))
+                 for n, (statements, words) in blocks.items())
+
+
+def query_blocks(con, queries_str):
+    """
+    The statements of a queries file grouped by the view or table they make (and fill), in
+    file order, as (name, statements, names read) triples. The names read are the tables and
+    views of the database, or made earlier in the file, that the block's statements mention.
+    """
+    c = con.cursor()
+    blocks = split_query_blocks(queries_str)
+    names = {r[0].lower() for r in c.execute(
+        "SELECT name FROM sqlite_master WHERE type IN ('table', 'view');")}
+    names |= {n for n, statements, words in blocks}
+    return [(n, statements, (words & names) - {n}) for n, statements, words in blocks]
+
+
+# the start of the CREATE VIEW statement of a view block, after the comments before it
+CREATE_VIEW_RE = re.compile(r'^CREATE\s+VIEW\b', re.IGNORECASE | re.MULTILINE)
+
+
+def view_current(views, name, statements):
+    # whether the view the block name makes exists with the definition the block gives it;
+    # sqlite_master keeps a view's CREATE statement as it was written, less the semicolon
+    for query in statements:
+        match = CREATE_VIEW_RE.search(query)
+        if match:
+            return views.get(name) == query[match.start():].rstrip().rstrip(';')
+    return False
+
+
+def refresh_queries(con, tables):
+    """
+    Runs again the blocks of the queries file that read any of tables, directly or through
+    another block, e.g. sell_best and the views on it once the selling stations changed.
+    Views read their tables when queried, so a view block is only run for a changed (or
+    missing) definition, but the blocks reading it are followed all the same; the tables
+    filled by INSERTs are out of date until they are run. The profit tables are not filled
+    again but refreshed (see fs_profit) for the rows whose inputs changed. Returns the names
+    of the blocks run or refreshed.
+    """
+    with open(QUERY_FILE, 'r', encoding='utf8') as file:
+        queries_str = file.read()
+    c = con.cursor()
+    views = {r[0].lower(): r[1] for r in c.execute(
+        "SELECT name, sql FROM sqlite_master WHERE type = 'view';")}
+    stale = set(tables)
+    ran = []
+    for name, statements, reads in query_blocks(con, queries_str):
+        if reads & stale:
+            stale.add(name)
+            if view_current(views, name, statements):
+                continue
+            if name not in PROFIT_TABLES:
+                for query in statements:
+                    c.execute(query)
+            ran.append(name)
+    con.commit()
+    if stale.intersection(PROFIT_TABLES):
+        refresh_profit(con)
+    return ran
+
+
+def watch_stages(con, stages, paths):
+    """
+    The names of the stages to run again for changed paths: those whose manifest lists a
+    changed file, or a file below a changed folder or zip archive, and every stage after
+    them. An xml or zip no stage has read may be a new placeable, vehicle, map or mod, which
+    only a pass over every stage can tell, so it runs them all; other files (textures, sounds,
+    i3d) are left alone.
+    """
+    c = con.cursor()
+    names = set()
+    for path in paths:
+        path = os.path.normpath(path)
+        found = {r['stage'] for r in c.execute(
+            "SELECT DISTINCT stage FROM scrape_manifest WHERE path = ? OR substr(path, 1, ?) = ?;",
+            (path, len(path) + 1, path + os.sep))}
+        if not found and (os.path.isdir(path) or path.lower().endswith(('.xml', '.zip'))):
+            return {s.name for s in stages}
+        names |= found
+    for s in stages:
+        if names.intersection(s.after):
+            names.add(s.name)
+    return names
+
+
+def watch(game_dir, db_path, dataS_dir=None, jobs=1, mods_dir=None, langs=('en',), poll=False,
+          debounce=0.25, **scrape_args):
+    """
+    Scrapes once with scrape_all (given scrape_args), then keeps watching game_dir, dataS_dir,
+    mods_dir and the queries file. Each set of changes runs again the stages that read the
+    changed files, which reparse only those through the manifest, and the queries that depend
+    on the tables they wrote. The results of mods, routes and l10n are kept between rounds for
+    the stages that need them. Runs until interrupted.
+    """
+    stages, timings = scrape_all(game_dir, db_path, dataS_dir=dataS_dir, jobs=jobs,
+                                 mods_dir=mods_dir, langs=langs, **scrape_args)
+    results = {name: result for name, (timing, result) in timings.items()}
+    run = functools.partial(run_scrape_stage, game_dir=game_dir, dataS_dir=dataS_dir,
+                            db_path=db_path, jobs=jobs, mods_dir=mods_dir, langs=tuple(langs))
+    roots = [r for r in (game_dir, dataS_dir, mods_dir) if r is not None]
+    query_file = os.path.abspath(QUERY_FILE)
+    watcher = make_watcher(roots + [query_file], poll=poll)
+    con = create_db(db_path)
+    # parses the queries file now rather than on the first change
+    refresh_queries(con, ())
+    print(f"Watching {', '.join(roots)} and {QUERY_FILE}, Ctrl+C to stop...")
+    try:
+        for paths in watch_changes(watcher, debounce):
+            start = time.perf_counter()
+            # parents of the changed files may be among the cached ones
+            resolved_file.cache_clear()
+            names = watch_stages(con, stages, paths - {query_file})
+            if 'routes' in names:
+                PLACEABLE_INDEX.clear()
+            for s in stages:
+                if s.name in names:
+                    results[s.name] = run(s.name, {d: results[d] for d in s.after}, con=con)
+            if query_file in paths:
+                print("Adding production queries...")
+                add_production_queries(con)
+                refreshed = ['all']
+            else:
+                refreshed = refresh_queries(con, {t for s in stages if s.name in names
+                                                  for t, where in s.outputs})
+            print(f"{len(paths)} changed files, stages {', '.join(sorted(names)) or 'none'}, "
+                  f"queries {', '.join(refreshed) or 'none'} in "
+                  f"{time.perf_counter() - start:.2f} s")
+    except KeyboardInterrupt:
+        pass
+    finally:
+        watcher.close()
+        con.close()
 
 
 if __name__ == '__main__':
@@ -1066,36 +2176,84 @@ if __name__ == '__main__':
                                 'populates a sqlite database with results.',
                     epilog='Script finished.')
 
-    parser.add_argument('game_dir', help='The base game path containing the `data` folder.')
+    parser.add_argument('game_dir',
+                        help='The base game path containing the `data` folder, or a zip '
+                             'archive of it.')
     parser.add_argument('db_path',
                         help='The path at which to store the scraped contents database')
 
     parser.add_argument('-d', '--dataS_dir',
-                        help='The path containing the dataS directory (unzipped and unencrypted'
-                             ' of course).')
+                        help='The path containing the dataS directory (unencrypted of course).'
+                             ' It may also be a zip archive, e.g. dataS.zip or dataS.zip/dataS.')
     parser.add_argument('-o', '--overwrite', action='store_true',
-                        help='Overwrite database if it already exists.')
+                        help='Overwrite database if it already exists. Without it an existing '
+                             'database is updated from the files that changed since the last '
+                             'scrape.')
+    parser.add_argument('-j', '--jobs', type=int, default=1,
+                        help='Number of processes used to parse placeable and vehicle XML files '
+                             '(default 1, no pool).')
+    parser.add_argument('-s', '--stage_jobs', type=int, default=1,
+                        help='Number of scrape stages run at the same time, each in its own '
+                             'process and staging database (default 1, one after the other). '
+                             'Combines with -j, which parallelizes within a stage.')
+    parser.add_argument('-m', '--mods_dir', '--mods-dir',
+                        help='A mods folder to scrape along with the base game. Every mod in it '
+                             '(a folder or zip archive with a modDesc.xml) adds its placeables, '
+                             'fill types and fruit types, tagged with the mod name in the source '
+                             'columns. Mods override the base game and each other in name order.')
+
+    parser.add_argument('--in_memory', '--in-memory', action='store_true',
+                        help='Build the database in memory and write it to db_path in one go '
+                             'when the scrape is done, replacing the old file atomically (in WAL '
+                             'mode). Readers never see a partly written database and a failed '
+                             'scrape leaves the old one in place.')
+
+    parser.add_argument('--profile', nargs='?', const=True, metavar='JSON',
+                        help='Time every stage, and the reading, parsing, row extraction and '
+                             'SQLite writing of every file parsed, into the scrape_profile and '
+                             'scrape_profile_stage tables, and print the stages and slowest '
+                             'files at the end. Given a file name, also write the timings there '
+                             'as JSON.')
+    parser.add_argument('-w', '--watch', action='store_true',
+                        help='After scraping keep watching game_dir, dataS_dir, mods_dir and '
+                             'prod25.sql (through inotify where available), and on every saved '
+                             'change reparse the changed files and rerun the queries that depend '
+                             'on them. Stop with Ctrl+C.')
+    parser.add_argument('--poll', action='store_true',
+                        help='With --watch, look for changes by polling file sizes and times '
+                             'instead of inotify.')
+    parser.add_argument('--debounce', type=float, default=0.25,
+                        help='With --watch, seconds without further changes before a rescrape '
+                             '(default 0.25).')
+    parser.add_argument('-l', '--lang', default='en',
+                        help='Language, or comma separated languages, of the texts read from the '
+                             'l10n_<lang>.xml files into the l10n table. Names and fill title_text '
+                             'are stored in the first one (default en). Without the files names '
+                             'stay $l10n_ keys.')
 
     args = parser.parse_args(my_args)
 
-    if os.path.isfile(args.db_path) and args.overwrite:
-        os.remove(args.db_path)
-    ocon = create_db(db_path=args.db_path)
-    print("Scraping production...")
-    get_prod(game_dir=args.game_dir, con=ocon)
-    print("Scraping fruit...")
-    get_fruit(game_dir=args.game_dir, con=ocon)
-    print("Scraping fill...")
-    get_fill(game_dir=args.game_dir, con=ocon)
-    if args.dataS_dir is not None:
-        print("Scraping animals...")
-        get_animals(dataS_dir=args.dataS_dir, con=ocon)
-        print("Scraping animal food...")
-        get_animal_food(dataS_dir=args.dataS_dir, con=ocon)
-    print("Scraping animal pens...")
-    get_animal_pen(game_dir=args.game_dir, con=ocon)
-    print("Scraping other placeables...")
-    get_placeable(game_dir=args.game_dir, con=ocon)
-    print("Adding production queries...")
-    add_production_queries(con=ocon)
-    ocon.close()
+    if args.watch:
+        watch(args.game_dir, args.db_path, dataS_dir=args.dataS_dir, jobs=args.jobs,
+              mods_dir=args.mods_dir, langs=args.lang.split(','), poll=args.poll,
+              debounce=args.debounce, stage_jobs=args.stage_jobs, in_memory=args.in_memory,
+              overwrite=args.overwrite)
+        sys.exit()
+
+    ostages, otimings = scrape_all(args.game_dir, args.db_path, dataS_dir=args.dataS_dir,
+                                   jobs=args.jobs, mods_dir=args.mods_dir,
+                                   stage_jobs=args.stage_jobs, in_memory=args.in_memory,
+                                   overwrite=args.overwrite, langs=args.lang.split(','),
+                                   profile=bool(args.profile))
+    for line in schedule_report(ostages, otimings):
+        print(line)
+    if args.profile:
+        pcon = create_db(args.db_path)
+        pstages, pfiles = read_profile(pcon)
+        pcon.close()
+        for line in profile_report(pstages, pfiles):
+            print(line)
+        if args.profile is not True:
+            with open(args.profile, 'w', encoding='utf8') as file:
+                json.dump({'stages': pstages, 'files': pfiles}, file, indent=2)
+            print(f"Profile written to {args.profile}")
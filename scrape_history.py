@@ -0,0 +1,285 @@
+import sys
+import json
+import time
+import hashlib
+import argparse
+import sqlite3 as sqlite
+from fs_profit import PROFIT_TABLES
+
+# A history of scrapes across game patches and versions in one database. Every row of every
+# scraped table is stored once in history_row, keyed by a hash of its table and content, and
+# the snapshots holding it are given as spans of consecutive snapshots of one game (fs22, fs25)
+# in history_span: a row that stays the same over ten patches is one row and one span. A new
+# snapshot only adds the rows that changed and a span for each, so the store grows with the
+# changes rather than with the number of snapshots. Snapshots of a game are added in release
+# order, each one following the last.
+
+HISTORY_TABLES = (
+    '\n'.join((
+        "CREATE TABLE IF NOT EXISTS history_snapshot (",
+        "   id INTEGER PRIMARY KEY, game TEXT, seq INTEGER, version TEXT, label TEXT,",
+        "   created TEXT, source TEXT, rows INTEGER,",
+        "   UNIQUE (game, seq),",
+        "   UNIQUE (game, version, label)",
+        ");"
+    )),
+    '\n'.join((
+        "CREATE TABLE IF NOT EXISTS history_row (",
+        "   id INTEGER PRIMARY KEY, hash BLOB UNIQUE, tbl TEXT, key TEXT, data TEXT",
+        ");"
+    )),
+    "CREATE INDEX IF NOT EXISTS history_row_key ON history_row (tbl, key);",
+    '\n'.join((
+        "CREATE TABLE IF NOT EXISTS history_span (",
+        "   game TEXT, row_id INTEGER, first_seq INTEGER, last_seq INTEGER,",
+        "   PRIMARY KEY (game, row_id, first_seq),",
+        "   FOREIGN KEY (row_id) REFERENCES history_row(id)",
+        ") WITHOUT ROWID;"
+    )),
+    "CREATE INDEX IF NOT EXISTS history_span_last ON history_span (game, last_seq);",
+)
+
+
+def open_history(path):
+    con = sqlite.connect(path)
+    con.row_factory = sqlite.Row
+    c = con.cursor()
+    for stmt in HISTORY_TABLES:
+        c.execute(stmt)
+    con.commit()
+    return con
+
+
+def scraped_tables(con):
+    # {table: (columns, key columns)} of the scraped data, leaving out the scraper's own
+    # bookkeeping (manifest, profile) tables and the profit tables, which are derived, have no
+    # key and change with any price
+    c = con.cursor()
+    out = {}
+    for (table,) in c.execute("SELECT name FROM sqlite_master WHERE type = 'table' "
+                              "AND name NOT LIKE 'scrape_%' AND name NOT LIKE 'sqlite_%' "
+                              "ORDER BY name;").fetchall():
+        if table in PROFIT_TABLES:
+            continue
+        info = c.execute(f"PRAGMA table_info({table});").fetchall()
+        columns = [r[1] for r in info]
+        key = [r[1] for r in sorted(info, key=lambda r: r[5]) if r[5]]
+        out[table] = (columns, key or columns)
+    return out
+
+
+def row_hash(table, data):
+    # the raw 20 byte digest, half the size of its hex in the row and its index
+    return hashlib.sha1(f"{table}\0{data}".encode('utf8')).digest()
+
+
+def snapshot_rows(con):
+    """
+    (hash, table, key, data) of every row of a scrape database. data is the row as a JSON
+    object with sorted keys, key the JSON list of its key column values: its primary key, or
+    the whole row for tables without one.
+    """
+    c = con.cursor()
+    for table, (columns, key) in scraped_tables(con).items():
+        for row in c.execute(f"SELECT {', '.join(columns)} FROM {table};"):
+            values = dict(zip(columns, row))
+            data = json.dumps(values, sort_keys=True)
+            yield (row_hash(table, data), table, json.dumps([values[k] for k in key]), data)
+
+
+def add_snapshot(history, scrape_path, game, version, label=''):
+    """
+    Records the scrape database at scrape_path as the next snapshot of game. Rows seen before
+    are only referenced, by extending the span of the last snapshot that held them. Returns
+    (snapshot id, rows in the snapshot, rows new to the history). Raises ValueError when game
+    already has a snapshot of that version and label, or scrape_path is not a scrape database.
+    """
+    c = history.cursor()
+    if c.execute("SELECT 1 FROM history_snapshot WHERE game = ? AND version = ? AND label = ?;",
+                 (game, version, label)).fetchone():
+        raise ValueError(f"there is a snapshot {game}:{version}{':' + label if label else ''} "
+                         f"already, give the scrape another label")
+    last = c.execute("SELECT max(seq) FROM history_snapshot WHERE game = ?;",
+                     (game,)).fetchone()[0] or 0
+    seq = last + 1
+    # read-only, so a mistyped path is not created as an empty database
+    try:
+        scrape = sqlite.connect(f'file:{scrape_path}?mode=ro', uri=True)
+        tables = scraped_tables(scrape)
+    except sqlite.Error as e:
+        raise ValueError(f"cannot read {scrape_path}: {e}")
+    try:
+        if not tables:
+            raise ValueError(f"{scrape_path} has no scraped tables")
+        c.execute("CREATE TEMP TABLE IF NOT EXISTS history_new "
+                  "(hash BLOB PRIMARY KEY, tbl TEXT, key TEXT, data TEXT) WITHOUT ROWID;")
+        c.execute("DELETE FROM history_new;")
+        c.executemany("INSERT OR IGNORE INTO history_new (hash, tbl, key, data) "
+                      "VALUES (?, ?, ?, ?);", snapshot_rows(scrape))
+    finally:
+        scrape.close()
+    before = c.execute("SELECT count(*) FROM history_row;").fetchone()[0]
+    c.execute("INSERT OR IGNORE INTO history_row (hash, tbl, key, data) "
+              "SELECT hash, tbl, key, data FROM history_new;")
+    added = c.execute("SELECT count(*) FROM history_row;").fetchone()[0] - before
+    c.execute("CREATE TEMP TABLE IF NOT EXISTS history_ids (id INTEGER PRIMARY KEY);")
+    c.execute("DELETE FROM history_ids;")
+    c.execute("INSERT INTO history_ids SELECT r.id FROM history_new n "
+              "INNER JOIN history_row r ON r.hash = n.hash;")
+    c.execute('\n'.join((
+        "UPDATE history_span SET last_seq = :seq",
+        " WHERE game = :game AND last_seq = :last AND row_id IN (SELECT id FROM history_ids);"
+    )), {'seq': seq, 'game': game, 'last': last})
+    c.execute('\n'.join((
+        "INSERT INTO history_span (game, row_id, first_seq, last_seq)",
+        "SELECT :game, id, :seq, :seq FROM history_ids i",
+        " WHERE NOT EXISTS (SELECT 1 FROM history_span s",
+        "                    WHERE s.game = :game AND s.row_id = i.id AND s.last_seq = :seq);"
+    )), {'seq': seq, 'game': game})
+    rows = c.execute("SELECT count(*) FROM history_ids;").fetchone()[0]
+    c.execute('\n'.join((
+        "INSERT INTO history_snapshot (game, seq, version, label, created, source, rows)",
+        "VALUES (?, ?, ?, ?, ?, ?, ?);"
+    )), (game, seq, version, label, time.strftime('%Y-%m-%dT%H:%M:%S'), scrape_path, rows))
+    snapshot_id = c.lastrowid
+    c.execute("DELETE FROM history_new;")
+    c.execute("DELETE FROM history_ids;")
+    history.commit()
+    return snapshot_id, rows, added
+
+
+def find_snapshot(history, spec):
+    """
+    The history_snapshot row named by spec: its id, or game:version[:label], the last snapshot
+    of that version when the label is left out. Raises ValueError when there is none.
+    """
+    c = history.cursor()
+    if spec.isdigit():
+        row = c.execute("SELECT * FROM history_snapshot WHERE id = ?;", (int(spec),)).fetchone()
+    else:
+        parts = spec.split(':', 2)
+        if len(parts) < 2:
+            raise ValueError(f"snapshot {spec} is neither an id nor game:version[:label]")
+        where = "game = ? AND version = ?" + (" AND label = ?" if len(parts) == 3 else "")
+        row = c.execute(f"SELECT * FROM history_snapshot WHERE {where} ORDER BY seq DESC "
+                        f"LIMIT 1;", parts).fetchone()
+    if row is None:
+        raise ValueError(f"no snapshot {spec}")
+    return row
+
+
+def snapshot_only(history, a, b, table=None):
+    # the rows of table (every table when None) in snapshot a and not in b, as history_row rows
+    c = history.cursor()
+    tbl = "AND r.tbl = :tbl" if table else ""
+    # +t.last_seq keeps the lookup on the (game, row_id) key rather than a range scan of
+    # history_span_last for every row
+    return c.execute('\n'.join((
+        "SELECT r.* FROM history_span s",
+        " INNER JOIN history_row r ON r.id = s.row_id",
+        f"WHERE s.game = :a_game AND :a_seq BETWEEN s.first_seq AND s.last_seq {tbl}",
+        "  AND NOT EXISTS (SELECT 1 FROM history_span t",
+        "                   WHERE t.row_id = s.row_id AND t.game = :b_game",
+        "                     AND t.first_seq <= :b_seq AND +t.last_seq >= :b_seq);"
+    )), {'a_game': a['game'], 'a_seq': a['seq'], 'b_game': b['game'], 'b_seq': b['seq'],
+         'tbl': table}).fetchall()
+
+
+def diff_snapshots(history, a, b, table=None, columns=None):
+    """
+    What changed from snapshot a to snapshot b: (table, key, column, old, new) for every
+    column that differs between rows with the same key, and (table, key, None, old row, new
+    row) for rows only in one of them, the other being None. Only the rows that differ are
+    read, found through the spans. columns limits the changes to those columns and leaves out
+    rows only in one snapshot; a column missing on one side (a table that gained one between
+    games) counts as None there.
+    """
+    old = {(r['tbl'], r['key']): json.loads(r['data']) for r in snapshot_only(history, a, b, table)}
+    new = {(r['tbl'], r['key']): json.loads(r['data']) for r in snapshot_only(history, b, a, table)}
+    out = []
+    for tbl, key in sorted(old.keys() | new.keys()):
+        before, after = old.get((tbl, key)), new.get((tbl, key))
+        if before is None or after is None:
+            if not columns:
+                out.append((tbl, key, None, before, after))
+            continue
+        for col in columns or sorted(before.keys() | after.keys()):
+            if before.get(col) != after.get(col):
+                out.append((tbl, key, col, before.get(col), after.get(col)))
+    return out
+
+
+def history_size(history):
+    c = history.cursor()
+    return {t: c.execute(f"SELECT count(*) FROM {t};").fetchone()[0]
+            for t in ('history_snapshot', 'history_row', 'history_span')}
+
+
+if __name__ == '__main__':
+    my_args = sys.argv[1:]
+    parser = argparse.ArgumentParser(
+                    prog='scrape_history',
+                    description='Keeps scrape databases of every game patch in one history '
+                                'database, storing each distinct row once, and shows what '
+                                'changed between two of them.',
+                    epilog='Script finished.')
+    parser.add_argument('history',
+                        help='The history database, created if it does not exist.')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    add = commands.add_parser('add', help='Add a scrape database as the next snapshot of a game.')
+    add.add_argument('scrape_db', help='The scrape database, e.g. db/scrape25.sqlite.')
+    add.add_argument('version', help='Game version of the scrape, e.g. 1.4.')
+    add.add_argument('-g', '--game', default='fs25',
+                     help='Game the scrape is of (default fs25).')
+    add.add_argument('-l', '--label', default='',
+                     help='Patch label telling apart scrapes of one version, e.g. a date or '
+                          'hotfix name.')
+
+    commands.add_parser('list', help='List the snapshots.')
+
+    diff = commands.add_parser('diff', help='Show the rows that changed between two snapshots.')
+    diff.add_argument('old', help='Snapshot id or game:version[:label], e.g. fs25:1.3.')
+    diff.add_argument('new', help='Snapshot to compare with, e.g. fs25:1.4 or fs22:1.14.')
+    diff.add_argument('-t', '--table', help='Only this table, e.g. prod_fill.')
+    diff.add_argument('-c', '--column', action='append',
+                      help='Only changes of this column (repeatable), e.g. amount or price_l.')
+    diff.add_argument('--json', action='store_true', help='Print the changes as JSON lines.')
+
+    args = parser.parse_args(my_args)
+    history = open_history(args.history)
+
+    if args.command == 'add':
+        start = time.perf_counter()
+        try:
+            snapshot_id, rows, added = add_snapshot(history, args.scrape_db, args.game,
+                                                    args.version, args.label)
+        except ValueError as e:
+            parser.error(str(e))
+        print(f"Snapshot {snapshot_id} ({args.game}:{args.version}"
+              f"{':' + args.label if args.label else ''}): {rows} rows, {added} new, in "
+              f"{time.perf_counter() - start:.2f} s")
+        print(', '.join(f"{t} {n}" for t, n in history_size(history).items()))
+    elif args.command == 'list':
+        print(f"{'id':>4}  {'game':<6}{'seq':>4}  {'version':<10}{'label':<14}{'rows':>8}  created")
+        for s in history.execute("SELECT * FROM history_snapshot ORDER BY game, seq;"):
+            print(f"{s['id']:>4}  {s['game']:<6}{s['seq']:>4}  {s['version']:<10}"
+                  f"{s['label']:<14}{s['rows']:>8}  {s['created']}")
+    elif args.command == 'diff':
+        try:
+            old = find_snapshot(history, args.old)
+            new = find_snapshot(history, args.new)
+        except ValueError as e:
+            parser.error(str(e))
+        changes = diff_snapshots(history, old, new, table=args.table, columns=args.column)
+        for tbl, key, col, before, after in changes:
+            if args.json:
+                print(json.dumps({'table': tbl, 'key': json.loads(key), 'column': col,
+                                  'old': before, 'new': after}))
+            elif col is None:
+                print(f"{tbl}\t{key}\t{'removed' if after is None else 'added'}")
+            else:
+                print(f"{tbl}\t{key}\t{col}\t{before}\t{after}")
+        if not args.json:
+            print(f"{len(changes)} changes")
+    history.close()
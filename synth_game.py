@@ -0,0 +1,522 @@
+import os
+import sys
+import random
+import argparse
+import zipfile
+
+# Writes a synthetic Farming Simulator 25 game folder: data/ with placeables, vehicles, foliage,
+# maps with their placeables lists and the map fill and fruit type files, l10n/ with the texts,
+# dataS/character with the animal files, and optionally a mods folder.
+# Every file has the layout the scrapers read, with made up names and numbers, so the scrapers
+# can be run and timed without a game install. The tree is the same for the same scale and seed.
+
+FILL_TYPES = ('WHEAT', 'BARLEY', 'OAT', 'CANOLA', 'SUNFLOWER', 'SOYBEAN', 'MAIZE', 'POTATO',
+              'SUGARBEET', 'FLOUR', 'BREAD', 'CAKE', 'SUGAR', 'OIL', 'MILK', 'BUTTER', 'CHEESE',
+              'EGG', 'WOOL', 'HONEY', 'WATER', 'STRAW', 'MANURE', 'SLURRY', 'FORAGE',
+              'DRYGRASS_WINDROW', 'GRASS_WINDROW', 'SILAGE', 'MINERAL_FEED', 'PIGFOOD', 'SEEDS',
+              'FERTILIZER', 'LIME', 'DIESEL', 'ELECTRICCHARGE', 'METHANE', 'WOODCHIPS',
+              'RICESAPLINGS', 'TREESAPLINGS')
+
+ANIMALS = (
+    ('COW', ('COW_SWISS_BROWN', 'COW_HOLSTEIN', 'COW_ANGUS', 'COW_LIMOUSIN'), 'PARALLEL'),
+    ('PIG', ('PIG_LANDRACE', 'PIG_BLACK_PIED', 'PIG_BERKSHIRE'), 'PARALLEL'),
+    ('SHEEP', ('SHEEP_LANDRACE', 'SHEEP_STEINSCHAF', 'SHEEP_SWISS_MOUNTAIN'), 'SERIAL'),
+    ('CHICKEN', ('CHICKEN', 'CHICKEN_ROOSTER'), 'SERIAL'),
+)
+
+# placeable kinds written round robin, with the folder they go to
+PLACE_KINDS = (
+    ('beehive', 'brandless/beeHives'),
+    ('manureHeap', 'brandless/manureHeaps'),
+    ('solarPanels', 'brandless/electricityGenerators/solar'),
+    ('windTurbine', 'brandless/electricityGenerators/wind'),
+    ('simplePlaceable', 'brandless/decoration'),
+)
+
+
+def write(root, rel, text):
+    path = os.path.join(root, rel)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf8') as file:
+        file.write(text)
+    return path
+
+
+def noise(rng, size):
+    # i3d mappings and sounds the scrapers skip, so files are about as big as the game's
+    if not size:
+        return ''
+    maps = ''.join(f'<i3dMapping id="node{i}" node="0>{i}|{rng.randint(0, 9)}"/>'
+                   for i in range(size))
+    sounds = ''.join(f'<sample{i} file="$data/sounds/s{i}.ogg" volume="0.{rng.randint(1, 9)}"/>'
+                     for i in range(size // 4))
+    return f'<i3dMappings>{maps}</i3dMappings><sounds>{sounds}</sounds>'
+
+
+def store_data(rng, name, price, category, params=None):
+    # with params, the fill the store name's %s is filled with as the game does it
+    if params:
+        name = f'<name params="$l10n_fillType_{params.lower()}">$l10n_shopItem_{name}</name>'
+    else:
+        name = f'<name>$l10n_shopItem_{name}</name>'
+    return (f'<storeData>{name}<price>{price}</price><dailyUpkeep>{rng.randint(1, 200)}'
+            f'</dailyUpkeep><brand>LIZARD</brand><category>{category}</category></storeData>')
+
+
+def prod_xml(rng, name, fills, noise_size):
+    prods = []
+    storage = {}
+    # the point's store name carries the first production's output
+    main = None
+    for p in range(rng.randint(1, 4)):
+        inputs = rng.sample(fills, rng.randint(1, 3))
+        outputs = rng.sample([f for f in fills if f not in inputs], rng.randint(1, 2))
+        ins = ''.join(f'<input fillType="{f}" amount="{rng.randint(1, 40)}"/>' for f in inputs)
+        outs = ''
+        for f in outputs:
+            direct = ' sellDirectly="true"' if rng.random() < 0.2 else ''
+            outs += f'<output fillType="{f}" amount="{rng.randint(1, 40)}"{direct}/>'
+        # named after the first output, as the game's productions are
+        main = main or outputs[0]
+        prods.append(f'<production id="p{p}" name="%s" params="$l10n_fillType_'
+                     f'{outputs[0].lower()}" cyclesPerHour="{rng.randint(1, 60)}" '
+                     f'costsPerActiveHour="{rng.randint(1, 40)}"><inputs>{ins}</inputs>'
+                     f'<outputs>{outs}</outputs></production>')
+        for f in inputs + outputs:
+            storage[f] = rng.choice((1000, 5000, 25000, 100000))
+    shared = rng.choice(('true', 'false', None))
+    shared = f' sharedThroughputCapacity="{shared}"' if shared else ''
+    caps = ''.join(f'<capacity fillType="{f}" capacity="{c}"/>' for f, c in storage.items())
+    return (f'<?xml version="1.0" encoding="utf-8" standalone="no"?>\n'
+            f'<placeable type="productionPoint">'
+            f'{store_data(rng, name, rng.randint(10, 900) * 1000, "productionPoints", main)}'
+            f'<productionPoint><productions{shared}>{"".join(prods)}</productions>'
+            f'<storage>{caps}</storage></productionPoint>{noise(rng, noise_size)}</placeable>')
+
+
+def husbandry_xml(rng, name, animal_type, noise_size):
+    pallets = ''
+    if animal_type in ('CHICKEN', 'SHEEP'):
+        fill = 'EGG' if animal_type == 'CHICKEN' else 'WOOL'
+        pallets = (f'<pallets><palletSpawner fillTypes="{fill}" '
+                   f'maxNumPallets="{rng.randint(2, 12)}"/></pallets>')
+    plane = rng.choice(('foodPlane', 'dynamicFoodPlane'))
+    storage = '<storage>' + ''.join(
+        f'<capacity fillType="{f}" capacity="{rng.randint(1, 50) * 1000}"/>'
+        for f in rng.sample(('MILK', 'MANURE', 'SLURRY', 'STRAW'), 2)) + '</storage>'
+    return (f'<placeable type="husbandry{animal_type.title()}">'
+            f'{store_data(rng, name, rng.randint(5, 400) * 1000, "animalpens")}'
+            f'<husbandry><animals type="{animal_type}" maxNumAnimals="{rng.randint(5, 300)}"/>'
+            f'{storage}<food capacity="{rng.randint(1, 100) * 1000}"><{plane} '
+            f'defaultFillType="FORAGE"/></food>{pallets}'
+            f'<water automaticWaterSupply="{rng.choice(("true", "false"))}"/></husbandry>'
+            f'{noise(rng, noise_size)}</placeable>')
+
+
+def placeable_xml(rng, name, kind, noise_size):
+    if kind == 'beehive':
+        body = (f'<beehive actionRadius="{rng.randint(20, 80)}" '
+                f'litersHoneyPerDay="{rng.randint(5, 60)}"/>')
+        category = 'beehives'
+    elif kind == 'manureHeap':
+        body = (f'<manureHeap capacity="{rng.randint(1, 500) * 10000}" '
+                f'isExtension="{rng.choice(("true", "false"))}"/>')
+        category = 'misc'
+    elif kind == 'solarPanels':
+        body = (f'<solarPanels><solarPanelsConfigurations><solarPanelsConfiguration '
+                f'incomePerHour="{rng.randint(10, 400)}"/></solarPanelsConfigurations>'
+                f'</solarPanels>')
+        category = 'generators'
+    elif kind == 'windTurbine':
+        body = f'<windTurbine incomePerHour="{rng.randint(100, 3000)}"/>'
+        category = 'generators'
+    else:
+        body = ''
+        category = 'decoration'
+    return (f'<placeable type="{kind}">'
+            f'{store_data(rng, name, rng.randint(1, 800) * 500, category)}{body}'
+            f'{noise(rng, noise_size)}</placeable>')
+
+
+def variant_xml(rng, parent, name, sets):
+    # a placeable that inherits everything from parent ($data link) with a few values changed
+    attrs = ''.join(f'<set path="{path}" value="{value}"/>' for path, value in sets)
+    return (f'<placeable><parentFile xmlFilename="{parent}"><attributes>{attrs}</attributes>'
+            f'</parentFile>{store_data(rng, name, 1, "variants")}</placeable>')
+
+
+# vehicle kinds written round robin: category, motorized, spec tags
+VEHICLE_KINDS = (
+    ('tractorsM', True, ('power', 'maxSpeed')),
+    ('harvesters', True, ('power', 'workingWidth')),
+    ('cultivators', False, ('neededPower', 'workingWidth')),
+    ('trailers', False, ('neededPower', 'maxSpeed')),
+)
+
+
+def vehicle_xml(rng, name, kind, noise_size):
+    category, motorized, specs = kind
+    spec_values = {'power': rng.randint(50, 600), 'maxSpeed': rng.choice((40, 50, 60)),
+                   'neededPower': rng.randint(20, 400), 'workingWidth': rng.randint(2, 18)}
+    spec = ''.join(f'<{tag}>{spec_values[tag]}</{tag}>' for tag in specs)
+    motor = ''
+    if motorized:
+        motors = ''.join(f'<motorConfiguration name="{name} {k}" hp="{rng.randint(50, 600)}" '
+                         f'price="{k * rng.randint(1, 20) * 1000}" '
+                         f'consumerConfigurationIndex="{k % 2 + 1}"><motor minRpm="850" '
+                         f'maxRpm="2200" maxForwardSpeed="{rng.randint(30, 60)}"/>'
+                         f'</motorConfiguration>' for k in range(rng.randint(1, 4)))
+        consumers = ''.join(f'<consumerConfiguration><consumer fillUnitIndex="1" '
+                            f'fillType="{fuel}" usage="{rng.randint(10, 90)}"/><consumer '
+                            f'fillUnitIndex="2" fillType="def" usage="{rng.randint(1, 5)}"/>'
+                            f'</consumerConfiguration>' for fuel in ('diesel', 'methane'))
+        motor = (f'<motorized><motorConfigurations>{motors}</motorConfigurations>'
+                 f'<consumerConfigurations>{consumers}</consumerConfigurations>'
+                 f'{noise(rng, noise_size // 4)}</motorized>')
+    return (f'<?xml version="1.0" encoding="utf-8" standalone="no"?>\n'
+            f'<vehicle type="{category}"><annotation>synthetic</annotation><storeData>'
+            f'<name>{name}</name><specs>{spec}</specs><price>{rng.randint(5, 500) * 1000}</price>'
+            f'<dailyUpkeep>{rng.randint(10, 900)}</dailyUpkeep><lifetime>600</lifetime>'
+            f'<brand>LIZARD</brand><category>{category}</category></storeData>'
+            f'<base><typeDesc>synthetic</typeDesc></base>{motor}{noise(rng, noise_size)}'
+            f'</vehicle>')
+
+
+def vehicle_variant_xml(rng, parent, name):
+    # a vehicle inheriting everything from parent with its price and name changed
+    return (f'<vehicle><parentFile xmlFilename="{parent}"><attributes><set '
+            f'path="vehicle.storeData.price" value="{rng.randint(5, 500) * 1000}"/><set '
+            f'path="vehicle.storeData.name" value="{name}"/></attributes></parentFile></vehicle>')
+
+
+def selling_station_xml(rng, name, fills, noise_size):
+    # a station with its own price scale for some fill types, taking a few more (by name or
+    # the BULK category) at the base price
+    scaled = ''.join(f'<fillType name="{f}" priceScale="{rng.randint(70, 140) / 100}" '
+                     f'supportsGreatDemand="{rng.choice(("true", "false"))}"/>'
+                     for f in rng.sample(fills, rng.randint(2, 8)))
+    extra = ''
+    if rng.random() < 0.5:
+        extra += f' fillTypes="{" ".join(rng.sample(fills, 2))}"'
+    if rng.random() < 0.3:
+        extra += ' fillTypeCategories="BULK"'
+    return (f'<placeable type="sellingStation">'
+            f'{store_data(rng, name, rng.randint(1, 100) * 1000, "sellingPoints")}'
+            f'<sellingStation appearsOnStats="true"{extra}><unloadTrigger '
+            f'exactFillRootNode="node0"/>{scaled}</sellingStation>{noise(rng, noise_size)}'
+            f'</placeable>')
+
+
+def fruit_xml(rng, name, noise_size):
+    windrow = ''
+    if rng.random() < 0.5:
+        windrow = (f'<windrow fillType="straw" litersPerSqm="{rng.randint(1, 6)}" '
+                   f'cutFillType="STRAW" windrowCutFactor="0.{rng.randint(1, 9)}"/>')
+    return (f'<foliageType><fruitType name="{name}"><seeding '
+            f'litersPerSqm="0.0{rng.randint(1, 9)}" isAvailable="true" '
+            f'needsRolling="{rng.choice(("true", "false"))}"/><harvest '
+            f'litersPerSqm="{rng.randint(1, 12)}.{rng.randint(0, 9)}" chopperType="CHOP" '
+            f'beeYieldBonusPercentage="0.{rng.randint(0, 3)}"/>{windrow}<growth '
+            f'resetsSpray="true" growthRequiresLime="{rng.choice(("true", "false"))}"/><soil '
+            f'lowDensityRequired="true" increasesDensity="false" consumesLime="true" '
+            f'startSprayLevel="0"/><cultivation isAllowed="true"/></fruitType>'
+            f'{noise(rng, noise_size)}</foliageType>')
+
+
+def fill_types_xml(rng, names, categories=True):
+    fills = ''
+    for name in names:
+        factors = ''.join(f'<factor period="{p}" value="{rng.randint(70, 130) / 100}"/>'
+                          for p in range(1, 13))
+        economy = ''
+        if name != 'ELECTRICCHARGE':
+            economy = (f'<economy pricePerLiter="{rng.randint(1, 3000) / 1000}">'
+                       f'<factors>{factors}</factors></economy>')
+        fills += (f'<fillType name="{name}" title="$l10n_fillType_{name.lower()}" '
+                  f'showOnPriceTable="{rng.choice(("true", "false"))}" '
+                  f'unitShort="$l10n_unit_literShort"><physics '
+                  f'massPerLiter="0.000{rng.randint(1, 9)}"/>{economy}</fillType>')
+    cats = ''
+    if categories:
+        cats = ('<fillTypeCategories>'
+                f'<fillTypeCategory name="BULK">{" ".join(names[:8])}</fillTypeCategory>'
+                '<fillTypeCategory name="LIQUID">MILK WATER OIL DIESEL</fillTypeCategory>'
+                '</fillTypeCategories><fillTypeConverters><fillTypeConverter name="TOFLOUR">'
+                '<converter from="WHEAT" to="FLOUR" factor="0.9"/>'
+                '<converter from="BARLEY" to="FLOUR" factor="0.8"/>'
+                '</fillTypeConverter></fillTypeConverters>')
+    return f'<map><fillTypes>{fills}</fillTypes>{cats}</map>'
+
+
+def l10n_text(key, prefix='', templates=()):
+    # a text made from its key, shopItem_prod00001 reading Prod00001, or Prod00001 (%s) for the
+    # keys in templates, whose store names have params
+    return f'{prefix}{key.split("_", 1)[1].title()}{" (%s)" if key in templates else ""}'
+
+
+def l10n_xml(keys, prefix='', templates=()):
+    texts = ''.join(f'<e k="{k}" v="{l10n_text(k, prefix, templates)}"/>' for k in keys)
+    return f'<l10n><elements>{texts}</elements></l10n>'
+
+
+def mod_l10n_xml(keys, templates=()):
+    # the inline texts of a modDesc.xml, in English and German
+    texts = ''.join(f'<text name="{k}"><en>{l10n_text(k, "", templates)}</en>'
+                    f'<de>{l10n_text(k, "DE ", templates)}</de></text>' for k in keys)
+    return f'<l10n>{texts}</l10n>'
+
+
+def animal_keys(rng, ages, scale=1):
+    return ''.join(f'<key ageMonth="{a}" value="{rng.randint(1, 100) * scale}"/>' for a in ages)
+
+
+def animals_xml(rng):
+    out = '<animals>'
+    for animal_type, subtypes, consumption in ANIMALS:
+        out += f'<animal type="{animal_type}">'
+        for sub in subtypes:
+            if animal_type == 'CHICKEN':
+                products = f'<pallets fillType="EGG">{animal_keys(rng, (6, 12))}</pallets>'
+            elif animal_type == 'SHEEP':
+                products = f'<pallets fillType="WOOL">{animal_keys(rng, (6, 12))}</pallets>'
+            elif animal_type == 'COW':
+                products = (f'<milk fillType="MILK">{animal_keys(rng, (0, 12, 12))}</milk>'
+                            f'<manure>{animal_keys(rng, (0, 12))}</manure>')
+            else:
+                products = f'<manure>{animal_keys(rng, (0, 12))}</manure>'
+            out += (f'<subType subType="{sub}"><reproduction minAgeMonth="{rng.randint(6, 18)}" '
+                    f'durationMonth="{rng.randint(2, 10)}" minHealthFactor="0.75"/>'
+                    f'<buyPrice>{animal_keys(rng, (0, 6, 12, 24), 20)}</buyPrice>'
+                    f'<sellPrice>{animal_keys(rng, (0, 6, 12, 24, 60), 20)}</sellPrice>'
+                    f'<transportPrice>{animal_keys(rng, (0, 12))}</transportPrice>'
+                    f'<input><food>{animal_keys(rng, (0, 6, 12))}</food>'
+                    f'<water>{animal_keys(rng, (0, 12))}</water>'
+                    f'<straw>{animal_keys(rng, (0, 12))}</straw></input>'
+                    f'<output>{products}</output></subType>')
+        out += '</animal>'
+    return out + '</animals>'
+
+
+def animal_food_xml(rng):
+    out = '<animalFood><animals>'
+    for animal_type, subtypes, consumption in ANIMALS:
+        out += (f'<animal animalType="{animal_type}" consumptionType="{consumption}">'
+                f'<foodGroup title="$l10n_fillType_forage" productionWeight="0.{rng.randint(3, 9)}"'
+                f' eatWeight="0.5" fillTypes="FORAGE DRYGRASS_WINDROW"/>'
+                f'<foodGroup title="$l10n_fillType_grain" productionWeight="0.{rng.randint(1, 3)}"'
+                f' eatWeight="0.5" fillTypes="WHEAT BARLEY OAT"/></animal>')
+    out += ('</animals><mixtures><mixture fillType="PIGFOOD" animalType="PIG">'
+            '<ingredient weight="0.5" fillTypes="WHEAT BARLEY"/>'
+            '<ingredient weight="0.25" fillTypes="SOYBEAN CANOLA"/>'
+            '<ingredient weight="0.25" fillTypes="MAIZE"/></mixture></mixtures>'
+            '<recipes><recipe fillType="FORAGE">'
+            '<ingredient name="hay" title="$l10n_hay" minPercentage="40" maxPercentage="60" '
+            'fillTypes="DRYGRASS_WINDROW"/>'
+            '<ingredient name="silage" title="$l10n_silage" minPercentage="20" maxPercentage="40"'
+            ' fillTypes="SILAGE"/>'
+            '<ingredient name="straw" title="$l10n_straw" minPercentage="10" maxPercentage="30" '
+            'fillTypes="STRAW"/></recipe></recipes></animalFood>')
+    return out
+
+
+def write_mod(root, index, rng, fills, noise_size, zipped):
+    """
+    A mod with a few store items (one a variant of a base game production, one a tractor), a
+    fill types file overriding one base fill and adding one of its own, and the texts of its
+    store items and fill inline in its modDesc.xml.
+    """
+    name = f'FS25_synthMod{index:04d}'
+    mod_dir = os.path.join(root, name)
+    items = []
+    prods = []
+    new_fill = f'MODFILL{index}'
+    for k in range(rng.randint(1, 4)):
+        rel = f'placeables/prod{k}/prod{k}.xml'
+        write(mod_dir, rel, prod_xml(rng, f'{name}_prod{k}', fills + [new_fill], noise_size))
+        items.append(rel)
+        prods.append(f'shopItem_{name}_prod{k}')
+    rel = 'placeables/variant/variant.xml'
+    write(mod_dir, rel, variant_xml(rng, '$data/placeables/synth/productions/prod00000/'
+                                         'prod00000.xml', f'{name}_variant',
+                                    [('placeable.storeData.price', rng.randint(1, 90) * 1000)]))
+    items.append(rel)
+    write(mod_dir, 'xml/fillTypes.xml',
+          fill_types_xml(rng, [rng.choice(fills), new_fill], categories=False))
+    rel = 'vehicles/tractor/tractor.xml'
+    write(mod_dir, rel, vehicle_xml(rng, f'{name}_tractor', VEHICLE_KINDS[0], noise_size))
+    items.append(rel)
+    store = ''.join(f'<storeItem xmlFilename="{i}"/>' for i in items)
+    keys = prods + [f'shopItem_{name}_variant', f'fillType_{new_fill.lower()}']
+    write(mod_dir, 'modDesc.xml',
+          f'<?xml version="1.0" encoding="utf-8"?>\n<modDesc descVersion="92"><title>'
+          f'<en>{name}</en></title>{mod_l10n_xml(keys, prods)}<storeItems>{store}</storeItems>'
+          f'<fillTypes filename="xml/fillTypes.xml"/></modDesc>')
+    if zipped:
+        with zipfile.ZipFile(mod_dir + '.zip', 'w', zipfile.ZIP_DEFLATED) as zf:
+            for dir_path, dirs, files in os.walk(mod_dir):
+                for f in files:
+                    path = os.path.join(dir_path, f)
+                    zf.write(path, os.path.relpath(path, mod_dir))
+        for dir_path, dirs, files in os.walk(mod_dir, topdown=False):
+            for f in files:
+                os.remove(os.path.join(dir_path, f))
+            os.rmdir(dir_path)
+
+
+def write_game(root, scale=10, seed=1, noise_size=200, mods=0):
+    """
+    Writes a synthetic game folder at root. scale is the number of production points; the
+    other placeables, vehicles, variants, fruits and fill types grow with it, so scale 10 gives
+    around sixty files and scale 10000 around forty eight thousand. Returns the number of
+    files written, not counting mods.
+    """
+    rng = random.Random(seed)
+    count = 0
+    fruits = ['wheat', 'barley', 'oat', 'canola', 'maize', 'potato', 'sugarbeet', 'grass',
+              'rice', 'poplar']
+    fruits += [f'fruit{i:04d}' for i in range(max(0, scale // 20 - len(fruits)))]
+    fills = list(FILL_TYPES) + [f.upper() for f in fruits if f.upper() not in FILL_TYPES]
+    fills += [f'SYNTH{i:04d}' for i in range(scale // 10)]
+    prod_fills = [f for f in fills if f not in ('WATER', 'ELECTRICCHARGE')]
+
+    for i in range(scale):
+        name = f'prod{i:05d}'
+        write(root, f'data/placeables/synth/productions/{name}/{name}.xml',
+              prod_xml(rng, name, prod_fills, noise_size))
+        count += 1
+        # every fifth production has a variant through parentFile
+        if i % 5 == 0:
+            write(root, f'data/placeables/synth/productions/{name}/{name}_variant.xml',
+                  variant_xml(rng, f'$data/placeables/synth/productions/{name}/{name}.xml',
+                              f'{name}_variant',
+                              [('placeable.storeData.price', rng.randint(10, 900) * 1000)]))
+            count += 1
+
+        animal_type = ANIMALS[i % len(ANIMALS)][0]
+        name = f'{animal_type.lower()}Barn{i:05d}'
+        write(root, f'data/placeables/synth/animalPens/{name}/{name}.xml',
+              husbandry_xml(rng, name, animal_type, noise_size))
+        count += 1
+
+        kind, folder = PLACE_KINDS[i % len(PLACE_KINDS)]
+        name = f'{kind}{i:05d}'
+        write(root, f'data/placeables/{folder}/{name}/{name}.xml',
+              placeable_xml(rng, name, kind, noise_size))
+        count += 1
+        if kind == 'beehive' and i % 2 == 0:
+            write(root, f'data/placeables/{folder}/{name}/{name}_v1.xml',
+                  variant_xml(rng, f'$data/placeables/{folder}/{name}/{name}.xml', f'{name}_v1',
+                              [('placeable.beehive#litersHoneyPerDay', rng.randint(5, 60))]))
+            count += 1
+
+    for name in fruits:
+        write(root, f'data/foliage/{name}/{name}.xml', fruit_xml(rng, name, noise_size))
+        count += 1
+    listed = ''.join(f'<fruitType filename="$data/foliage/{f}/{f}.xml"/>' for f in fruits)
+    cats = (f'<fruitTypeCategories><fruitTypeCategory name="SOWINGMACHINE">'
+            f'{" ".join(f.upper() for f in fruits[:6])}</fruitTypeCategory>'
+            f'<fruitTypeCategory name="PLANTER">POTATO SUGARBEET</fruitTypeCategory>'
+            f'</fruitTypeCategories>')
+    converters = ('<fruitTypeConverters><fruitTypeConverter name="FORAGE">'
+                  '<converter from="WHEAT" to="FORAGE" factor="1.5"/>'
+                  '<converter from="MAIZE" to="FORAGE" factor="1.2"/></fruitTypeConverter>'
+                  '<fruitTypeConverter name="CHOPPER"><converter from="GRASS" to="SILAGE" '
+                  'factor="1"/></fruitTypeConverter></fruitTypeConverters>')
+    write(root, 'data/maps/maps_fruitTypes.xml',
+          f'<map><fruitTypes>{listed}</fruitTypes>{cats}{converters}</map>')
+    write(root, 'data/maps/maps_fillTypes.xml', fill_types_xml(rng, fills))
+    write(root, 'dataS/character/animals.xml', animals_xml(rng))
+    write(root, 'dataS/character/animalFood.xml', animal_food_xml(rng))
+    count += 4
+
+    # vehicles draw from a generator of their own, so for the same seed the base game's other
+    # files are what they were before vehicles were added
+    vehicle_rng = random.Random(seed + 1)
+    for i in range(scale):
+        kind = VEHICLE_KINDS[i % len(VEHICLE_KINDS)]
+        name = f'{kind[0]}{i:05d}'
+        folder = f'data/vehicles/synth/{kind[0]}/{name}'
+        write(root, f'{folder}/{name}.xml', vehicle_xml(vehicle_rng, name, kind, noise_size))
+        count += 1
+        # every fourth vehicle has a variant, and a sounds file that is no vehicle
+        if i % 4 == 0:
+            write(root, f'{folder}/{name}_variant.xml',
+                  vehicle_variant_xml(vehicle_rng, f'$data/vehicles/synth/{kind[0]}/{name}/'
+                                                   f'{name}.xml', f'{name}_variant'))
+            write(root, f'{folder}/{name}_sounds.xml',
+                  f'<sounds>{noise(vehicle_rng, noise_size // 4)}</sounds>')
+            count += 2
+
+    # selling stations and the maps placing them, with a generator of their own as well
+    sell_rng = random.Random(seed + 2)
+    stations = []
+    for i in range(max(2, scale // 5)):
+        name = f'sellingStation{i:05d}'
+        stations.append(f'$data/placeables/synth/sellingStations/{name}/{name}.xml')
+        write(root, stations[-1][1:], selling_station_xml(sell_rng, name, prod_fills, noise_size))
+        count += 1
+    for m in range(2):
+        name = f'mapSynth{m}'
+        placed = sell_rng.sample(stations, max(1, len(stations) // 2))
+        placed += [f'$data/placeables/synth/productions/prod{i:05d}/prod{i:05d}.xml'
+                   for i in sell_rng.sample(range(scale), min(scale, 5))]
+        listed = ''.join(f'<placeable filename="{f}" uniqueId="placeable{k:05d}"/>'
+                         for k, f in enumerate(placed))
+        write(root, f'data/maps/{name}/placeables.xml',
+              f'<placeables version="1">{listed}</placeables>')
+        write(root, f'data/maps/{name}/{name}.xml',
+              f'<map><placeables filename="$data/maps/{name}/placeables.xml"/></map>')
+        count += 2
+
+    # texts of the fill types and the base game's placeables, in two languages
+    keys = [f'fillType_{f.lower()}' for f in fills]
+    for i in range(scale):
+        kind = PLACE_KINDS[i % len(PLACE_KINDS)][0]
+        keys += [f'shopItem_prod{i:05d}', f'shopItem_{ANIMALS[i % len(ANIMALS)][0].lower()}Barn'
+                 f'{i:05d}', f'shopItem_{kind}{i:05d}']
+        # and of the variants
+        if i % 5 == 0:
+            keys.append(f'shopItem_prod{i:05d}_variant')
+        if kind == 'beehive' and i % 2 == 0:
+            keys.append(f'shopItem_{kind}{i:05d}_v1')
+    keys += [f'shopItem_sellingStation{i:05d}' for i in range(len(stations))]
+    for lang, prefix in (('en', ''), ('de', 'DE ')):
+        write(root, f'l10n/l10n_{lang}.xml',
+              l10n_xml(keys, prefix, {f'shopItem_prod{i:05d}' for i in range(scale)}))
+        count += 1
+
+    for i in range(mods):
+        write_mod(os.path.join(root, 'mods'), i, rng, prod_fills, noise_size, zipped=i % 2 == 1)
+    return count
+
+
+if __name__ == '__main__':
+    my_args = sys.argv[1:]
+    parser = argparse.ArgumentParser(
+                    prog='synth_game',
+                    description='Writes a synthetic Farming Simulator 25 game folder (data, '
+                                'dataS and optionally mods) for testing and timing the '
+                                'scrapers without a game install.',
+                    epilog='Script finished.')
+
+    parser.add_argument('out_dir',
+                        help='The folder to write the game to. Run the scraper with it as '
+                             'game_dir and -d out_dir/dataS.')
+    parser.add_argument('-n', '--scale', type=int, default=10,
+                        help='Number of production points; every other kind of file grows with '
+                             'it, about five files per point (default 10).')
+    parser.add_argument('-s', '--seed', type=int, default=1,
+                        help='Random seed, the same seed and scale give the same files '
+                             '(default 1).')
+    parser.add_argument('--noise', type=int, default=200,
+                        help='Number of i3d mappings written into each placeable and foliage '
+                             'file to give it a realistic size (default 200).')
+    parser.add_argument('-m', '--mods', type=int, default=0,
+                        help='Number of mods to write to out_dir/mods, every other one as a zip '
+                             'archive (default 0).')
+
+    args = parser.parse_args(my_args)
+
+    n_files = write_game(args.out_dir, scale=args.scale, seed=args.seed, noise_size=args.noise,
+                         mods=args.mods)
+    print(f"Wrote {n_files} game files to {args.out_dir}")